@@ -1,83 +1,64 @@
-from numpy.random import rand
+import os
+import sys
+
 import matplotlib.pyplot as plt
-import math
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+import lois
+import statistiques
+
+# Simulation de la loi exponentielle par inversion de la fonction de répartition :
+# X = -log(1 - U) / y, tous les tirages en un seul tableau
 def loiExponentielle(y):
-    U=rand()
-    return -1*(math.log(1-U))/y
+    return lois.simuler_exponentielle(y, 1)[0]
 
 def tabLoiExponentielle(y,Nmc):
-    X=[]
-    for i in range(0,Nmc):
-        X.append(loiExponentielle(y))
-    return X
+    return lois.simuler_exponentielle(y, Nmc)
 
 
-#variance empirique
+#moyenne et variance empiriques (une seule passe, par blocs, numériquement stable)
 def Eemp(X,Nmc):
-    sum=0
-    for i in range(0,Nmc):
-        sum+=X[i]
-    return sum/Nmc
+    return statistiques.moyenne_variance(X[:Nmc])[0]
 
 def Vemp(X,Nmc):
-    Emp=Eemp(X,Nmc)
-    sum=0
-    for i in range(0,Nmc):
-        sum+=(Emp-X[i])**2
-    return sum/Nmc
+    return statistiques.moyenne_variance(X[:Nmc])[1]
 
 def F(X,a,b,Nx,Nmc):
-    proba=[]
-    x=[]
-    for i in range(0,Nx):
-        x.append(a+(b-a)*i/Nx)
-        compteur=0
-        
-        for j in range(1,Nmc):
-            if(X[j]<=x[i]):
-                compteur+=1
-        proba.append(compteur/Nmc)
-    return (x,proba)
+    # X[0] n'est pas pris en compte (j = 1, ..., Nmc-1)
+    return statistiques.fonction_repartition(X,a,b,Nx,Nmc,debut=1)
 
 def f(X,a,b,Nx,Nmc):
-    proba=[]
-    x=[]
-    for i in range(0,Nx):
-        x.append(a+(b-a)*i/Nx)
-        compteur=0
-        
-        for j in range(1,Nmc):
-            if(X[j]<=x[i]+(b-a)/Nx and x[i]<X[j]):
-                compteur+=1
-        proba.append(compteur/(((b-a)/Nx)*Nmc))
-    return (x,proba)
-
-y=2
-Nmc=1000
-X=tabLoiExponentielle(y,Nmc)
-
-print(X)
-print(Eemp(X,Nmc))
-print(Vemp(X,Nmc))
-
-
-a=0
-b=2
-Nx=100
-
-Y=F(X,a,b,Nx,Nmc)
-
-xrepartition=Y[0]
-yrepartition=Y[1]
-
-Y=f(X,a,b,Nx,Nmc)
-
-xdensite=Y[0]
-ydensite=Y[1]
-
-f = plt.figure()
-f.add_subplot(1,2, 1)
-plt.plot(xrepartition,yrepartition)
-f.add_subplot(1,2, 2)
-plt.plot(xdensite,ydensite)
+    return statistiques.densite_empirique(X,a,b,Nx,Nmc,debut=1)
+
+def main():
+    y=2
+    Nmc=1000
+    X=tabLoiExponentielle(y,Nmc)
+
+    print(X)
+    print(Eemp(X,Nmc))
+    print(Vemp(X,Nmc))
+
+
+    a=0
+    b=2
+    Nx=100
+
+    Y=F(X,a,b,Nx,Nmc)
+
+    xrepartition=Y[0]
+    yrepartition=Y[1]
+
+    Y=f(X,a,b,Nx,Nmc)
+
+    xdensite=Y[0]
+    ydensite=Y[1]
+
+    fig = plt.figure()
+    fig.add_subplot(1,2, 1)
+    plt.plot(xrepartition,yrepartition)
+    fig.add_subplot(1,2, 2)
+    plt.plot(xdensite,ydensite)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
-import numpy as np
+import os
+import sys
+
 import matplotlib.pyplot as plt
-import math
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import statistiques
+from graphiques import terminer, tracer_trajectoires
+from trajectoires import simuler_X, simuler_mouvements_browniens, simuler_trajectoires
 
 T = 1  # 1 an
 N = 125
@@ -8,76 +14,39 @@ S0 = 100
 sigma = 0.4
 
 def generer_mouvement_brownien():
-    W = [0]
-    delta_t = T / N
-    for i in range(N):
-        W_i = W[i] + np.sqrt(delta_t) * np.random.normal(0, 1)
-        W.append(W_i)
-    return W
+    return simuler_mouvements_browniens(T, N, 1)[1][0]
 
 def simuler_S():
-    delta_t = T / N
-    t = []
-    for i in range(N + 1):
-        t.append(i * delta_t)
-
-    W = generer_mouvement_brownien()
-    S = []
-    for i in range(N + 1):
-        S_i = S0 * math.exp(-0.5 * sigma ** 2 * t[i] + sigma * W[i])
-        S.append(S_i)
-    return t,S
+    t, S = simuler_trajectoires(S0, sigma, T, N, 1)
+    return t, S[0]
 
 def simuler_S_Nmc(Nmc):
-    plt.figure(figsize=(10, 5))
+    fig, ax = plt.subplots(figsize=(10, 5))
 
-    for _ in range(Nmc):
-        t, S = simuler_S()
-        plt.plot(t, S, alpha=0.5)
+    # une LineCollection (ou une carte de densité au-delà de quelques milliers de trajectoires)
+    t, S = simuler_trajectoires(S0, sigma, T, N, Nmc)
+    tracer_trajectoires(ax, t, S, alpha=0.5)
 
     plt.xlabel("Temps (t)")
     plt.ylabel("S(t)")
     plt.title(f"Simulation de {Nmc} trajectoires de S(t)")
-    plt.savefig("../images/travail2/plot_simulation_S_t.png")  # Enregistrement en PNG
-    plt.show()
+    terminer("../images/travail2/plot_simulation_S_t.png")  # Enregistrement en PNG
 
 
 # Calculer X = S_T - B pour Nmc simulations
-def tab_X(Nmc, B):
-    X = []
-    for i in range(Nmc):
-        S_T = simuler_S()[1][-1]  # On récupère S_T (la derniere valeur de S)
-        X.append(S_T - B)
-    return X
+# Seule S_T intervient : on la tire directement selon sa loi log-normale exacte
+# antithetique=True : tirages appariés Y, -Y (indices 2j et 2j + 1)
+# B peut être un vecteur de seuils : X de forme (len(B), Nmc), un seul échantillon de S_T décalé pour chaque B
+def tab_X(Nmc, B, antithetique=False):
+    return simuler_X(S0, sigma, T, B, Nmc, antithetique=antithetique, communs=True)
 
 def fonction_repartition(X, a, b, Nx, Nmc):
-    x = []
-    proba = []
-
-    for i in range(Nx):
-        x.append(a + (b - a) * i / Nx)  # Génération des valeurs de x
-        compteur = 0
-
-        for j in range(Nmc):
-            if X[j] <= x[i]:
-                compteur += 1  # On compte les X[j] ≤ x[i]
-
-        proba.append(compteur / Nmc)  # Calcul de la probabilité empirique
-
-    return x, proba
+    # P(X <= x_i) sur la grille x_i = a + (b - a) * i / Nx (tri + recherche dichotomique)
+    return statistiques.fonction_repartition(X, a, b, Nx, Nmc)
 
 def densite_empirique(X, a, b, Nx, Nmc):
-    proba = []
-    x = []
-    for i in range(0, Nx):
-        x.append(a + (b - a) * i / Nx)
-        compteur = 0
-
-        for j in range(1, Nmc):
-            if (X[j] <= x[i] + (b - a) / Nx and x[i] < X[j]):
-                compteur += 1
-        proba.append(compteur / (((b - a) / Nx) * Nmc))
-    return (x, proba)
+    # Histogramme sur les classes ]x_i, x_i + (b - a) / Nx], X[0] n'est pas pris en compte
+    return statistiques.densite_empirique(X, a, b, Nx, Nmc, debut=1)
 
 
 def tracer_fonction_repartition(X, Nx, Nmc, B, save_path=None):
@@ -92,9 +61,7 @@ def tracer_fonction_repartition(X, Nx, Nmc, B, save_path=None):
     plt.grid()
     plt.legend()
 
-    if save_path:
-        plt.savefig(save_path, bbox_inches='tight')
-    plt.show()
+    terminer(save_path, bbox_inches='tight')
 
 
 def tracer_densite(X, Nx, Nmc, B, save_path=None):
@@ -110,6 +77,4 @@ def tracer_densite(X, Nx, Nmc, B, save_path=None):
     plt.grid()
     plt.legend()
 
-    if save_path:
-        plt.savefig(save_path, bbox_inches='tight')
-    plt.show()
+    terminer(save_path, bbox_inches='tight')
@@ -13,10 +13,10 @@ Nx = 100     # Nombre de points pour la répartition
 if __name__ == "__main__":
     print("Simulation en cours...")
 
-    # Simulation et génération de X = S_T - B
-    for B in (36,50,100):
-        X = tab_X(Nmc, B)
-
+    # Simulation et génération de X = S_T - B : un seul échantillon de S_T pour les trois seuils
+    seuils = (36, 50, 100)
+    X_seuils = tab_X(Nmc, seuils)
+    for B, X in zip(seuils, X_seuils):
         # Tracer la fonction de répartition et la densité empirique
         tracer_fonction_repartition(X, Nx, Nmc, B, save_path=f"../images/travail2/plot_fonction_repartition_B_{B}.png")
         tracer_densite(X, Nx, Nmc, B, save_path=f"../images/travail2/plot_densite_B_{B}.png")
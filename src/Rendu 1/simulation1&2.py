@@ -1,6 +1,14 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import statistiques
+from graphiques import terminer
+from girsanov import estimer_probabilite
+
 # ====================================================
 # Fonction pour calculer la densité empirique
 # ====================================================
@@ -9,16 +17,7 @@ def f(X, a, b, Nx, Nmc):
     """
     Calcule la fonction de densité empirique.
     """
-    proba = []
-    x = []
-    for i in range(Nx):
-        x.append(a + (b - a) * i / Nx)
-        compteur = 0
-        for j in range(Nmc):
-            if X[j] <= x[i] + (b - a) / Nx and x[i] < X[j]:
-                compteur += 1
-        proba.append(compteur / (((b - a) / Nx) * Nmc))
-    return (x, proba)
+    return statistiques.densite_empirique(X, a, b, Nx, Nmc)
 
 # ====================================================
 # Simulation 1 : Calcul de P[Y > 5] dans l'espace Q
@@ -44,7 +43,7 @@ def simulation_1(Nmc):
 # Simulation 2 : Calcul de EQ[I_{Y_Q > 5}] dans l'espace P
 # ====================================================
 
-def simulation_2(Nmc, mu, theta, T):
+def simulation_2(Nmc, mu):
     """
     Calcul de EQ[I_{Y_Q > 5}] dans l'espace P en utilisant l'échantillonnage d'importance.
     YP suit une loi N(mu, 1).
@@ -52,8 +51,9 @@ def simulation_2(Nmc, mu, theta, T):
     # Simuler YP ~ N(mu, 1)
     YP = mu + np.random.normal(0, 1, Nmc)
 
-    # Calculer les poids d'importance : exp(-(gi + mu) * theta - theta^2 * T / 2)
-    weights = np.exp(-(YP) * theta - (theta**2 * T) / 2)
+    # Calculer les poids d'importance (rapport des densités de N(0, 1) et N(mu, 1)) :
+    # exp(-mu * YP + mu^2 / 2), le décalage du poids est la moyenne de la loi de tirage
+    weights = np.exp(-mu * YP + mu**2 / 2)
 
     # Compter le nombre de réalisations où YP > 5
     n5 = np.sum(YP > 5)
@@ -63,6 +63,18 @@ def simulation_2(Nmc, mu, theta, T):
 
     return YP, EQ_I_YQ_gt_5
 
+# ====================================================
+# Simulation 3 : dérive optimisée par entropie croisée, précision cible
+# ====================================================
+
+def simulation_3(erreur_relative_cible, seuil=5):
+    """
+    Calcul de P[Y > seuil] par échantillonnage d'importance : la moyenne de la loi
+    de tirage est choisie par la méthode de l'entropie croisée, puis on simule
+    jusqu'à atteindre l'erreur relative visée.
+    """
+    return estimer_probabilite(lambda Y: Y[:, 0], seuil, erreur_relative_cible=erreur_relative_cible)
+
 # ====================================================
 # Fonction principale (main)
 # ====================================================
@@ -71,9 +83,7 @@ def main():
     # Paramètres
     Nmc_1 = 100000  # Nombre de simulations pour Simulation 1
     Nmc_2 = 100000  # Nombre de simulations pour Simulation 2
-    mu = 5         # Moyenne de la loi Q
-    theta = 1      # Paramètre theta
-    T = 1          # Paramètre T
+    mu = 5         # Moyenne de la loi de tirage (décalage de Girsanov)
     a = -10        # Borne inférieure pour l'affichage de la densité
     b = 10         # Borne supérieure pour l'affichage de la densité
     Nx = 100       # Nombre de points pour l'affichage de la densité
@@ -83,9 +93,15 @@ def main():
     print(f"Simulation 1 : P[Y > 5] = {P_Y_gt_5}")
 
     # Simulation 2
-    Y_2, EQ_I_YQ_gt_5 = simulation_2(Nmc_2, mu, theta, T)
+    Y_2, EQ_I_YQ_gt_5 = simulation_2(Nmc_2, mu)
     print(f"Simulation 2 : EQ[I_{{Y_Q > 5}}] = {EQ_I_YQ_gt_5}")
 
+    # Simulation 3
+    resultat = simulation_3(0.01)
+    print(f"Simulation 3 : P[Y > 5] = {resultat['proba']:.4e} "
+          f"(erreur relative {resultat['erreur_relative']:.2%}, {resultat['n']} tirages, "
+          f"taille effective {resultat['taille_effective']:.0f}, dérive {resultat['theta'][0]:.2f})")
+
     # Affichage des densités empiriques
     x_1, y_1 = f(Y_1, a, b, Nx, Nmc_1)
     x_2, y_2 = f(Y_2, a, b, Nx, Nmc_2)
@@ -111,7 +127,7 @@ def main():
     plt.grid()
 
     plt.tight_layout()
-    plt.show()
+    terminer("simulation1_2_densites")
 
 # ====================================================
 # Point d'entrée du script
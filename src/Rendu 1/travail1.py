@@ -1,6 +1,15 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from graphiques import SEUIL_DENSITE, bornes_trajectoires, terminer, tracer_trajectoires
+from qmc import simuler_trajectoires_qmc
+from reduction_variance import controles_gbm, estimation_antithetique, moyennes_paires, variable_controle
+from trajectoires import simuler_trajectoires
+
 
 def simuler_trajectoire(S0, r, sigma, T, N, dt):
     """
@@ -18,18 +27,11 @@ def simuler_trajectoire(S0, r, sigma, T, N, dt):
     - t : Tableau des instants de temps
     - S : Tableau des prix simulés de l'actif
     """
-    t = np.linspace(0, T, N + 1)  # Instants de temps
-    S = np.zeros(N + 1)  # Stockage des valeurs de l'actif
-    S[0] = S0  # Condition initiale
-
-    for i in range(1, N + 1):
-        Z = np.random.normal()  # Bruit gaussien standard
-        S[i] = S[i - 1] * np.exp((r - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * Z)
-
-    return t, S
+    t, S = simuler_trajectoires(S0, sigma, T, N, 1, r=r)
+    return t, S[0]
 
 
-def afficheTrajectoires(S0, r, sigma, T, N, Nmc, dt, B):
+def afficheTrajectoires(S0, r, sigma, T, N, Nmc, dt, B, qmc=False, antithetique=False, controle=False, chemin=None):
     """
     Simule et trace Nmc trajectoires de l'évolution d'un actif selon un mouvement géométrique brownien.
     Colore en rouge les trajectoires pour lesquelles S_T < B.
@@ -43,27 +45,36 @@ def afficheTrajectoires(S0, r, sigma, T, N, Nmc, dt, B):
     - Nmc : Nombre de simulations Monte-Carlo
     - dt : Pas de temps
     - B : Seuil à comparer avec S_T
+    - qmc : Si True, trajectoires quasi-Monte Carlo (Sobol brouillé + pont brownien)
+    - antithetique : Si True, trajectoires appariées W, -W (Monte Carlo seulement)
+    - controle : Si True, corrige P(S_T < B) par les variables de contrôle S_T et (S_T - B)^+
+      d'espérances connues, et affiche le facteur de réduction de variance obtenu
+      (Monte Carlo seulement : ce facteur suppose des tirages indépendants)
+    - chemin : Fichier du graphe (figures/trajectoires_B<B>.png par défaut)
 
     Retourne :
-    - None (Affiche un graphe avec les trajectoires simulées et affiche la probabilité P(S_T < B))
+    - None (Enregistre un graphe avec les trajectoires simulées et affiche la probabilité P(S_T < B))
+    Au-delà de SEUIL_DENSITE trajectoires, le graphe est une carte de densité (une couleur par groupe).
     """
-    t = np.linspace(0, T, N + 1)  # Instants de temps
-    plt.figure(figsize=(10, 6))  # Taille du graphe
-
-    count_ST_inferieur_B = 0  # Compteur du nombre de trajectoires où S_T < B
-
-    # Génération de Nmc trajectoires
-    for _ in range(Nmc):
-        _, S = simuler_trajectoire(S0, r, sigma, T, N, dt)  # Simulation de la trajectoire
-
-        if S[-1] < B:
-            plt.plot(t, S, color='red', alpha=0.7)  # Rouge si S_T < B
-            count_ST_inferieur_B += 1  # Incrémenter le compteur
-        else:
-            plt.plot(t, S, color='blue', alpha=0.7)  # Bleu sinon
+    if qmc and controle:
+        raise ValueError("controle suppose des tirages indépendants : incompatible avec qmc")
+    fig, ax = plt.subplots(figsize=(10, 6))  # Taille du graphe
+
+    # Génération des Nmc trajectoires en une seule fois
+    if qmc:
+        t, S = simuler_trajectoires_qmc(S0, sigma, T, N, Nmc, r=r)
+    else:
+        t, S = simuler_trajectoires(S0, sigma, T, N, Nmc, r=r, antithetique=antithetique)
+    sous_B = S[:, -1] < B  # Trajectoires pour lesquelles S_T < B
+
+    # Un seul objet graphique par groupe, même mode pour les deux groupes
+    mode = "lignes" if Nmc <= SEUIL_DENSITE else "densite"
+    bornes = bornes_trajectoires(S)
+    tracer_trajectoires(ax, t, S[~sous_B], couleur='blue', alpha=0.7, mode=mode, bornes=bornes)  # Bleu sinon
+    tracer_trajectoires(ax, t, S[sous_B], couleur='red', alpha=0.7, mode=mode, bornes=bornes)  # Rouge si S_T < B
 
     # Calcul de la probabilité estimée P(S_T < B)
-    proba = count_ST_inferieur_B / Nmc
+    proba = np.mean(sous_B)
 
     # Paramètres du graphe
     plt.xlabel("Temps")
@@ -71,11 +82,26 @@ def afficheTrajectoires(S0, r, sigma, T, N, Nmc, dt, B):
     plt.title(f"Simulation de {Nmc} trajectoires d'évolution de l'actif\n"
               f"Trajectoires en rouge si S_T < {B} (Probabilité estimée : {proba:.4f})")
     plt.grid(True)
-    plt.show()
+    terminer(f"trajectoires_B{B}" if chemin is None else chemin)
 
     # Affichage de la probabilité
     print(f"Probabilité estimée P(S_T < {B}) = {proba:.4f}")
 
+    # Réduction de variance : moyennes des paires antithétiques, puis variables de contrôle
+    if controle or (antithetique and not qmc):
+        Y = sous_B.astype(float)
+        C, esperances = controles_gbm(S[:, -1], S0, sigma, T, r, K=[B])
+        facteur = 1.0
+        if antithetique and not qmc:
+            facteur = estimation_antithetique(Y)["facteur_reduction"]
+            Y, C = moyennes_paires(Y), moyennes_paires(C)
+            proba = np.mean(Y)
+        if controle:
+            resultat = variable_controle(Y, C, esperances)
+            proba = resultat["estimation"]
+            facteur *= resultat["facteur_reduction"]
+        print(f"Probabilité corrigée P(S_T < {B}) = {proba:.4f} (réduction de variance : x{facteur:.1f})")
+
 
 if __name__ == '__main__':
     Nmc = 100
@@ -1,6 +1,13 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
-import math
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from graphiques import terminer
+from robbins_monro import robbins_monro_chaines, tirage_X
+from trajectoires import simuler_mouvements_browniens, simuler_trajectoires
 
 # ====================================================
 # Paramètres globaux
@@ -20,73 +27,72 @@ alpha = 0.5  # Niveau de confiance (α = 1/2 pour la loi normale)
 
 def generer_mouvement_brownien():
     """Génère un mouvement brownien standard."""
-    W = [0]
-    for _ in range(N):
-        W_i = W[-1] + np.sqrt(dt) * np.random.normal(0, 1)
-        W.append(W_i)
-    return W
+    return simuler_mouvements_browniens(T, N, 1)[1][0]
 
 def simuler_S():
     """Simule une trajectoire de S(t) selon le modèle géométrique brownien."""
-    t = np.linspace(0, T, N + 1)
-    W = generer_mouvement_brownien()
-    S = [S0 * math.exp(-0.5 * sigma ** 2 * t[i] + sigma * W[i]) for i in range(N + 1)]
-    return t, S
+    t, S = simuler_trajectoires(S0, sigma, T, N, 1)
+    return t, S[0]
 
 # ====================================================
 # Algorithme de Robbins-Monro pour α = 1/2
 # ====================================================
 
-def robbins_monro_normal(Nmc, beta, z0):
+def robbins_monro_normal(Nmc, beta, z0, gain="fixe"):
     """
     Implémente l'algorithme de Robbins-Monro pour trouver z* tel que F(z*) = α = 1/2.
+    Avec gain="kesten" ou "densite" et beta = z0 = None, le pas est réglé automatiquement.
     """
-    Z = [z0]  # Initialisation de la suite Z
-    gamma = [beta / ((n + 1) ** 0.9) for n in range(Nmc)]  # Suite des pas gamma_n
-
-    for n in range(Nmc):
-        # Simuler S_T et calculer X_n = S_T - B
-        S_T = simuler_S()[1][-1]
-        X_n = S_T - B
-
-        # Fonction indicatrice Psi(Z_n, X_n)
-        psi = 1 if X_n <= Z[n] else 0
-
-        # Mise à jour de Z_n
-        Z_next = Z[n] - gamma[n] * (psi - alpha)#on peut mettre alpha en paramètres si besoin
-        Z.append(Z_next)
-
-    return Z
+    # Les X_n = S_T - B sont tirés directement (loi log-normale exacte de S_T)
+    _, historique = robbins_monro_chaines(tirage_X(S0, sigma, T, B), alpha, beta, z0, Nmc, lambda_decay=0.9,
+                                          gain=gain)
+    return historique[0]
 
 # ====================================================
 # Génération des graphiques pour chaque combinaison de paramètres
 # ====================================================
 
-# Paramètres à tester
-parametres = [
-    {"z0": 1, "beta": 10},
-    {"z0": 1, "beta": 1},
-    {"z0": 0.1, "beta": 1},
-    {"z0": 1, "beta": 0.1},
-    {"z0": 1, "beta": 100},
-    {"z0": 1, "beta": 1000},
-]
+if __name__ == "__main__":
+    # Paramètres à tester
+    parametres = [
+        {"z0": 1, "beta": 10},
+        {"z0": 1, "beta": 1},
+        {"z0": 0.1, "beta": 1},
+        {"z0": 1, "beta": 0.1},
+        {"z0": 1, "beta": 100},
+        {"z0": 1, "beta": 1000},
+    ]
+
+    # Exécution simultanée des chaînes (une par jeu de paramètres)
+    betas = np.array([params["beta"] for params in parametres])
+    z0s = np.array([params["z0"] for params in parametres])
+    _, historiques = robbins_monro_chaines(tirage_X(S0, sigma, T, np.full(len(parametres), B)), alpha, betas, z0s, Nmc,
+                                           lambda_decay=0.9)
 
-# Boucle sur les paramètres pour générer les graphiques
-for params in parametres:
-    z0 = params["z0"]
-    beta = params["beta"]
+    # Boucle sur les paramètres pour générer les graphiques
+    for params, Z in zip(parametres, historiques):
+        z0 = params["z0"]
+        beta = params["beta"]
 
-    # Exécution de l'algorithme
-    Z = robbins_monro_normal(Nmc, beta, z0)
+        # Tracé de la convergence
+        plt.figure(figsize=(10, 6))
+        plt.plot(Z, label=f"z0={z0}, beta={beta}")
+        plt.axhline(y=0, color='r', linestyle='--', label="z* = 0")
+        plt.xlabel("Itérations")
+        plt.ylabel("Z_n")
+        plt.title(f"Convergence de l'algorithme de Robbins-Monro pour α = 1/2\nz0={z0}, beta={beta}")
+        plt.legend()
+        plt.grid()
+        terminer(f"travail3_convergence_z0_{z0}_beta_{beta}")
 
-    # Tracé de la convergence
+    # Gain adaptatif (pas réglé sur la densité estimée de X) : aucun beta à choisir
+    Z = robbins_monro_normal(Nmc, None, None, gain="densite")
     plt.figure(figsize=(10, 6))
-    plt.plot(Z, label=f"z0={z0}, beta={beta}")
+    plt.plot(Z, label="gain adaptatif (densité)")
     plt.axhline(y=0, color='r', linestyle='--', label="z* = 0")
     plt.xlabel("Itérations")
     plt.ylabel("Z_n")
-    plt.title(f"Convergence de l'algorithme de Robbins-Monro pour α = 1/2\nz0={z0}, beta={beta}")
+    plt.title("Convergence de l'algorithme de Robbins-Monro pour α = 1/2\ngain adaptatif")
     plt.legend()
     plt.grid()
-    plt.show()
\ No newline at end of file
+    terminer("travail3_convergence_gain_adaptatif")
@@ -1,7 +1,17 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 import math
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from banc_var import CAS_TEST
+from trajectoires import TAILLE_BLOC, simuler_X as simuler_echantillon_X
+from reduction_variance import controles_gbm, quantile_controle
+from robbins_monro import robbins_monro_chaines, robbins_monro_is, robbins_monro_moyenne, tirage_X, transformation_gbm
+from var_flux import EstimateurVaR
+
 # ====================================================
 # Simulation de S_T et calcul de X = S_T - B
 # ====================================================
@@ -62,7 +72,7 @@ def Psi(z, x):
 # Algorithme de Robbins-Monro pour estimer la VaR
 # ====================================================
 
-def robbins_monro_var(S0, r, sigma, T, B, alpha, beta, z0, Nmc, lambda_decay=0.9):
+def robbins_monro_var(S0, r, sigma, T, B, alpha, beta, z0, Nmc, lambda_decay=0.9, gain="fixe"):
     """
     Implémente l'algorithme de Robbins-Monro pour trouver z* tel que
         P[X <= z*] = alpha,
@@ -72,6 +82,9 @@ def robbins_monro_var(S0, r, sigma, T, B, alpha, beta, z0, Nmc, lambda_decay=0.9
         z_{n+1} = z_n - γ_n (Ψ(z_n, X_n) - alpha)
     avec 
         γ_n = beta / ((n+1)^lambda_decay)
+    ou une règle de gain adaptative (gain="kesten" ou "densite", voir robbins_monro_chaines).
+    Avec beta = None et z0 = None, une courte phase de démarrage fixe le pas et le
+    point de départ : la convergence ne dépend plus du choix de beta.
     
     Paramètres :
         S0          : float, prix initial.
@@ -80,53 +93,175 @@ def robbins_monro_var(S0, r, sigma, T, B, alpha, beta, z0, Nmc, lambda_decay=0.9
         T           : float, horizon de temps.
         B           : float, seuil pour X.
         alpha       : float, niveau de risque (ex. 0.01 pour 1%).
-        beta        : float, paramètre du pas d'apprentissage.
-        z0          : float, estimation initiale de VaR.
+        beta        : float ou None, paramètre du pas d'apprentissage (None : automatique).
+        z0          : float ou None, estimation initiale de VaR (None : automatique).
         Nmc         : int, nombre d'itérations.
         lambda_decay: float, exponent pour la décroissance du pas (souvent 0.9).
+        gain        : "fixe", "kesten" ou "densite", règle de gain.
     
     Renvoie :
         z       : float, estimation finale de z*.
-        history : liste, historique des valeurs de z (pour visualiser la convergence).
+        history : array, historique des valeurs de z (pour visualiser la convergence).
     """
-    z = z0
-    history = [z]
-    
-    for n in range(Nmc):
-        gamma_n = beta / ((n + 1) ** lambda_decay)
-        x_n = simuler_X(S0, r, sigma, T, B)
-        psi_val = Psi(z, x_n)
-        z = z - gamma_n * (psi_val - alpha)
-        history.append(z)
-    
-    return z, history
+    z, history = robbins_monro_chaines(tirage_X(S0, sigma, T, B, r), alpha, beta, z0, Nmc, lambda_decay, gain=gain)
+    return z[0], history[0]
+
+def robbins_monro_var_moyenne(S0, r, sigma, T, B, alpha, beta, z0, n_max, m=100, tolerance=None, gain="fixe"):
+    """
+    Variante moyennée (Polyak-Ruppert) et par mini-lots de robbins_monro_var :
+    chaque itération moyenne Ψ sur m tirages de X, et la CVaR E[X | X <= z*]
+    est estimée dans la même récurrence. L'algorithme s'arrête dès que la
+    précision tolerance est atteinte (au plus n_max itérations).
+
+    Paramètres :
+        S0, r, sigma, T, B, alpha, beta, z0 : voir robbins_monro_var.
+        n_max     : int, nombre maximal d'itérations.
+        m         : int, taille des mini-lots.
+        tolerance : float ou None, demi-largeur visée de l'intervalle de confiance à 95 %.
+        gain      : "fixe", "kesten" ou "densite", règle de gain.
+
+    Renvoie :
+        z        : float, estimation de z*.
+        cvar     : float, estimation de E[X | X <= z*].
+        resultat : dict, estimations, erreurs types et nombre de tirages utilisés.
+    """
+    resultat = robbins_monro_moyenne(tirage_X(S0, sigma, T, B, r), alpha, beta, z0, n_max, m,
+                                     queue="basse", tolerance=tolerance, gain=gain)
+    return resultat["var"][0], resultat["cvar"][0], resultat
+
+def robbins_monro_var_is(S0, r, sigma, T, B, alpha, beta, z0, Nmc, lambda_decay=0.9, gain="fixe"):
+    """
+    Variante de robbins_monro_var avec échantillonnage préférentiel : la gaussienne Y
+    de simuler_S_T est tirée sous N(theta, 1) (changement de loi de Girsanov, comme
+    simulation_2) et chaque indicatrice de Ψ est pondérée par le rapport de vraisemblance
+    exp(-theta * Y + theta^2 / 2). Le décalage theta est recalé à chaque itération pour
+    que S_T - B soit centré sur l'estimation courante z_n : l'événement rare {X <= z*}
+    devient de probabilité proche de 1/2, ce qui réduit fortement la variance pour α = 0.1 %.
+
+    Paramètres : voir robbins_monro_var.
+
+    Renvoie :
+        z       : float, estimation finale de z*.
+        history : array, historique des valeurs de z.
+    """
+    z, history = robbins_monro_is(*transformation_gbm(S0, sigma, T, B, r), alpha, beta, z0, Nmc, lambda_decay,
+                                  gain=gain)
+    return z[0], history[0]
 
 # ====================================================
 # Estimation de la VaR par méthode empirique (ordonnancement)
 # ====================================================
 
-def empirical_var(S0, r, sigma, T, B, alpha, Nmc):
+def quantile_empirique(S0, r, sigma, T, B, alpha, Nmc, antithetique=False):
     """
-    Calcule la VaR de façon empirique par simulation Monte Carlo.
-    
-    Pour un échantillon de Nmc réalisations de X, on estime z* tel que :
+    Estime par simulation Monte Carlo le quantile z* de X = S_T - B tel que :
         P[X <= z*] = alpha.
-    La VaR positive est alors définie par : VaR = -z*.
-    
+
+    T, B et alpha peuvent être des vecteurs (K,) : les K cas sont évalués sur un seul
+    échantillon de gaussiennes (nombres aléatoires communs), X = S_T - B n'étant qu'un
+    décalage de S_T pour chaque seuil.
+
     Paramètres :
         S0, r, sigma, T : paramètres pour simuler S_T.
-        B              : float, seuil pour X.
-        alpha          : float, niveau de risque (ex. 0.01 pour 1%).
+        B              : float ou array (K,), seuil pour X.
+        alpha          : float ou array (K,), niveau de risque (ex. 0.01 pour 1%).
         Nmc            : int, nombre de simulations.
+        antithetique   : bool, tirages gaussiens appariés Y, -Y.
+
+    Renvoie :
+        z_empirique : float ou array (K,), quantile estimé (de signe quelconque).
+        X_vals      : array (Nmc,) ou (K, Nmc), échantillon des réalisations de X.
+    """
+    forme = np.broadcast(T, B, alpha).shape
+    X_vals = np.broadcast_to(simuler_echantillon_X(S0, sigma, T, B, Nmc, r=r, antithetique=antithetique,
+                                                   communs=True), forme + (Nmc,))
+    z_empirique = np.array([np.quantile(X, a) for X, a in
+                            zip(X_vals.reshape(-1, Nmc), np.broadcast_to(alpha, forme).ravel())]).reshape(forme)
+    return (float(z_empirique) if not forme else z_empirique), X_vals
+
+
+def empirical_var(S0, r, sigma, T, B, alpha, Nmc, antithetique=False):
+    """
+    Calcule la VaR de façon empirique par simulation Monte Carlo.
+    
+    Pour un échantillon de Nmc réalisations de X, on estime z* tel que :
+        P[X <= z*] = alpha
+    (voir quantile_empirique). La VaR positive est alors définie par : VaR = max(-z*, 0).
+    
+    Paramètres : voir quantile_empirique.
         
     Renvoie :
-        VaR_empirique : float, VaR estimée (valeur positive).
-        X_vals        : array, échantillon des réalisations de X.
+        VaR_empirique : float ou array (K,), VaR estimée (valeur positive).
+        X_vals        : array (Nmc,) ou (K, Nmc), échantillon des réalisations de X.
+    """
+    z_empirique, X_vals = quantile_empirique(S0, r, sigma, T, B, alpha, Nmc, antithetique)
+    VaR_empirique = np.maximum(-np.asarray(z_empirique), 0)
+    return (float(VaR_empirique) if not np.shape(z_empirique) else VaR_empirique), X_vals
+
+
+def empirical_var_controle(S0, r, sigma, T, B, alpha, Nmc, antithetique=False):
+    """
+    VaR empirique corrigée par variables de contrôle : la fonction de répartition de
+    X = S_T - B est repondérée pour que les moyennes de S_T et du pay-off (S_T - K)^+
+    coïncident avec leurs valeurs exactes (S0 e^{rT} et le prix de Black-Scholes capitalisé).
+    Le prix d'exercice K est placé au quantile empirique brut de S_T : le pay-off est alors
+    fortement corrélé à l'indicatrice 1{X <= z*}.
+
+    Avec T, B et alpha vecteurs (K,), les K cas partagent un seul échantillon de gaussiennes
+    (nombres aléatoires communs) : un rapport complet ne coûte qu'une simulation.
+
+    Paramètres : voir empirical_var.
+
+    Renvoie :
+        VaR_empirique : float ou array (K,), VaR estimée (valeur positive).
+        resultat      : dict (liste de K dict), quantile corrigé et brut de X, facteur de
+                        réduction de variance (voir reduction_variance.quantile_controle).
+    """
+    forme = np.broadcast(T, B, alpha).shape
+    X_vals = np.broadcast_to(simuler_echantillon_X(S0, sigma, T, B, Nmc, r=r, antithetique=antithetique,
+                                                   communs=True), forme + (Nmc,)).reshape(-1, Nmc)
+    resultats = []
+    for X, T_cas, B_cas, alpha_cas in zip(X_vals, *(np.broadcast_to(p, forme).ravel() for p in (T, B, alpha))):
+        S_T = X + B_cas
+        C, esperances = controles_gbm(S_T, S0, sigma, T_cas, r, K=[np.quantile(S_T, alpha_cas)])
+        resultats.append(quantile_controle(X, C, esperances, alpha_cas))
+    VaR_empirique = np.maximum(-np.array([resultat["quantile"] for resultat in resultats]), 0)
+    if not forme:
+        return float(VaR_empirique[0]), resultats[0]
+    return VaR_empirique, resultats
+
+
+def empirical_var_flux(S0, r, sigma, T, B, alpha, Nmc, methode="exact", taille_bloc=TAILLE_BLOC):
+    """
+    Calcule la VaR empirique par blocs de taille_bloc tirages, sans conserver
+    l'échantillon complet (permet Nmc de l'ordre de 10^8 - 10^9).
+
+    Avec T, B et alpha vecteurs (K,), chaque bloc de gaussiennes est partagé par les
+    K cas (un estimateur par cas) : un rapport complet ne coûte qu'une simulation.
+
+    Paramètres :
+        S0, r, sigma, T, B, alpha, Nmc : voir empirical_var.
+        methode     : "exact" (queue conservée) ou "esquisse" (t-digest, approché).
+        taille_bloc : int, nombre de tirages simulés à la fois.
+
+    Renvoie :
+        VaR_empirique : float ou array (K,), VaR estimée (valeur positive).
+        resultat      : dict (liste de K dict), VaR/CVaR de X avec intervalle de confiance
+                        (voir EstimateurVaR).
     """
-    X_vals = np.array([simuler_X(S0, r, sigma, T, B) for _ in range(Nmc)])
-    z_empirical = np.quantile(X_vals, alpha)
-    VaR_empirique = -z_empirical if z_empirical < 0 else 0
-    return VaR_empirique, X_vals
+    forme = np.broadcast(T, B, alpha).shape
+    estimateurs = [EstimateurVaR(a, Nmc, queue="basse", methode=methode)
+                   for a in np.broadcast_to(alpha, forme).ravel()]
+    for debut in range(0, Nmc, taille_bloc):
+        n = min(taille_bloc, Nmc - debut)
+        X = np.broadcast_to(simuler_echantillon_X(S0, sigma, T, B, n, r=r, communs=True), forme + (n,))
+        for estimateur, X_cas in zip(estimateurs, X.reshape(-1, n)):
+            estimateur.ajouter(X_cas)
+    resultats = [estimateur.resultat() for estimateur in estimateurs]
+    VaR_empirique = np.maximum(-np.array([resultat["var"] for resultat in resultats]), 0)
+    if not forme:
+        return float(VaR_empirique[0]), resultats[0]
+    return VaR_empirique, resultats
 
 
 # ====================================================
@@ -139,31 +274,47 @@ def main():
     r = 0.0
     sigma = 0.4
     Nmc = 10000      # Nombre d'itérations/simulations
-    beta = 1.0       # Paramètre du pas d'apprentissage pour Robbins-Monro
-    z0 = 0.0         # Estimation initiale de z
+    gain = "densite" # Gain adaptatif : beta et z0 sont fixés par une phase de démarrage
     
-    # Liste de cas de test : (B, alpha, T, description)
-    cas_test = [
-        (100, 0.01, 1.0, "B=100, α=1%, T=1 an"),
-        (100, 0.001, 1.0, "B=100, α=0.1%, T=1 an"),
-        (100, 0.01, 10/365, "B=100, α=1%, T=10 jours"),
-        (100, 0.001, 10/365, "B=100, α=0.1%, T=10 jours"),
-        (50, 0.01, 1.0, "B=50, α=1%, T=1 an"),
-        (50, 0.001, 1.0, "B=50, α=0.1%, T=1 an"),
-        (36, 0.01, 1.0, "B=36, α=1%, T=1 an")
-    ]
-    
-    for B, alpha, T, description in cas_test:
-        # Estimation par l'algorithme de Robbins-Monro
-        final_z, history = robbins_monro_var(S0, r, sigma, T, B, alpha, beta, z0, Nmc)
+    cas_test = CAS_TEST
+
+    # Estimation par l'algorithme de Robbins-Monro : les 7 chaînes avancent ensemble
+    B_cas, alpha_cas, T_cas = (np.array([cas[i] for cas in cas_test]) for i in range(3))
+    z_cas, _ = robbins_monro_chaines(tirage_X(S0, sigma, T_cas, B_cas, r), alpha_cas, None, None, Nmc, gain=gain)
+
+    # Même estimation avec échantillonnage préférentiel (décalage adaptatif de la gaussienne)
+    z_cas_is, _ = robbins_monro_is(*transformation_gbm(S0, sigma, T_cas, B_cas, r), alpha_cas, None, None, Nmc,
+                                   gain=gain)
+
+    # Estimation empirique par ordonnancement (en flux, queue seule conservée) :
+    # les 7 cas partagent le même échantillon de gaussiennes
+    VaR_empiriques, resultats = empirical_var_flux(S0, r, sigma, T_cas, B_cas, alpha_cas, Nmc)
+
+    # VaR empirique corrigée par variables de contrôle (tirages antithétiques), même principe :
+    # un seul échantillon pour les 7 cas
+    VaR_controles, controles = empirical_var_controle(S0, r, sigma, T_cas, B_cas, alpha_cas, Nmc, antithetique=True)
+
+    # Variante moyennée par mini-lots de 100 tirages, avec CVaR et arrêt à ±0.5 euro
+    moyenne = robbins_monro_moyenne(tirage_X(S0, sigma, T_cas, B_cas, r), alpha_cas, None, None, Nmc, m=100,
+                                    queue="basse", tolerance=0.5, gain=gain)
+
+    for k, ((B, alpha, T, description), final_z, final_z_is) in enumerate(zip(cas_test, z_cas, z_cas_is)):
         # Comme X = S_T - B, le quantile z* est négatif pour des faibles α
         VaR_RM = -final_z if final_z < 0 else 0
+        VaR_RM_is = -final_z_is if final_z_is < 0 else 0
+
+        VaR_empirique, resultat = VaR_empiriques[k], resultats[k]
+        VaR_controle, controle = VaR_controles[k], controles[k]
 
-        # Estimation empirique par ordonnancement
-        VaR_empirique, X_vals = empirical_var(S0, r, sigma, T, B, alpha, Nmc)
-        
         # Affichage des résultats
-        print(f"{description} -> VaR (Robbins-Monro) : {VaR_RM:.4f} euros, VaR empirique : {VaR_empirique:.4f} euros")
+        print(f"{description} -> VaR (Robbins-Monro) : {VaR_RM:.4f} euros, VaR empirique : {VaR_empirique:.4f} euros "
+              f"(z* dans [{resultat['var_inf']:.4f}, {resultat['var_sup']:.4f}])")
+        print(f"    Robbins-Monro préférentiel : VaR = {VaR_RM_is:.4f} euros")
+        print(f"    Robbins-Monro moyenné : z* = {moyenne['var'][k]:.4f} ± {1.96 * moyenne['erreur_type_var'][k]:.4f}, "
+              f"E[X | X <= z*] = {moyenne['cvar'][k]:.4f} ± {1.96 * moyenne['erreur_type_cvar'][k]:.4f} "
+              f"({moyenne['n_tirages'][k]} tirages{'' if moyenne['convergee'][k] else ', non convergé'})")
+        print(f"    Variables de contrôle : VaR = {VaR_controle:.4f} euros "
+              f"(réduction de variance x{controle['facteur_reduction']:.1f})")
         
 
 
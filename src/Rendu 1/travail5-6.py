@@ -1,60 +1,25 @@
-import numpy as np
-import matplotlib.pyplot as plt
-import math
-
-# ====================================================
-# Fonctions pour la densité Beta (sans scipy)
-# ====================================================
-
-def gamma_function(z):
-    """
-    Calcule la fonction Gamma pour z > 0 en utilisant l'approximation de Stirling.
-    """
-    if z == 1:
-        return 1
-    elif z == 0.5:
-        return math.sqrt(math.pi)
-    else:
-        return math.sqrt(2 * math.pi / z) * ((z / math.e) ** z)
+import os
+import sys
 
-def beta_function(alpha, beta):
-    """
-    Calcule la fonction Beta B(alpha, beta) en utilisant la fonction Gamma.
-    """
-    return gamma_function(alpha) * gamma_function(beta) / gamma_function(alpha + beta)
+import matplotlib.pyplot as plt
 
-def beta_pdf(x, alpha, beta):
-    """
-    Calcule la densité de la loi Beta en x pour les paramètres alpha et beta.
-    """
-    if x < 0 or x > 1:
-        return 0  # La densité est nulle en dehors de [0, 1]
-    else:
-        return (x ** (alpha - 1)) * ((1 - x) ** (beta - 1)) / beta_function(alpha, beta)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import lois
+from graphiques import terminer
+import statistiques
 
 # ====================================================
 # Simulation de la loi Beta par la méthode de rejet
 # ====================================================
 
-def simulate_beta_rejection(alpha, beta, Nmc):
+def simulate_beta_rejection(alpha, beta, Nmc, n_morceaux=1):
     """
     Simule des variables aléatoires suivant une loi Beta(alpha, beta) par la méthode de rejet.
+    Les candidats sont tirés par tableaux ; la constante de rejet est le maximum exact de la
+    densité (atteint au mode, x0 = 1 pour (5, 1)). n_morceaux > 1 remplace l'enveloppe
+    uniforme par une enveloppe constante par morceaux (meilleur taux d'acceptation).
     """
-    Y = []
-    x0 = (alpha - 1) / (alpha + beta - 2)  # Point où la densité atteint son maximum
-    C = beta_pdf(x0, alpha, beta)  # Constante de rejet
-
-    for _ in range(Nmc):
-        while True:
-            U = np.random.uniform(0, 1)  # Simuler U ~ U(0, 1)
-            Y_candidate = np.random.uniform(0, 1)  # Simuler Y ~ U(0, 1)
-            f = beta_pdf(Y_candidate, alpha, beta)  # Densité Beta
-            g = 1  # Densité de la loi uniforme U(0, 1)
-
-            if U <= f / (C * g):
-                Y.append(Y_candidate)
-                break
-    return Y
+    return lois.simuler_beta(alpha, beta, Nmc, n_morceaux)
 
 # ====================================================
 # Fonctions pour afficher la fonction de densité empirique
@@ -64,16 +29,7 @@ def f(X, a, b, Nx, Nmc):
     """
     Calcule la fonction de densité empirique.
     """
-    proba = []
-    x = []
-    for i in range(Nx):
-        x.append(a + (b - a) * i / Nx)
-        compteur = 0
-        for j in range(Nmc):
-            if X[j] <= x[i] + (b - a) / Nx and x[i] < X[j]:
-                compteur += 1
-        proba.append(compteur / (((b - a) / Nx) * Nmc))
-    return (x, proba)
+    return statistiques.densite_empirique(X, a, b, Nx, Nmc)
 
 # ====================================================
 # Fonction principale (main)
@@ -92,7 +48,7 @@ def main():
     # Boucle sur chaque cas
     for alpha, beta in cases:
         # Simuler la loi Beta
-        Y = simulate_beta_rejection(alpha, beta, Nmc)
+        Y = simulate_beta_rejection(alpha, beta, Nmc, n_morceaux=16)
 
         # Calculer la densité empirique
         x_densite, y_densite = f(Y, a, b, Nx, Nmc)
@@ -105,7 +61,7 @@ def main():
         plt.ylabel("Densité")
         plt.legend()
         plt.grid()
-        plt.show()
+        terminer(f"densite_beta_{alpha}_{beta}")
 
 # ====================================================
 # Point d'entrée du script
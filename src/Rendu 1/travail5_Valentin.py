@@ -1,6 +1,14 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
-import math
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import statistiques
+from graphiques import terminer
+from trajectoires import simuler_X
+from var_flux import EstimateurVaR
 
 # Paramètres globaux
 S0 = 100  # Prix initial de l'actif
@@ -18,58 +26,46 @@ def simuler_S_T():
 
 # Fonction pour simuler un échantillon de X = S_T - B
 def simuler_echantillon_X(Nmc, B):
-    X = []
-    for _ in range(Nmc):
-        S_T = simuler_S_T()
-        X.append(S_T - B)
-    return X
+    return simuler_X(S0, sigma, T, B, Nmc)  # Tirage direct de S_T en bloc
 
 # Fonction pour calculer la VaR par ordonnancement
+# VaR = X_{(k)}, k = int(len(X) * alpha) : seule la queue basse est conservée et ordonnée
 def calculer_var(X, alpha):
-    X_ordonne = np.sort(X)  # Ordonner l'échantillon
-    k = int(Nmc * alpha)  # Indice du quantile
-    VaR = X_ordonne[k]  # VaR = X_{(k)}
-    return VaR
+    estimateur = EstimateurVaR(alpha, len(X), queue="basse")
+    estimateur.ajouter(X)
+    return estimateur.resultat()["var"]
 
 # Fonction pour calculer la densité empirique
 def f(X, a, b, Nx, Nmc):
-    proba = []
-    x = []
-    for i in range(Nx):
-        x.append(a + (b - a) * i / Nx)
-        compteur = 0
-        for j in range(Nmc):
-            if X[j] <= x[i] + (b - a) / Nx and x[i] < X[j]:
-                compteur += 1
-        proba.append(compteur / (((b - a) / Nx) * Nmc))
-    return x, proba
+    return statistiques.densite_empirique(X, a, b, Nx, Nmc)
 
-# Simulation de l'échantillon
-X = simuler_echantillon_X(Nmc, B)
+if __name__ == "__main__":
+    # Simulation de l'échantillon
+    X = simuler_echantillon_X(Nmc, B)
 
-# Calcul de la VaR pour chaque alpha
-for alpha in alpha_values:
-    VaR = calculer_var(X, alpha)
-    print(f"VaR pour B={B}, alpha={alpha * 100}% : {VaR:.4f}")
+    # Calcul de la VaR pour chaque alpha
+    for alpha in alpha_values:
+        VaR = calculer_var(X, alpha)
+        print(f"VaR pour B={B}, alpha={alpha * 100}% : {VaR:.4f}")
 
-# Calcul de la densité empirique
-a = min(X)  # Borne inférieure
-b = max(X)  # Borne supérieure
-Nx = 100  # Nombre de points pour la densité
-xdensite, ydensite = f(X, a, b, Nx, Nmc)
+    # Calcul de la densité empirique
+    a = min(X)  # Borne inférieure
+    b = max(X)  # Borne supérieure
+    Nx = 100  # Nombre de points pour la densité
+    xdensite, ydensite = f(X, a, b, Nx, Nmc)
 
-# Tracé de la densité empirique de X
-plt.figure(figsize=(10, 6))
-plt.plot(xdensite, ydensite, label="Densité empirique de X")
+    # Tracé de la densité empirique de X
+    plt.figure(figsize=(10, 6))
+    plt.plot(xdensite, ydensite, label="Densité empirique de X")
 
-# Ajout des lignes verticales pour les VaR
-for alpha in alpha_values:
-    VaR = calculer_var(X, alpha)
-    plt.axvline(x=VaR, color='r' if alpha == 0.1 else 'b', linestyle='--', label=f"VaR (alpha={alpha * 100}%) = {VaR:.2f}")
+    # Ajout des lignes verticales pour les VaR
+    for alpha in alpha_values:
+        VaR = calculer_var(X, alpha)
+        plt.axvline(x=VaR, color='r' if alpha == 0.1 else 'b', linestyle='--', label=f"VaR (alpha={alpha * 100}%) = {VaR:.2f}")
 
-plt.xlabel("X = S_T - B")
-plt.ylabel("Densité")
-plt.title(f"Densité empirique de X pour B={B} (Nmc={Nmc})")
-plt.legend()
-plt.grid()
-plt.show()
\ No newline at end of file
+    plt.xlabel("X = S_T - B")
+    plt.ylabel("Densité")
+    plt.title(f"Densité empirique de X pour B={B} (Nmc={Nmc})")
+    plt.legend()
+    plt.grid()
+    terminer(f"travail5_densite_B{B}")
@@ -1,8 +1,21 @@
+import functools
+import os
+import sys
+
 import numpy as np
-import math
 
 from matplotlib import pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from black_scholes import GrilleBlackScholes, call
+from graphiques import terminer
+from parallele import executer_en_parallele
+from portefeuille import Portefeuille
+from qmc import replications, simuler_S_T_qmc
+from robbins_monro import robbins_monro_moyenne
+from trajectoires import simuler_S_T
+from var_flux import EstimateurVaR
+
 # paramètres
 S0 = 100
 K = 100
@@ -13,151 +26,155 @@ I0 = 10
 alpha = -10
 beta = -5
 Nmc = 10000
-
-# fonction de répartition de la loi normale
-def repartition_normale(x):
-    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
-
-# prix d'un call européen (r=0)
-def call(S, K, sigma, T):
-    d1 = (math.log(S / K) + 0.5 * sigma**2 * T) / (sigma * math.sqrt(T))
-    d2 = d1 - sigma * math.sqrt(T)
-    return S * repartition_normale(d1) - K * repartition_normale(d2)
-
-# prix d'un put européen (r=0)
-def put(S, K, sigma, T):
-    d1 = (math.log(S / K) + 0.5 * sigma**2 * T) / (sigma * math.sqrt(T))
-    d2 = d1 - sigma * math.sqrt(T)
-    return K * repartition_normale(-d2) - S * repartition_normale(-d1)
-
-# simule une valeur finale S_T
-def simuler_ST(S0, sigma, T):
-    return S0 * math.exp(-0.5 * sigma**2 * T + sigma * np.random.normal(0, math.sqrt(T)))
-
-# fonction indicatrice pour robbins-monro
-def Psi(z, x):
-    return 1 if x <= z else 0
-
-# algorithme robbins-monro pour approximer la var
-def robbins_monro(pertes, alpha, eta=0.01, n_iter=1000):
-    z = 0
-    for i in range(n_iter):
-        x = np.random.choice(pertes)
-        z = z + eta * (alpha - Psi(z, x))
-    return z
-
-# calcule var et cvar par méthode de tri
+graine = None  # entier pour des résultats reproductibles (quel que soit le nombre de cœurs)
+
+# simule Nmc valeurs finales S_T (forme (Nmc,) ou (Nmc, n) si n est donné)
+# qmc=True : points de Sobol brouillés (une dimension par sous-jacent), rng fixe le brouillage
+def simuler_ST(S0, sigma, T, Nmc, n=None, rng=None, qmc=False):
+    simuler = simuler_S_T_qmc if qmc else simuler_S_T
+    if n is None:
+        return simuler(S0, sigma, T, Nmc, rng=rng)
+    return simuler(np.full(n, S0), sigma, T, Nmc, rng=rng).T
+
+# pertes de Nmc scénarios d'un portefeuille sur I0 sous-jacents (une tranche de la simulation parallèle)
+# qmc=True : une dimension de Sobol par sous-jacent
+def simuler_pertes(portefeuille, Nmc, rng=None, qmc=False):
+    return portefeuille.pertes(simuler_ST(S0, sigma, T, Nmc, I0, rng, qmc), S0)
+
+# moyenne et moment d'ordre 2 des pertes
+def moments(pertes):
+    return np.array([np.mean(pertes), np.mean(pertes ** 2)])
+
+# algorithme robbins-monro moyenné par mini-lots pour approximer la var
+# (m pertes rééchantillonnées par itération, pas et point de départ fixés par une phase de démarrage)
+def robbins_monro(pertes, alpha, m=100, n_iter=1000):
+    def tirage(n):
+        return np.random.choice(pertes, (1, n))
+    resultat = robbins_monro_moyenne(tirage, alpha, n_max=n_iter, m=m, queue="haute", gain="densite")
+    return resultat["var"][0]
+
+# calcule var et cvar par méthode de tri (var = k-ième perte triée, k = int(Nmc * alpha)) :
+# seule la queue des grandes pertes est conservée, la cvar est la moyenne des pertes >= var
 def var_cvar(pertes, alpha):
-    pertes = np.sort(pertes)
-    k = int(len(pertes) * alpha)
-    var = pertes[k]
-    cvar = np.mean(pertes[:k+1])
-    return var, cvar
-
-# simulation des pertes
-#np.random.seed(0)
-pertes_call = []
-pertes_port = []
-
-V0_call = call(S0, K, sigma, T)
-V0_port = I0 * (alpha * V0_call + beta * put(S0, K, sigma, T))
-
-for _ in range(Nmc):
-    ST = simuler_ST(S0, sigma, T)
-    pertes_call.append(V0_call - max(ST - K, 0))
-
-    Vt = 0
-    for _ in range(I0):
-        ST_i = simuler_ST(S0, sigma, T)
-        Vt += alpha * call(ST_i, K, sigma, T) + beta * put(ST_i, K, sigma, T)
-    pertes_port.append(V0_port - Vt)
-
-pertes_call = np.array(pertes_call)
-pertes_port = np.array(pertes_port)
-
-# affichage des résultats pour chaque niveau de confiance alpha_
-for alpha_ in valeurs_alpha:
-    # calcul de la var et cvar par méthode de tri (ordonnancement) pour le call seul
-    v_call, c_call = var_cvar(pertes_call, alpha_)
-    # calcul de la var et cvar pour le portefeuille complet (call + put)
-    v_port, c_port = var_cvar(pertes_port, alpha_)
-    # estimation de la var du call seul par la méthode robbins-monro
-    rm_call = robbins_monro(pertes_call, alpha_)
-    # estimation de la var du portefeuille par robbins-monro (résultat souvent imprécis)
-    rm_port = robbins_monro(pertes_port, alpha_)
-
-    # affichage structuré des résultats
-    print(f"α={alpha_}")
-    print(f"  var_call_tri={v_call:.2f}")   # var du call (tri)
-    print(f"  cvar_call={c_call:.2f}")      # cvar du call (tri)
-    print(f"  var_call_rm={rm_call:.2f}")   # var du call (robbins-monro)
-    print(f"  var_port_tri={v_port:.2f}")   # var du portefeuille (tri)
-    print(f"  cvar_port={c_port:.2f}")      # cvar du portefeuille (tri)
-    print(f"  var_port_rm={rm_port:.2f}")   # var du portefeuille (robbins-monro)
-    print()
-
-
-
-# question 2 : tracer la distribution conditionnelle des pertes > VaR99%
-alpha_c = 0.99
-var_cond = np.percentile(pertes_port, 100 * alpha_c)
-pertes_extremes = pertes_port[pertes_port > var_cond]
-
-# tracer l'histogramme des pertes extrêmes
-plt.figure(figsize=(7,4))
-plt.hist(pertes_extremes, density = 'true', bins=30, color='darkred', alpha=0.7, edgecolor='black')
-plt.title("distribution conditionnelle : pertes > VaR99%")
-plt.xlabel("Perte")
-plt.ylabel("Fréquence")
-plt.grid(True)
-plt.tight_layout()
-plt.show()
-
-# question 3 : etude de l'influence de la composition du portefeuille
-def composition_short(i):
-    return -10, -5
-
-def composition_long(i):
-    return 10, 5
-
-def composition_mixte(i):
-    return (10, 5) if i < I0 // 2 else (-10, -5)
-
-compositions = {
-    "Short": composition_short,
-    "Long": composition_long,
-    "Mixte": composition_mixte
-}
-
-resultats = {}
-
-for nom, func in compositions.items():
-    pertes = []
-    V0 = 0
-    for i in range(I0):
-        alpha_i, beta_i = func(i)
-        V0 += alpha_i * call(S0, K, sigma, T) + beta_i * put(S0, K, sigma, T)
-
-    for j in range(Nmc):
-        Vt = 0
-        for i in range(I0):
-            alpha_i, beta_i = func(i)
-            S_Ti = simuler_ST(S0, sigma, T)
-            Vt += alpha_i * call(S_Ti, K, sigma, T) + beta_i * put(S_Ti, K, sigma, T)
-        pertes.append(V0 - Vt)
-
-    pertes = np.array(pertes)
-    var99, cvar99 = var_cvar(pertes, 0.99)
-    resultats[nom] = (var99, cvar99)
-
-    # tracer la distribution avec la VaR à 99%
-    plt.figure(figsize=(6, 4))
-    plt.hist(pertes, density = 'true', bins=50, alpha=0.7, color='steelblue', edgecolor='black')
-    plt.axvline(var99, color='red', linestyle='--', label=f"VaR 99% = {var99:.2f}")
-    plt.title(f"Densité des pertes - {nom}")
+    estimateur = EstimateurVaR(alpha, len(pertes))
+    estimateur.ajouter(pertes)
+    resultat = estimateur.resultat()
+    return resultat["var"], resultat["cvar"]
+
+
+if __name__ == "__main__":
+    # simulation des pertes : toutes les réévaluations sont faites en une passe vectorisée
+    #np.random.seed(0)
+    V0_call = call(S0, K, sigma, T)
+
+    ST = simuler_ST(S0, sigma, T, Nmc)
+    pertes_call = V0_call - np.maximum(ST - K, 0)
+
+    # prix tabulés une fois pour (K, sigma, T) puis interpolés dans chaque scénario
+    grille = GrilleBlackScholes(tolerance=1e-8)
+
+    # portefeuille : alpha calls et beta puts sur chacun des I0 sous-jacents
+    portefeuille = Portefeuille.depuis_compositions(lambda i: (alpha, beta), I0, K, sigma, T, grille)
+    pertes_port = executer_en_parallele(functools.partial(simuler_pertes, portefeuille), Nmc, graine)
+
+    # affichage des résultats pour chaque niveau de confiance alpha_
+    for alpha_ in valeurs_alpha:
+        # calcul de la var et cvar par méthode de tri (ordonnancement) pour le call seul
+        v_call, c_call = var_cvar(pertes_call, alpha_)
+        # calcul de la var et cvar pour le portefeuille complet (call + put)
+        v_port, c_port = var_cvar(pertes_port, alpha_)
+        # estimation de la var du call seul par la méthode robbins-monro
+        rm_call = robbins_monro(pertes_call, alpha_)
+        # estimation de la var du portefeuille par robbins-monro (résultat souvent imprécis)
+        rm_port = robbins_monro(pertes_port, alpha_)
+
+        # affichage structuré des résultats
+        print(f"α={alpha_}")
+        print(f"  var_call_tri={v_call:.2f}")   # var du call (tri)
+        print(f"  cvar_call={c_call:.2f}")      # cvar du call (tri)
+        print(f"  var_call_rm={rm_call:.2f}")   # var du call (robbins-monro)
+        print(f"  var_port_tri={v_port:.2f}")   # var du portefeuille (tri)
+        print(f"  cvar_port={c_port:.2f}")      # cvar du portefeuille (tri)
+        print(f"  var_port_rm={rm_port:.2f}")   # var du portefeuille (robbins-monro)
+        print()
+
+
+
+    # question 2 : tracer la distribution conditionnelle des pertes > VaR99%
+    alpha_c = 0.99
+    var_cond = np.percentile(pertes_port, 100 * alpha_c)
+    pertes_extremes = pertes_port[pertes_port > var_cond]
+
+    # tracer l'histogramme des pertes extrêmes
+    plt.figure(figsize=(7,4))
+    plt.hist(pertes_extremes, density = 'true', bins=30, color='darkred', alpha=0.7, edgecolor='black')
+    plt.title("distribution conditionnelle : pertes > VaR99%")
     plt.xlabel("Perte")
-    plt.ylabel("Densité")
+    plt.ylabel("Fréquence")
+    plt.grid(True)
+    plt.tight_layout()
+    terminer("extension2_pertes_extremes")
+
+    # question 3 : etude de l'influence de la composition du portefeuille
+    def composition_short(i):
+        return -10, -5
+
+    def composition_long(i):
+        return 10, 5
+
+    def composition_mixte(i):
+        return (10, 5) if i < I0 // 2 else (-10, -5)
+
+    compositions = {
+        "Short": composition_short,
+        "Long": composition_long,
+        "Mixte": composition_mixte
+    }
+
+    resultats = {}
+
+    # les trois compositions sont réévaluées ensemble sur les mêmes scénarios
+    portefeuilles = Portefeuille.depuis_compositions(compositions, I0, K, sigma, T, grille)
+    pertes_compositions = executer_en_parallele(functools.partial(simuler_pertes, portefeuilles), Nmc, graine)
+
+    for c, nom in enumerate(portefeuilles.noms):
+        pertes = pertes_compositions[:, c]
+        var99, cvar99 = var_cvar(pertes, 0.99)
+        resultats[nom] = (var99, cvar99)
+
+        # tracer la distribution avec la VaR à 99%
+        plt.figure(figsize=(6, 4))
+        plt.hist(pertes, density = 'true', bins=50, alpha=0.7, color='steelblue', edgecolor='black')
+        plt.axvline(var99, color='red', linestyle='--', label=f"VaR 99% = {var99:.2f}")
+        plt.title(f"Densité des pertes - {nom}")
+        plt.xlabel("Perte")
+        plt.ylabel("Densité")
+        plt.legend()
+        plt.grid(True)
+        plt.tight_layout()
+        terminer(f"extension2_densite_{nom}")
+
+    # question 4 : moments des pertes par Monte Carlo et par quasi-Monte Carlo randomisé
+    # (n_replications brouillages indépendants : la dispersion des répliques donne l'erreur type)
+    n_replications = 16
+    tailles = 2 ** np.arange(8, 15)
+    rng = np.random.default_rng(graine)
+    plt.figure(figsize=(7, 4))
+    for qmc, nom in ((False, "Monte Carlo"), (True, "QMC (Sobol brouillé)")):
+        repliques = [replications(lambda g: moments(simuler_pertes(portefeuille, n, g, qmc)), n_replications, rng)
+                     for n in tailles]
+        estimation = np.array([r["estimation"] for r in repliques])
+        erreur = np.array([r["erreur_type"] for r in repliques])
+        # barres d'erreur à 2 erreurs types, abscisses légèrement décalées pour les distinguer
+        plt.errorbar(tailles * (1.1 if qmc else 1), estimation[:, 0], yerr=2 * erreur[:, 0], capsize=3,
+                     marker='o', label=nom)
+        print(f"{nom} ({n_replications} x {tailles[-1]} tirages) : E[perte] = {estimation[-1, 0]:.3f} "
+              f"± {erreur[-1, 0]:.3f}, E[perte²] = {estimation[-1, 1]:.1f} ± {erreur[-1, 1]:.1f}")
+    plt.xscale("log", base=2)
+    plt.title(f"Perte moyenne du portefeuille ({n_replications} répliques par taille)")
+    plt.xlabel("Nombre de tirages par réplique")
+    plt.ylabel("E[perte] ± 2 erreurs types")
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    terminer("extension2_qmc_moments")
@@ -1,6 +1,19 @@
+import functools
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import statistiques
+from defauts import (PortefeuilleEntreprises, esperance_conditionnelle, esperance_conditionnelle_ponderee,
+                     proba_au_moins, proba_au_moins_ponderee)
+from defauts_analytique import echantillonnage_preferentiel, proba_au_moins_analytique
+from graphiques import terminer_tout
+from parallele import executer_en_parallele
+from qmc import replications
+
 # Paramètres du modèle
 N = 125               # Nombre d'entreprises
 T = 1.0               # Durée de l'horizon (en années)
@@ -10,97 +23,98 @@ S0 = 100              # Valeur initiale de chaque actif
 B = 50                # Seuil de défaut
 sigma = 0.4           # Volatilité constante
 R = 0.3               # Taux de recouvrement constant
-Nmc = 1000            # Nombre de simulations Monte Carlo (à augmenter si besoin)
-
-# Liste des temps de simulation
-times = [k * dt for k in range(n_steps + 1)]
+rho = 0               # Corrélation entre entreprises (0 = indépendantes, hypothèse de l'étude)
+rho_scenario = 0.3    # Scénario supplémentaire : corrélation du modèle à un facteur
+pont_brownien = False # True : surveillance continue de la barrière (correction par pont brownien entre les dates)
+Nmc = 100000          # Nombre de simulations Monte Carlo (à augmenter si besoin)
+graine = None         # Graine aléatoire (entier pour des résultats reproductibles)
+
+# Portefeuille des N entreprises, observées aux dates mensuelles t_1, ..., t_12
+# Chaque choc mensuel = sqrt(rho) * facteur commun + sqrt(1 - rho) * bruit propre à l'entreprise
+def creer_portefeuille(rho):
+    return PortefeuilleEntreprises(N, S0, B, sigma, R, T, n_steps, chargements=np.sqrt(rho) if rho > 0 else None,
+                                   pont_brownien=pont_brownien)
+
+portefeuille = creer_portefeuille(rho)
 #Ici on initialise tout ce qui est fixé dans l'énoncé. On va simuler la trajectoire de chaque entreprise à ces dates mensuelles.
 
-# Résultats à stocker
-L_star_list = []      # Nombre de défauts par simulation
-Pi_star_list = []     # Dette totale Π_T^* par simulation
-
-
-# Simulation des trajectoires et détection du défaut
-for sim in range(Nmc):
-    L_star = 0        # Nombre de défauts dans ce scénario
-    Pi_star = 0.0     # Dette dans ce scénario
-
-    for i in range(N):  # Pour chaque entreprise
-        S = S0
-        defaulted = False
-
-        for t in times:  # Pour chaque date mensuelle
-            Z = np.random.randn()  # Incrément brownien
-            S = S * np.exp(-0.5 * sigma**2 * dt + sigma * np.sqrt(dt) * Z)
-
-            # Si l'entreprise passe sous le seuil B pour la première fois
-            if not defaulted and S <= B:
-                L_star += 1
-                Pi_star += R * S  # On comptabilise la dette à cette date
-                defaulted = True  # On ne compte qu'une fois le défaut
-
-    # On stocke le résultat de cette simulation
-    L_star_list.append(L_star)
-    Pi_star_list.append(Pi_star)
-
-
-# Convertir les listes en tableaux numpy
-L_star_array = np.array(L_star_list)
-Pi_star_array = np.array(Pi_star_list)
-
-
-# Calcul de P[L* ≥ K]
-K_vals = list(range(1, 101))  # Valeurs de K de 1 à 100
-P_L_geq_K = []
-
-for K in K_vals:
-    nb_geq = np.sum(L_star_array >= K)  # Nombre de fois où L* ≥ K
-    proba = nb_geq / Nmc
-    P_L_geq_K.append(proba)
-
-#Calcul de E[Π_T^* | L* > K]
-K_plot = list(range(10, 101, 10))  # Tous les 10 défauts
-E_Pi_cond = []
-
-for K in K_plot:
-    indices = L_star_array > K
-    if np.any(indices):
-        expectation = np.mean(Pi_star_array[indices])
-    else:
-        expectation = 0  # Aucun scénario ne satisfait la condition
-    E_Pi_cond.append(expectation)
-
-#Fonction de répartition de la dette Π_T^*
-x_vals = np.linspace(0, max(Pi_star_array), 200)
-cdf_vals = []
-
-for x in x_vals:
-    cdf_vals.append(np.mean(Pi_star_array <= x))
-
-
-# Graphique 1 : P[L* ≥ K]
-plt.figure()
-plt.plot(K_vals, P_L_geq_K)
-plt.xlabel("K")
-plt.ylabel("P[L* ≥ K]")
-plt.title("Probabilité que le nombre de défauts dynamiques ≥ K")
-plt.grid()
-
-# Graphique 2 : E[Π_T^* | L* > K]
-plt.figure()
-plt.plot(K_plot, E_Pi_cond, marker='o')
-plt.xlabel("K")
-plt.ylabel("E[Π_T^* | L* > K]")
-plt.title("Espérance de la dette conditionnelle")
-plt.grid()
-
-# Graphique 3 : Fonction de répartition de la dette Π_T^*
-plt.figure()
-plt.plot(x_vals, cdf_vals)
-plt.xlabel("x")
-plt.ylabel("P[Π_T^* ≤ x]")
-plt.title("Fonction de répartition de la dette Π_T^*")
-plt.grid()
-
-plt.show()
+if __name__ == "__main__":
+    # Simulation des trajectoires et détection du défaut : le tenseur (scénarios, entreprises, dates)
+    # des log-valeurs est simulé par blocs, la date de défaut est le premier passage sous B.
+    # Les scénarios sont répartis en tranches sur tous les cœurs (résultat indépendant du nombre de cœurs)
+    resultats = executer_en_parallele(portefeuille.simuler, Nmc, graine)
+    L_star_array = resultats["L"]     # Nombre de défauts par simulation
+    Pi_star_array = resultats["Pi"]   # Dette totale Π_T^* par simulation
+
+
+    # Calcul de P[L* ≥ K]
+    K_vals = np.arange(1, 101)  # Valeurs de K de 1 à 100
+    P_L_geq_K = proba_au_moins(L_star_array, K_vals, N)
+    # Loi sans simulation, exacte pour des entreprises indépendantes (convolution des Bernoulli) ;
+    # elle n'existe pas pour le modèle à un facteur par date (rho > 0)
+    P_L_geq_K_analytique = proba_au_moins_analytique(portefeuille, K_vals) if rho == 0 else None
+
+    # Scénario corrélé : mêmes entreprises, chocs liés par un facteur commun
+    portefeuille_correle = creer_portefeuille(rho_scenario)
+    L_correle = executer_en_parallele(portefeuille_correle.simuler, Nmc, graine)["L"]
+    P_L_geq_K_correle = proba_au_moins(L_correle, K_vals, N)
+
+    # Probabilités de défauts du scénario corrélé par Monte Carlo et par quasi-Monte Carlo randomisé
+    # (Sobol brouillé + pont brownien) : erreurs types tirées de 16 répliques indépendantes
+    K_qmc = np.array([1, 10, 20, 40])
+    rng = np.random.default_rng(graine)
+    for qmc, nom in ((False, "Monte Carlo"), (True, "QMC")):
+        repliques = replications(lambda g: proba_au_moins(portefeuille_correle.simuler(2 ** 12, rng=g, qmc=qmc)["L"],
+                                                          K_qmc, N), 16, rng)
+        print(f"{nom:11s} ρ = {rho_scenario} : " + ", ".join(
+            f"P[L* ≥ {K}] = {p:.4f} ± {e:.4f}"
+            for K, p, e in zip(K_qmc, repliques["estimation"], repliques["erreur_type"])))
+
+    #Calcul de E[Π_T^* | L* > K]
+    K_plot = np.arange(10, 101, 10)  # Tous les 10 défauts
+    E_Pi_cond = esperance_conditionnelle(L_star_array, Pi_star_array, K_plot)
+
+    #Fonction de répartition de la dette Π_T^* sur 200 points de 0 à max(Π_T^*) inclus
+    # (grille de np.linspace(0, max, 200) : la borne supérieure de fonction_repartition est exclue)
+    x_vals, cdf_vals = statistiques.fonction_repartition(Pi_star_array, 0, max(Pi_star_array) * 200 / 199, 200)
+
+    # Défauts en masse : pour K grand, le comptage direct donne 0. On simule sous une loi
+    # décalée vers les scénarios à K défauts, pondérés par le rapport de vraisemblance.
+    for K in (80, 100, 120):
+        parametres_is = echantillonnage_preferentiel(portefeuille, K)
+        scenarios_is = executer_en_parallele(functools.partial(portefeuille.simuler, **parametres_is), Nmc, graine)
+        p_K, erreur_p = proba_au_moins_ponderee(scenarios_is["L"], scenarios_is["poids"], [K])
+        e_K, erreur_e = esperance_conditionnelle_ponderee(scenarios_is["L"], scenarios_is["Pi"], scenarios_is["poids"], [K])
+        print(f"K={K} : P[L* ≥ K] = {p_K[0]:.3e} ± {erreur_p[0]:.1e}, "
+              f"E[Π_T^* | L* > K] = {e_K[0]:.2f} ± {erreur_e[0]:.2f}")
+
+
+    # Graphique 1 : P[L* ≥ K]
+    plt.figure()
+    plt.plot(K_vals, P_L_geq_K, label="Monte Carlo")
+    if P_L_geq_K_analytique is not None:
+        plt.plot(K_vals, P_L_geq_K_analytique, linestyle="--", label="Exacte (indépendantes)")
+    plt.plot(K_vals, P_L_geq_K_correle, label=f"Monte Carlo, ρ = {rho_scenario}")
+    plt.xlabel("K")
+    plt.ylabel("P[L* ≥ K]")
+    plt.title("Probabilité que le nombre de défauts dynamiques ≥ K")
+    plt.legend()
+    plt.grid()
+
+    # Graphique 2 : E[Π_T^* | L* > K]
+    plt.figure()
+    plt.plot(K_plot, E_Pi_cond, marker='o')
+    plt.xlabel("K")
+    plt.ylabel("E[Π_T^* | L* > K]")
+    plt.title("Espérance de la dette conditionnelle")
+    plt.grid()
+
+    # Graphique 3 : Fonction de répartition de la dette Π_T^*
+    plt.figure()
+    plt.plot(x_vals, cdf_vals)
+    plt.xlabel("x")
+    plt.ylabel("P[Π_T^* ≤ x]")
+    plt.title("Fonction de répartition de la dette Π_T^*")
+    plt.grid()
+
+    terminer_tout("extension1")
@@ -1,6 +1,14 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import statistiques
+from defauts import PortefeuilleEntreprises, esperance_conditionnelle, proba_au_moins
+from graphiques import terminer_tout
+
 # paramètres du modèle
 nb_entreprises = 125
 T = 1.0  # en années
@@ -10,64 +18,25 @@ val_init = 100
 seuil_defaut = 50
 volatilite = 0.4
 taux_recouvrement = 0.3
-Nmc = 1000
-
-t = [k*dt for k in range(N+1)]
-
-liste_defauts = []
-liste_dettes = []
-
-# simulations
-for n in range(Nmc):
-    defauts = 0
-    dette = 0
-
-    for _ in range(nb_entreprises):
-        s = val_init
-        a_defaut = False
+Nmc = 100000
 
-        for i in t:
-            z = np.random.randn()
-            s = s*np.exp(-0.5*volatilite**2*dt + volatilite*np.sqrt(dt)*z)
+entreprises = PortefeuilleEntreprises(nb_entreprises, val_init, seuil_defaut, volatilite, taux_recouvrement, T, N)
 
-            if not a_defaut and s <= seuil_defaut:
-                defauts += 1
-                dette += taux_recouvrement*s
-                a_defaut = True
-
-    liste_defauts.append(defauts)
-    liste_dettes.append(dette)
-
-defauts_arr = np.array(liste_defauts)
-dettes_arr = np.array(liste_dettes)
+# simulations (par blocs de scénarios, toutes les entreprises et dates à la fois)
+resultats = entreprises.simuler(Nmc)
+defauts_arr = resultats["L"]
+dettes_arr = resultats["Pi"]
 
 # proba que nb de défauts >= k
-valeurs_k = list(range(1,101))
-probas = []
-
-for k in valeurs_k:
-    nb = np.sum(defauts_arr >= k)
-    proba = nb/Nmc
-    probas.append(proba)
+valeurs_k = np.arange(1, 101)
+probas = proba_au_moins(defauts_arr, valeurs_k, nb_entreprises)
 
 # esperance de la dette sachant nb defauts > k
-k_pour_plot = list(range(10,101,10))
-esp_cond = []
-
-for k in k_pour_plot:
-    indices = defauts_arr > k
-    if np.any(indices):
-        esp = np.mean(dettes_arr[indices])
-    else:
-        esp = 0
-    esp_cond.append(esp)
+k_pour_plot = np.arange(10, 101, 10)
+esp_cond = esperance_conditionnelle(defauts_arr, dettes_arr, k_pour_plot)
 
 # fonction de repartition de la dette
-x_det = np.linspace(0, max(dettes_arr), 200)
-cdf = []
-
-for x in x_det:
-    cdf.append(np.mean(dettes_arr <= x))
+x_det, cdf = statistiques.fonction_repartition(dettes_arr, 0, max(dettes_arr), 200)
 
 # courbe 1
 plt.figure()
@@ -93,4 +62,4 @@ plt.ylabel("P[dette ≤ x]")
 plt.title("fonction de répartition de la dette")
 plt.grid()
 
-plt.show()
+terminer_tout("extension1_2")
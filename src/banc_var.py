@@ -0,0 +1,181 @@
+import csv
+import json
+import math
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from black_scholes import quantile_normale
+from reduction_variance import controles_gbm, quantile_controle
+from robbins_monro import robbins_monro_chaines, robbins_monro_is, robbins_monro_moyenne, tirage_X, transformation_gbm
+from trajectoires import TAILLE_BLOC, simuler_S_T, simuler_X
+from var_flux import EstimateurVaR
+
+# ====================================================
+# Banc d'essai : coût pour atteindre une précision donnée sur la VaR de X = S_T - B
+# ====================================================
+
+S0 = 100
+sigma = 0.4
+r = 0.0
+
+# Tirages de la phase de démarrage des variantes de Robbins-Monro à gain automatique
+# (n_pilote par défaut de robbins_monro_chaines / robbins_monro_moyenne / robbins_monro_is)
+N_PILOTE = 1000
+
+# Taille des mini-lots des variantes moyennées
+M_LOT = 100
+
+
+def quantile_exact(S0, sigma, T, B, alpha, r=0.0):
+    """Quantile d'ordre alpha de X = S_T - B (loi log-normale de S_T)."""
+    return S0 * math.exp((r - 0.5 * sigma ** 2) * T + sigma * math.sqrt(T) * float(quantile_normale(alpha))) - B
+
+
+# Cas de test (B, alpha, T, description), repris par Rendu 1/travail4.py
+CAS_TEST = [
+    (100, 0.01, 1.0, "B=100, α=1%, T=1 an"),
+    (100, 0.001, 1.0, "B=100, α=0.1%, T=1 an"),
+    (100, 0.01, 10/365, "B=100, α=1%, T=10 jours"),
+    (100, 0.001, 10/365, "B=100, α=0.1%, T=10 jours"),
+    (50, 0.01, 1.0, "B=50, α=1%, T=1 an"),
+    (50, 0.001, 1.0, "B=50, α=0.1%, T=1 an"),
+    (36, 0.01, 1.0, "B=36, α=1%, T=1 an")
+]
+
+
+def _tri(T, B, alpha, n):
+    return np.sort(simuler_X(S0, sigma, T, B, n, r))[int(n * alpha)]
+
+
+def _flux(methode):
+    def estimer(T, B, alpha, n):
+        estimateur = EstimateurVaR(alpha, n, queue="basse", methode=methode)
+        for debut in range(0, n, TAILLE_BLOC):
+            estimateur.ajouter(simuler_X(S0, sigma, T, B, min(TAILLE_BLOC, n - debut), r))
+        return estimateur.resultat()["var"]
+    return estimer
+
+
+def _controle(T, B, alpha, n):
+    S_T = simuler_S_T(S0, sigma, T, n, r)
+    C, esperances = controles_gbm(S_T, S0, sigma, T, r, K=[np.quantile(S_T, alpha)])
+    return quantile_controle(S_T - B, C, esperances, alpha)["quantile"]
+
+
+# Chaque méthode : fonction (T, B, alpha, n) -> estimation du quantile z* de X, nombre de
+# tirages supplémentaires (phase de démarrage) et taille maximale essayée. Les méthodes
+# sont les noyaux des modules partagés sur lesquels reposent les scripts :
+#   tri          : calculer_var (travail5_Valentin), var_cvar (Extension2) ;
+#   np.quantile  : empirical_var (travail4) ;
+#   flux/...     : empirical_var_flux (travail4) ;
+#   controle     : empirical_var_controle (travail4) ;
+#   rm/chaines   : robbins_monro_var (travail4), robbins_monro_normal (travail3) ;
+#   rm/is        : robbins_monro_var_is (travail4) ;
+#   rm/moyenne   : robbins_monro_var_moyenne (travail4), robbins_monro (Extension2).
+# Le quantile est toujours lu avant la troncature VaR = max(-z*, 0) des scripts :
+# sans quoi une estimation nulle passerait pour exacte dès que z* est proche de 0 (cas B = 36).
+METHODES = {
+    "tri": (_tri, 0, 2 ** 22),
+    "np.quantile": (lambda T, B, alpha, n: np.quantile(simuler_X(S0, sigma, T, B, n, r), alpha), 0, 2 ** 22),
+    "flux/exact": (_flux("exact"), 0, 2 ** 22),
+    "flux/esquisse": (_flux("esquisse"), 0, 2 ** 22),
+    "controle": (_controle, 0, 2 ** 22),
+    "rm/chaines": (
+        lambda T, B, alpha, n: robbins_monro_chaines(tirage_X(S0, sigma, T, B, r), alpha, None, None, n,
+                                                     gain="densite")[0][0], N_PILOTE, 2 ** 17),
+    "rm/is": (
+        lambda T, B, alpha, n: robbins_monro_is(*transformation_gbm(S0, sigma, T, B, r), alpha, None, None, n,
+                                                gain="densite")[0][0], N_PILOTE, 2 ** 17),
+    "rm/moyenne": (
+        lambda T, B, alpha, n: robbins_monro_moyenne(tirage_X(S0, sigma, T, B, r), alpha, None, None, n // M_LOT,
+                                                     m=M_LOT, gain="densite")["var"][0], N_PILOTE, 2 ** 22),
+}
+
+
+def mesurer(methode, T, B, alpha, cible=0.01, n_repetitions=5, n_min=2 ** 10, graine=0, absolue=False):
+    """
+    Double la taille n de l'échantillon jusqu'à ce que l'erreur quadratique moyenne sur
+    n_repetitions répétitions indépendantes passe sous cible. L'erreur est relative au
+    quantile lui-même, |z - z*| / |z*| (cible exigeante lorsque z* est proche de 0,
+    comme pour B = 36), ou absolue (en euros) avec absolue=True.
+
+    Paramètres :
+        methode       : str, clé de METHODES.
+        T, B, alpha   : paramètres du cas de test.
+        cible         : float, erreur visée (relative, ou en euros si absolue).
+        n_repetitions : int, nombre de répétitions par taille.
+        n_min         : int, première taille essayée.
+        graine        : int, graine de np.random (état global utilisé par défaut par les modules).
+        absolue       : bool, erreur absolue au lieu de relative.
+
+    Renvoie :
+        dict : atteinte, n (taille de l'échantillon), n_tirages (démarrage compris),
+               erreur (relative ou absolue), temps_s (durée moyenne d'une estimation),
+               memoire_pic_octets (pic d'allocation mesuré par tracemalloc sur une estimation).
+    """
+    estimer, surcout, n_max = METHODES[methode]
+    z_exact = quantile_exact(S0, sigma, T, B, alpha, r)
+    echelle = 1.0 if absolue else abs(z_exact)
+    n = n_min
+    while True:
+        np.random.seed(graine)
+        debut = time.perf_counter()
+        estimations = np.array([estimer(T, B, alpha, n) for _ in range(n_repetitions)])
+        temps = (time.perf_counter() - debut) / n_repetitions
+        erreur = math.sqrt(np.mean((estimations - z_exact) ** 2)) / echelle
+        if erreur <= cible or 2 * n > n_max:
+            break
+        n *= 2
+    tracemalloc.start()
+    estimer(T, B, alpha, n)
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "atteinte": bool(erreur <= cible),
+        "n": n,
+        "n_tirages": n + surcout,
+        "erreur": erreur,
+        "temps_s": temps,
+        "memoire_pic_octets": pic,
+    }
+
+
+def executer(methodes=None, cas_test=None, cible=0.01, n_repetitions=5, sortie=None, absolue=False):
+    """
+    Lance mesurer pour chaque méthode et chaque cas de CAS_TEST, affiche un tableau
+    et écrit les résultats dans sortie + ".json" et sortie + ".csv" (si sortie est donné).
+    absolue : voir mesurer.
+
+    Renvoie :
+        liste de dict, une ligne par (méthode, cas).
+    """
+    methodes = list(METHODES) if methodes is None else methodes
+    cas_test = CAS_TEST if cas_test is None else cas_test
+    resultats = []
+    for B, alpha, T, description in cas_test:
+        for methode in methodes:
+            ligne = {"methode": methode, "cas": description, "B": B, "alpha": alpha, "T": T, "cible": cible,
+                     "absolue": absolue, "z_exact": quantile_exact(S0, sigma, T, B, alpha, r)}
+            ligne.update(mesurer(methode, T, B, alpha, cible, n_repetitions, absolue=absolue))
+            resultats.append(ligne)
+            print(f"{description:28s} {methode:30s} {'ok ' if ligne['atteinte'] else 'NON'} "
+                  f"n={ligne['n_tirages']:>8d}  erreur={ligne['erreur']:.4f}  "
+                  f"{1000 * ligne['temps_s']:9.2f} ms  {ligne['memoire_pic_octets'] / 2 ** 20:8.2f} Mo")
+    if sortie is not None:
+        with open(sortie + ".json", "w", encoding="utf-8") as f:
+            json.dump(resultats, f, ensure_ascii=False, indent=1)
+        with open(sortie + ".csv", "w", newline="", encoding="utf-8") as f:
+            ecrivain = csv.DictWriter(f, fieldnames=list(resultats[0]))
+            ecrivain.writeheader()
+            ecrivain.writerows(resultats)
+    return resultats
+
+
+if __name__ == "__main__":
+    # python banc_var.py [préfixe des fichiers de sortie] [erreur relative visée | erreur en euros suivie de "€"]
+    cible = sys.argv[2] if len(sys.argv) > 2 else "0.01"
+    executer(cible=float(cible.rstrip("€")), absolue=cible.endswith("€"),
+             sortie=sys.argv[1] if len(sys.argv) > 1 else "banc_var")
@@ -0,0 +1,330 @@
+import math
+
+import numpy as np
+
+try:
+    from scipy.special import ndtr, ndtri
+except ImportError:
+    ndtr = ndtri = None
+
+# ====================================================
+# Formules de Black-Scholes vectorisées (tableaux de sous-jacents, strikes, ...)
+# ====================================================
+
+# Approximations rationnelles de erf et erfc (bibliothèque Cephes, précision machine)
+_ERF_T = [9.60497373987051638749e0, 9.00260197203842689217e1, 2.23200534594684319226e3,
+          7.00332514112805075473e3, 5.55923013010394962768e4]
+_ERF_U = [1.0, 3.35617141647503099647e1, 5.21357949780152679795e2, 4.59432382970980127987e3,
+          2.26290000613890934246e4, 4.92673942608635921086e4]
+_ERFC_P = [2.46196981473530512524e-10, 5.64189564831068821977e-1, 7.46321056442269912687e0,
+           4.86371970985681366614e1, 1.96520832956077098242e2, 5.26445194995477358631e2,
+           9.34528527171957607540e2, 1.02755188689515710272e3, 5.57535335369399327526e2]
+_ERFC_Q = [1.0, 1.32281951154744992508e1, 8.67072140885989742329e1, 3.54937778887819891062e2,
+           9.75708501743205489753e2, 1.82390916687909736289e3, 2.24633760818710981792e3,
+           1.65666309194161350182e3, 5.57535340817727675546e2]
+_ERFC_R = [5.64189583547755073984e-1, 1.27536670759978104416e0, 5.01905042251180477414e0,
+           6.16021097993053585195e0, 7.40974269950448939160e0, 2.97886665372100240670e0]
+_ERFC_S = [1.0, 2.26052863220117276590e0, 9.39603524938001434673e0, 1.20489539808096656605e1,
+           1.70814450747565897222e1, 9.60896809063285878198e0, 3.36907645100081516050e0]
+
+# Approximation de départ de la fonction quantile (P. J. Acklam), affinée par un pas de Halley
+_QUANTILE_A = [-3.969683028665376e1, 2.209460984245205e2, -2.759285104469687e2,
+               1.383577518672690e2, -3.066479806614716e1, 2.506628277459239e0]
+_QUANTILE_B = [-5.447609879822406e1, 1.615858368580409e2, -1.556989798598866e2,
+               6.680131188771972e1, -1.328068155288572e1, 1.0]
+_QUANTILE_C = [-7.784894002430293e-3, -3.223964580411365e-1, -2.400758277161838e0,
+               -2.549732539343734e0, 4.374664141464968e0, 2.938163982698783e0]
+_QUANTILE_D = [7.784695709041462e-3, 3.224671290700398e-1, 2.445134137142996e0,
+               3.754408661907416e0, 1.0]
+
+
+def _exp_moins_carre(x, c=1.0):
+    """
+    exp(-c x^2) sans amplifier l'arrondi de x^2 : x = m + f avec m multiple de 1/128,
+    de sorte que m^2 est exact et que seul le petit terme 2 m f + f^2 est arrondi.
+    """
+    m = np.round(x * 128) / 128
+    with np.errstate(invalid="ignore", under="ignore"):
+        f = np.where(np.isfinite(x), x - m, 0.0)
+        return np.exp(-c * (m * m)) * np.exp(-c * (2 * m * f + f * f))
+
+
+def _erfc(x, exp_carre=None):
+    """
+    Fonction d'erreur complémentaire, vectorisée (repli sans scipy).
+    exp_carre : exp(-x^2) déjà calculé (voir _ndtr), _exp_moins_carre(x) par défaut.
+    """
+    a = np.abs(x)
+    z = a * a
+    with np.errstate(over="ignore", under="ignore", invalid="ignore", divide="ignore"):
+        petit = 1 - a * np.polyval(_ERF_T, z) / np.polyval(_ERF_U, z)
+        grand = (_exp_moins_carre(a) if exp_carre is None else exp_carre) * np.where(a < 8, np.polyval(_ERFC_P, a) / np.polyval(_ERFC_Q, a),
+                                      np.polyval(_ERFC_R, a) / np.polyval(_ERFC_S, a))
+    y = np.where(a < 1, petit, np.where(np.isinf(a), 0.0, grand))
+    return np.where(x < 0, 2 - y, y)
+
+
+def _ndtr(x):
+    """
+    Fonction de répartition de N(0, 1) par erfc (sans perte de précision dans la queue basse).
+    exp(-x^2 / 2) est calculé à partir de x lui-même : l'arrondi de x / sqrt(2), amplifié
+    par x^2 dans l'exponentielle, est ainsi évité.
+    """
+    x = np.asarray(x, dtype=float)
+    return 0.5 * _erfc(-x / math.sqrt(2), _exp_moins_carre(x, 0.5))
+
+
+def _ndtri(p):
+    """Fonction quantile de N(0, 1) sur ]0, 1[ : approximation d'Acklam puis un pas de Halley."""
+    q = np.minimum(p, 1 - p)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # queue : q < 0.02425, centre sinon ; calculés sur tout le tableau puis sélectionnés
+        t = np.sqrt(-2 * np.log(q))
+        x_queue = np.polyval(_QUANTILE_C, t) / np.polyval(_QUANTILE_D, t)
+        u = q - 0.5
+        v = u * u
+        x_centre = u * np.polyval(_QUANTILE_A, v) / np.polyval(_QUANTILE_B, v)
+        x = np.where(q < 0.02425, x_queue, x_centre)
+        e = _ndtr(x) - q
+        h = e * math.sqrt(2 * math.pi) * np.exp(0.5 * x * x)
+        x = x - h / (1 + 0.5 * x * h)
+    return np.where(p > 0.5, -x, x)
+
+
+def repartition_normale(x):
+    """
+    Fonction de répartition de la loi normale centrée réduite, appliquée élément
+    par élément à un tableau (scipy.special.ndtr si scipy est installé, approximation
+    rationnelle vectorisée de erfc sinon).
+    """
+    x = np.asarray(x, dtype=float)
+    if ndtr is not None:
+        return ndtr(x)
+    return _ndtr(x)
+
+
+def quantile_normale(p):
+    """
+    Inverse de la fonction de répartition de la loi normale centrée réduite, élément par
+    élément (scipy.special.ndtri si scipy est installé, approximation d'Acklam affinée
+    par un pas de Halley sinon).
+    """
+    p = np.asarray(p, dtype=float)
+    if ndtri is not None:
+        return ndtri(p)
+    interieur = (p > 0) & (p < 1)
+    q = np.where(p < 0.5, -np.inf, np.inf)
+    q[interieur] = _ndtri(p[interieur])
+    return q
+
+
+def densite_normale(x):
+    """Densité de la loi normale centrée réduite, élément par élément."""
+    x = np.asarray(x, dtype=float)
+    return np.exp(-0.5 * x ** 2) / math.sqrt(2 * math.pi)
+
+
+def black_scholes(S, K, sigma, T, r=0.0, grecques=False):
+    """
+    Prix des calls et puts européens pour des tableaux de paramètres, en une passe :
+    d1, d2 et les valeurs N(d1), N(d2) sont calculés une seule fois et partagés
+    entre le call, le put (N(-d) = 1 - N(d)) et les grecques.
+
+    Les paramètres sont diffusés entre eux (règles de broadcasting de numpy) :
+    par exemple S de forme (Nmc, I0) et K, sigma, T de forme (I0,).
+    Si sigma * sqrt(T) = 0, les prix valent la valeur intrinsèque actualisée.
+
+    Paramètres :
+        S        : float ou array, valeur du sous-jacent.
+        K        : float ou array, strike.
+        sigma    : float ou array, volatilité.
+        T        : float ou array, maturité résiduelle.
+        r        : float ou array, taux d'intérêt (0 par défaut).
+        grecques : bool, si True, calcule aussi les deltas et le gamma.
+
+    Renvoie un dictionnaire de tableaux de la forme diffusée :
+        call, put             : prix du call et du put.
+        delta_call, delta_put : deltas (si grecques=True).
+        gamma                 : gamma, commun au call et au put (si grecques=True).
+    """
+    S, K, sigma, T, r = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (S, K, sigma, T, r)))
+    ecart_type = sigma * np.sqrt(T)
+    actualisation = np.exp(-r * T)
+    degenere = ecart_type <= 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / ecart_type
+        d2 = d1 - ecart_type
+    if degenere.any():
+        # Maturité ou volatilité nulle : N(d1) = N(d2) = 1{S > K e^{-rT}}
+        dans_la_monnaie = np.where(S > K * actualisation, np.inf, -np.inf)
+        d1 = np.where(degenere, dans_la_monnaie, d1)
+        d2 = np.where(degenere, dans_la_monnaie, d2)
+    N1 = repartition_normale(d1)
+    N2 = repartition_normale(d2)
+    K_actualise = K * actualisation
+    resultat = {
+        "call": S * N1 - K_actualise * N2,
+        "put": K_actualise * (1 - N2) - S * (1 - N1),
+    }
+    if grecques:
+        resultat["delta_call"] = N1
+        resultat["delta_put"] = N1 - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gamma = densite_normale(d1) / (S * ecart_type)
+        resultat["gamma"] = np.where(degenere, 0.0, gamma)
+    return resultat
+
+
+def call(S, K, sigma, T, r=0.0):
+    """Prix d'un call européen (voir black_scholes)."""
+    return black_scholes(S, K, sigma, T, r)["call"]
+
+
+def put(S, K, sigma, T, r=0.0):
+    """Prix d'un put européen (voir black_scholes)."""
+    return black_scholes(S, K, sigma, T, r)["put"]
+
+
+# ====================================================
+# Tarification tabulée : grille de spots adaptative et interpolation d'Hermite
+# ====================================================
+
+class GrilleBlackScholes:
+    """
+    Tarificateur à cache : pour chaque clé (K, sigma, T, r), le prix du call et son
+    delta exacts sont tabulés une fois pour toutes sur une grille de spots, puis
+    chaque réévaluation devient une recherche dichotomique suivie d'une interpolation
+    cubique d'Hermite (valeurs et dérivées exactes aux noeuds). Le put est déduit
+    par parité call-put.
+
+    La grille couvre [K e^{-a}, K e^{a}] avec a = n_ecarts_types * sigma * sqrt(T) ;
+    elle est raffinée par dichotomie jusqu'à ce que l'erreur d'interpolation, mesurée
+    au milieu de chaque intervalle, soit inférieure à tolerance. Les spots hors de la
+    grille sont tarifés exactement par black_scholes.
+
+    S'utilise comme black_scholes : grille.prix(S, K, sigma, T, r), ou simplement
+    grille(S, K, sigma, T, r), renvoie le dictionnaire {"call": ..., "put": ...}.
+    """
+
+    def __init__(self, tolerance=1e-8, n_ecarts_types=8.0, n_initial=65, n_max=2 ** 16):
+        """
+        Paramètres :
+            tolerance      : float, erreur absolue maximale visée sur le prix d'une option.
+            n_ecarts_types : float, demi-largeur de la grille en écarts types de log(S).
+            n_initial      : int, nombre de noeuds de la grille initiale (uniforme en log(S)).
+            n_max          : int, nombre maximal de noeuds par grille.
+        """
+        self.tolerance = tolerance
+        self.n_ecarts_types = n_ecarts_types
+        self.n_initial = n_initial
+        self.n_max = n_max
+        self.grilles = {}
+
+    @staticmethod
+    def _hermite(x, noeuds, valeurs, derivees, i):
+        """Interpolation d'Hermite cubique de x sur l'intervalle [noeuds[i], noeuds[i + 1]]."""
+        h = noeuds[i + 1] - noeuds[i]
+        t = (x - noeuds[i]) / h
+        t2, t3 = t * t, t * t * t
+        return ((2 * t3 - 3 * t2 + 1) * valeurs[i] + (t3 - 2 * t2 + t) * h * derivees[i]
+                + (-2 * t3 + 3 * t2) * valeurs[i + 1] + (t3 - t2) * h * derivees[i + 1])
+
+    def grille(self, K, sigma, T, r=0.0):
+        """
+        Renvoie (en la construisant au premier appel) la grille associée à (K, sigma, T, r) :
+            noeuds       : array (n,), spots de la grille (triés).
+            coefficients : array (4, n - 1), coefficients du polynôme d'Hermite de chaque
+                           intervalle en la variable x - noeuds[i] (schéma de Horner).
+            cases        : array, table d'accès direct vers l'intervalle contenant x.
+            largeur      : float, largeur des cases de la table.
+        """
+        cle = (float(K), float(sigma), float(T), float(r))
+        if cle not in self.grilles:
+            self.grilles[cle] = self._construire(*cle)
+        return self.grilles[cle]
+
+    def _construire(self, K, sigma, T, r):
+        a = self.n_ecarts_types * sigma * np.sqrt(T)
+        noeuds = K * np.exp(np.linspace(-a, a, self.n_initial))
+        exact = black_scholes(noeuds, K, sigma, T, r, grecques=True)
+        valeurs, derivees = exact["call"], exact["delta_call"]
+        while len(noeuds) < self.n_max:
+            i = np.arange(len(noeuds) - 1)
+            milieux = 0.5 * (noeuds[:-1] + noeuds[1:])
+            exact = black_scholes(milieux, K, sigma, T, r, grecques=True)
+            erreur = np.abs(self._hermite(milieux, noeuds, valeurs, derivees, i) - exact["call"])
+            a_raffiner = erreur > self.tolerance
+            if not a_raffiner.any():
+                break
+            ordre = np.argsort(np.concatenate((noeuds, milieux[a_raffiner])), kind="stable")
+            noeuds = np.concatenate((noeuds, milieux[a_raffiner]))[ordre]
+            valeurs = np.concatenate((valeurs, exact["call"][a_raffiner]))[ordre]
+            derivees = np.concatenate((derivees, exact["delta_call"][a_raffiner]))[ordre]
+        # p(x) = c0 + c1 u + c2 u^2 + c3 u^3, u = x - noeuds[i]
+        h = np.diff(noeuds)
+        pente = np.diff(valeurs) / h
+        coefficients = np.stack([valeurs[:-1], derivees[:-1],
+                                 (3 * pente - 2 * derivees[:-1] - derivees[1:]) / h,
+                                 (derivees[:-1] + derivees[1:] - 2 * pente) / h ** 2])
+        # Table d'accès direct : des cases de largeur au plus le plus petit intervalle
+        # contiennent chacune au plus un noeud, l'intervalle de x est donc
+        # cases[j] ou cases[j] + 1 avec j = floor((x - noeuds[0]) / largeur).
+        n_cases = int(np.ceil((noeuds[-1] - noeuds[0]) / h.min()))
+        if n_cases > 16 * self.n_max:
+            return noeuds, coefficients, None, None
+        largeur = (noeuds[-1] - noeuds[0]) / n_cases
+        cases = np.searchsorted(noeuds, noeuds[0] + largeur * np.arange(n_cases + 1), side="right") - 1
+        cases = np.minimum(cases, len(noeuds) - 2)
+        return noeuds, coefficients, cases, largeur
+
+    def _call(self, S, K, sigma, T, r):
+        """Prix du call pour un tableau de spots S et une clé (K, sigma, T, r) scalaire."""
+        if sigma * np.sqrt(T) <= 0:
+            return black_scholes(S, K, sigma, T, r)["call"]
+        noeuds, coefficients, cases, largeur = self.grille(K, sigma, T, r)
+        dedans = (S >= noeuds[0]) & (S < noeuds[-1])
+        if not dedans.all():
+            call = np.empty_like(S)
+            call[dedans] = self._call(S[dedans], K, sigma, T, r)
+            call[~dedans] = black_scholes(S[~dedans], K, sigma, T, r)["call"]
+            return call
+        if cases is None:
+            i = np.searchsorted(noeuds, S, side="right") - 1
+        else:
+            i = cases[((S - noeuds[0]) / largeur).astype(np.intp)]
+            i += S >= noeuds[i + 1]
+        u = S - noeuds.take(i)
+        call = coefficients[3].take(i)
+        for k in (2, 1, 0):
+            call *= u
+            call += coefficients[k].take(i)
+        return call
+
+    def prix(self, S, K, sigma, T, r=0.0):
+        """
+        Prix des calls et des puts, avec la même interface que black_scholes
+        (paramètres diffusés entre eux). Une grille est utilisée par valeur
+        distincte de (K, sigma, T, r).
+
+        Renvoie :
+            dict, call et put de la forme diffusée.
+        """
+        S = np.asarray(S, dtype=float)
+        K, sigma, T, r = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (K, sigma, T, r)))
+        # Regroupement des clés sur les seuls paramètres (avant diffusion avec S)
+        cles = np.stack([p.ravel() for p in (K, sigma, T, r)], axis=1)
+        uniques, groupe = np.unique(cles, axis=0, return_inverse=True)
+        forme = np.broadcast_shapes(S.shape, K.shape)
+        S = np.broadcast_to(S, forme)
+        if len(uniques) == 1:
+            call = self._call(S.ravel(), *uniques[0]).reshape(forme)
+        else:
+            groupe = np.broadcast_to(groupe.reshape(K.shape), forme)
+            call = np.empty(forme)
+            for g, cle in enumerate(uniques):
+                masque = groupe == g
+                call[masque] = self._call(S[masque], *cle)
+        put = call - S + K * np.exp(-r * T)
+        return {"call": call, "put": put}
+
+    __call__ = prix
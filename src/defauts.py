@@ -0,0 +1,480 @@
+import numpy as np
+
+from qmc import increments_pont_brownien, normales, tirage_quasi_aleatoire
+from trajectoires import _generateur
+
+# ====================================================
+# Moteur vectorisé de simulation des défauts d'un portefeuille d'entreprises
+# ====================================================
+
+# Nombre maximal de valeurs (scénarios x entreprises x dates) simulées à la fois :
+# borne la mémoire du tenseur des log-valeurs quel que soit Nmc.
+ELEMENTS_PAR_BLOC = 2 ** 22
+
+# Nombre maximal de passes du rejet de scenarios_tordus : une cellule en défaut demande
+# en moyenne 1 / p_i passes, le rejet est donc refusé plutôt qu'interminable si p_i -> 0.
+PASSES_REJET_MAX = 1000
+
+
+class PortefeuilleEntreprises:
+    """
+    Portefeuille de N entreprises dont les valeurs suivent des mouvements browniens
+    géométriques S_i(t) = S0_i exp((r - sigma_i^2 / 2) t + sigma_i W_i(t)),
+    observées aux dates t_k = k T / n_pas, k = 1, ..., n_pas.
+
+    L'entreprise i fait défaut à la première date où S_i(t_k) <= B_i ; sa dette
+    vaut alors R_i S_i(t_k). Pour chaque scénario on calcule :
+        L  : nombre d'entreprises en défaut avant T (L*).
+        Pi : dette totale des entreprises en défaut (Π_T^*).
+
+    Les paramètres S0, B, sigma, R sont des scalaires ou des tableaux (N,).
+
+    Corrélation des entreprises (indépendantes par défaut) :
+        - chargements : modèle gaussien à F facteurs, le choc de l'entreprise i à chaque
+          date vaut Z_i = sum_f a_if G_f + sqrt(1 - sum_f a_if^2) eps_i, avec G et eps
+          indépendants ; coût O(N F) par date. Un tableau (N,) ou un scalaire a donne
+          le modèle à un facteur (corrélation a_i a_j entre i et j).
+        - correlation : matrice (N, N) quelconque, appliquée via sa factorisation de
+          Cholesky calculée une fois pour toutes ; coût O(N^2) par date.
+
+    Avec facteur_horizon=True (modèle à facteurs), les facteurs G ne sont tirés qu'une fois
+    par scénario pour tout l'horizon : Z_i = sum_f a_if G_f / sqrt(n_pas) + sqrt(1 - sum_f a_if^2) eps_i
+    à chaque date. La composante commune de log S_i est alors une dérive sigma_i (a_i . G) t / sqrt(T),
+    S_i(T) garde sa loi et la corrélation a_i a_j, et sachant G les entreprises sont des
+    browniens géométriques indépendants de volatilité sigma_i sqrt(1 - sum_f a_if^2) : c'est
+    le modèle dont defauts_analytique.loi_nombre_defauts donne la loi exacte.
+
+    Avec pont_brownien=True, la surveillance de la barrière est continue : entre deux
+    dates où S_i reste au-dessus de B_i, le passage sous la barrière a lieu avec la
+    probabilité exacte exp(-2 (x_{k-1} - b)(x_k - b) / (sigma^2 dt)) du pont brownien
+    (x = log(S / S0), b = log(B / S0)), testée par un tirage uniforme (sigma^2 remplacé par la
+    variance idiosyncratique avec facteur_horizon, la composante commune étant linéaire). La dette d'une
+    entreprise en défaut vaut alors R_i B_i (valeur à l'instant du franchissement).
+
+    Les scénarios sont simulés par blocs sous forme d'un tenseur
+    (scénarios, entreprises, dates) de log-valeurs, et l'indice de premier passage
+    sous la barrière est obtenu par argmax sur l'axe des dates.
+
+    Avec qmc=True (simuler, iterer_scenarios), les gaussiennes des facteurs et des entreprises
+    proviennent d'une suite de Sobol brouillée de dimension (F + N) n_pas, par pont brownien :
+    les valeurs terminales des facteurs puis des entreprises occupent les premières dimensions
+    (avec facteur_horizon, les F facteurs occupent seuls les F premières dimensions).
+    Les blocs successifs prolongent la même suite.
+    """
+
+    def __init__(self, N, S0, B, sigma, R, T, n_pas, r=0.0, chargements=None, correlation=None,
+                 pont_brownien=False, facteur_horizon=False):
+        self.N = N
+        self.S0, self.B, self.sigma, self.R = (np.broadcast_to(np.asarray(p, dtype=float), (N,))
+                                               for p in (S0, B, sigma, R))
+        self.T = T
+        self.n_pas = n_pas
+        self.r = r
+        self.pont_brownien = pont_brownien
+        self.facteur_horizon = facteur_horizon
+        if chargements is not None and correlation is not None:
+            raise ValueError("chargements et correlation sont incompatibles")
+        self.chargements = None
+        self.cholesky = None
+        if facteur_horizon and chargements is None:
+            raise ValueError("facteur_horizon nécessite un modèle à facteurs (chargements)")
+        if chargements is not None:
+            a = np.asarray(chargements, dtype=float)
+            if a.ndim <= 1:
+                a = np.broadcast_to(a, (N,))[:, None]
+            if a.shape[0] != N:
+                raise ValueError("chargements doit avoir une ligne par entreprise")
+            variance_commune = np.sum(a ** 2, axis=1)
+            if np.any(variance_commune > 1):
+                raise ValueError("la somme des carrés des chargements doit être <= 1")
+            self.chargements = a
+            self.idiosyncratique = np.sqrt(1 - variance_commune)
+        if correlation is not None:
+            correlation = np.asarray(correlation, dtype=float)
+            if correlation.shape != (N, N):
+                raise ValueError("correlation doit être une matrice (N, N)")
+            self.cholesky = np.linalg.cholesky(correlation)
+
+    @property
+    def dt(self):
+        return self.T / self.n_pas
+
+    @property
+    def dates(self):
+        """Dates d'observation t_1, ..., t_n_pas."""
+        return self.dt * np.arange(1, self.n_pas + 1)
+
+    @property
+    def dimension_qmc(self):
+        """Dimension des points quasi-aléatoires d'un scénario : (F + N) n_pas, ou F + N n_pas avec facteur_horizon."""
+        F = 0 if self.chargements is None else self.chargements.shape[1]
+        if self.facteur_horizon:
+            return F + self.N * self.n_pas
+        return (F + self.N) * self.n_pas
+
+    @property
+    def variance_pont(self):
+        """Variance par unité de temps du pont brownien entre deux dates, array (N,)."""
+        if self.facteur_horizon:
+            return (self.sigma * self.idiosyncratique) ** 2
+        return self.sigma ** 2
+
+    def _taille_bloc(self, taille_bloc):
+        if taille_bloc is None:
+            return max(1, ELEMENTS_PAR_BLOC // (self.N * self.n_pas))
+        return taille_bloc
+
+    def chocs(self, n, rng=None, dtype=np.float64):
+        """
+        Tire les chocs gaussiens standard (corrélés entre entreprises) de n scénarios.
+
+        Renvoie :
+            array (n, N, n_pas).
+        """
+        return self.chocs_decales(n, None, rng, dtype)[0]
+
+    def chocs_decales(self, n, theta, rng=None, dtype=np.float64, quasi=None):
+        """
+        Tire les chocs sous une loi décalée (échantillonnage préférentiel) : les gaussiennes
+        des facteurs communs (modèle à facteurs), ou à défaut celles de chaque entreprise,
+        ont pour moyenne theta au lieu de 0. Un theta négatif fait baisser les valeurs
+        et multiplie les scénarios de défauts en masse.
+
+        Paramètres :
+            theta : float ou array diffusable en (F, n_pas) (facteurs), (F,) (facteur_horizon)
+                    ou (N, n_pas) (entreprises), décalage par date ; None pour la loi d'origine.
+            quasi : fonction de tirage quasi-aléatoire de dimension dimension_qmc
+                    (qmc.tirage_quasi_aleatoire), None pour des tirages pseudo-aléatoires.
+
+        Renvoie :
+            Z         : array (n, N, n_pas), chocs.
+            log_poids : array (n,), log du rapport de vraisemblance dP/dQ
+                        = sum (-theta G + theta^2 / 2) (None si theta est None).
+        """
+        rng = _generateur(rng)
+        if quasi is not None:
+            X = normales(quasi(n))
+            F_horizon = self.chargements.shape[1] if self.facteur_horizon else 0
+            increments = np.ascontiguousarray(increments_pont_brownien(X[:, F_horizon:], self.n_pas), dtype=dtype)
+            F = increments.shape[1] - self.N
+            G, Z = increments[:, :F], increments[:, F:]
+            if self.facteur_horizon:
+                G = X[:, :F_horizon].astype(dtype)
+            elif F == 0:
+                G = Z
+        else:
+            Z = rng.standard_normal((n, self.N, self.n_pas)).astype(dtype, copy=False)
+            G = Z
+            if self.chargements is not None:
+                forme = (self.chargements.shape[1],) if self.facteur_horizon else (self.chargements.shape[1], self.n_pas)
+                G = rng.standard_normal((n,) + forme).astype(dtype, copy=False)
+        log_poids = None
+        if theta is not None:
+            theta = np.broadcast_to(np.asarray(theta, dtype=float), G.shape[1:])
+            G += theta
+            log_poids = -(G * theta).reshape(n, -1).sum(axis=1) + 0.5 * np.sum(theta ** 2)
+        if self.facteur_horizon:
+            Z *= self.idiosyncratique[:, None]
+            Z += (G @ self.chargements.T)[:, :, None] / np.sqrt(self.n_pas)
+        elif self.chargements is not None:
+            Z *= self.idiosyncratique[:, None]
+            Z += self.chargements @ G
+        elif self.cholesky is not None:
+            Z = self.cholesky @ Z
+        return Z, log_poids
+
+    def log_valeurs(self, n, rng=None, dtype=np.float64):
+        """
+        Simule les log-rendements log(S_i(t_k) / S0_i) de n scénarios.
+
+        Renvoie :
+            array (n, N, n_pas).
+        """
+        return self.integrer(self.chocs(n, rng, dtype))
+
+    def integrer(self, Z):
+        """Transforme les chocs Z (n, N, n_pas) en log-rendements log(S_i(t_k) / S0_i) (sur place)."""
+        X = Z
+        X *= (self.sigma * np.sqrt(self.dt))[:, None]
+        X += ((self.r - 0.5 * self.sigma ** 2) * self.dt)[:, None]
+        np.cumsum(X, axis=2, out=X)
+        return X
+
+    def _distances_barriere(self, X):
+        """Distances x_{k-1} - b et x_k - b à la barrière aux bornes de chaque intervalle (x_0 = 0)."""
+        b = np.log(self.B / self.S0)[:, None]
+        fin = X - b
+        debut = np.empty_like(fin)
+        debut[..., 0] = -b[:, 0]
+        debut[..., 1:] = fin[..., :-1]
+        return debut, fin
+
+    def premier_passage(self, X, rng=None):
+        """
+        Indice de la première date (ou du premier intervalle, avec pont_brownien) de défaut
+        de chaque entreprise.
+
+        Paramètres :
+            X   : array (n, N, n_pas), log-rendements (voir log_valeurs).
+            rng : générateur numpy des uniformes du pont brownien (np.random par défaut).
+
+        Renvoie :
+            defaut : array de booléens (n, N), True si l'entreprise fait défaut avant T.
+            indice : array d'entiers (n, N), indice k de la date de défaut t_{k+1}, ou de
+                     l'intervalle ]t_k, t_{k+1}] avec pont_brownien (0 si pas de défaut).
+        """
+        if self.pont_brownien:
+            debut, fin = self._distances_barriere(X)
+            dt_variance = (self.variance_pont * self.dt)[:, None]
+            U = _generateur(rng).random(X.shape)
+            with np.errstate(over="ignore"):
+                sous_barriere = (fin <= 0) | (U < np.exp(-2 * debut * fin / dt_variance))
+        else:
+            sous_barriere = X <= np.log(self.B / self.S0)[:, None]
+        indice = np.argmax(sous_barriere, axis=2)
+        defaut = np.take_along_axis(sous_barriere, indice[..., None], axis=2)[..., 0]
+        return defaut, indice
+
+    def instants_defaut(self, X, defaut, indice, rng=None):
+        """
+        Instant de défaut de chaque entreprise (np.inf si pas de défaut avant T).
+
+        Le défaut et l'intervalle de franchissement sont ceux de premier_passage, déjà
+        tirés pour ces mêmes X : les défauts datés sont exactement ceux comptés par pertes.
+        Avec pont_brownien, l'instant de franchissement est tiré dans l'intervalle
+        ]t_k, t_{k+1}] selon sa loi exacte sachant le franchissement : si x et c sont
+        les distances à la barrière aux deux bornes, s = tau / (dt - tau) suit la loi
+        inverse gaussienne de moyenne x / c et de forme x^2 / (v dt), v = variance_pont.
+
+        Paramètres :
+            X              : array (n, N, n_pas), log-rendements.
+            defaut, indice : résultat de premier_passage(X).
+            rng            : générateur numpy des instants dans l'intervalle (np.random par défaut).
+
+        Renvoie :
+            array (n, N).
+        """
+        rng = _generateur(rng)
+        if not self.pont_brownien:
+            return np.where(defaut, self.dates[indice], np.inf)
+        debut, fin = self._distances_barriere(X)
+        x = np.take_along_axis(debut, indice[..., None], axis=2)[..., 0][defaut]
+        c = np.abs(np.take_along_axis(fin, indice[..., None], axis=2)[..., 0][defaut])
+        sigma2 = np.broadcast_to(self.variance_pont, defaut.shape)[defaut]
+        fraction = np.ones(len(x))
+        interieur = (c > 0) & (x > 0)
+        s = rng.wald(x[interieur] / c[interieur], x[interieur] ** 2 / (sigma2[interieur] * self.dt))
+        fraction[interieur] = s / (1 + s)
+        fraction[x <= 0] = 0.0
+        instants = np.full(defaut.shape, np.inf)
+        instants[defaut] = self.dt * (indice[defaut] + fraction)
+        return instants
+
+    def pertes(self, X, rng=None, instants=False):
+        """
+        Nombre de défauts L* et dette totale Π* de chaque scénario.
+
+        Paramètres :
+            X        : array (n, N, n_pas), log-rendements (voir log_valeurs).
+            rng      : générateur numpy (pont brownien uniquement).
+            instants : bool, ajoute les instants de défaut tirés des mêmes franchissements
+                       (voir instants_defaut).
+
+        Renvoie :
+            dict, L : array d'entiers (n,) et Pi : array (n,),
+            et instants : array (n, N) si instants=True.
+        """
+        defaut, indice = self.premier_passage(X, rng)
+        resultat = self._pertes(X, defaut, indice)
+        if instants:
+            resultat["instants"] = self.instants_defaut(X, defaut, indice, rng)
+        return resultat
+
+    def _pertes(self, X, defaut, indice):
+        if self.pont_brownien:
+            S_defaut = self.B
+        else:
+            S_defaut = self.S0 * np.exp(np.take_along_axis(X, indice[..., None], axis=2)[..., 0])
+        return {"L": defaut.sum(axis=1), "Pi": np.where(defaut, self.R * S_defaut, 0.0).sum(axis=1)}
+
+    def scenarios_tordus(self, n, torsion, p, rng=None, dtype=np.float64, passes_max=PASSES_REJET_MAX):
+        """
+        Échantillonnage préférentiel par torsion exponentielle des défauts d'entreprises
+        indépendantes : l'entreprise i fait défaut avec la probabilité
+        q_i = p_i e^t / (1 - p_i + p_i e^t) au lieu de p_i, puis sa trajectoire est tirée
+        sachant son statut (rejet sur des trajectoires de la loi d'origine, les cellules
+        (scénario, entreprise) non conformes étant seules retirées à chaque passe).
+        Une cellule en défaut demande en moyenne 1 / p_i passes : au-delà de passes_max
+        passes, ValueError (pour p_i très petit, préférer le modèle à facteur et theta).
+        Le rapport de vraisemblance ne dépend que de L* : exp(-t L* + sum_i log(1 - p_i + p_i e^t)).
+
+        Paramètres :
+            n          : int, nombre de scénarios.
+            torsion    : float, paramètre t (t > 0 multiplie les défauts).
+            p          : array (N,), probabilités de défaut exactes (voir defauts_analytique).
+            passes_max : int, nombre maximal de passes de rejet.
+
+        Renvoie :
+            dict, L, Pi et poids de forme (n,).
+        """
+        if self.chargements is not None or self.cholesky is not None:
+            raise ValueError("la torsion des défauts suppose des entreprises indépendantes")
+        rng = _generateur(rng)
+        p = np.broadcast_to(np.asarray(p, dtype=float), (self.N,))
+        q = p * np.exp(torsion) / (1 - p + p * np.exp(torsion))
+        defaut = rng.random((n, self.N)) < q
+        X = np.empty((n * self.N, self.n_pas), dtype=dtype)
+        indice = np.zeros(n * self.N, dtype=np.intp)
+        restant = np.arange(n * self.N)
+        for _ in range(passes_max):
+            if not len(restant):
+                break
+            f = restant % self.N
+            cellules = PortefeuilleEntreprises(len(restant), self.S0[f], self.B[f], self.sigma[f], self.R[f],
+                                               self.T, self.n_pas, self.r, pont_brownien=self.pont_brownien)
+            X_cellules = cellules.log_valeurs(1, rng, dtype)
+            defaut_cellules, indice_cellules = cellules.premier_passage(X_cellules, rng)
+            conforme = defaut_cellules[0] == defaut.ravel()[restant]
+            X[restant[conforme]] = X_cellules[0, conforme]
+            indice[restant[conforme]] = indice_cellules[0, conforme]
+            restant = restant[~conforme]
+        if len(restant):
+            raise ValueError(f"rejet non terminé après {passes_max} passes ({len(restant)} trajectoires restantes) : "
+                             f"probabilités de défaut trop faibles (min p_i = {p.min():.1e})")
+        resultat = self._pertes(X.reshape(n, self.N, self.n_pas), defaut, indice.reshape(n, self.N))
+        resultat["poids"] = np.exp(-torsion * resultat["L"] + np.sum(np.log(1 - p + p * np.exp(torsion))))
+        return resultat
+
+    def iterer_scenarios(self, Nmc, taille_bloc=None, rng=None, dtype=np.float64, theta=None, torsion=None, p=None,
+                         qmc=False):
+        """
+        Génère L* et Π* pour Nmc scénarios, par blocs.
+
+        Paramètres :
+            Nmc         : int, nombre total de scénarios.
+            taille_bloc : int, nombre de scénarios par bloc (ELEMENTS_PAR_BLOC / (N * n_pas) par défaut).
+            rng         : générateur numpy (np.random par défaut).
+            dtype       : type numpy des log-valeurs (np.float32 ou np.float64).
+            theta       : décalage d'échantillonnage préférentiel (voir chocs_decales), None par défaut.
+            torsion, p  : torsion des défauts et probabilités de défaut (voir scenarios_tordus).
+            qmc         : bool, chocs quasi-aléatoires (Sobol brouillé par rng, pont brownien) ;
+                          incompatible avec torsion.
+
+        Renvoie (générateur) :
+            dict, L et Pi de forme (n_bloc,), et poids (rapports de vraisemblance)
+            si theta ou torsion est donné.
+        """
+        if qmc and torsion is not None:
+            raise ValueError("la torsion des défauts (rejet) est incompatible avec qmc")
+        quasi = tirage_quasi_aleatoire(self.dimension_qmc, rng) if qmc else None
+        taille_bloc = self._taille_bloc(taille_bloc)
+        for debut in range(0, Nmc, taille_bloc):
+            n = min(taille_bloc, Nmc - debut)
+            if torsion is not None:
+                yield self.scenarios_tordus(n, torsion, p, rng, dtype)
+                continue
+            Z, log_poids = self.chocs_decales(n, theta, rng, dtype, quasi)
+            resultat = self.pertes(self.integrer(Z), rng)
+            if log_poids is not None:
+                resultat["poids"] = np.exp(log_poids)
+            yield resultat
+
+    def simuler(self, Nmc, taille_bloc=None, rng=None, dtype=np.float64, theta=None, torsion=None, p=None,
+                qmc=False):
+        """
+        Simule Nmc scénarios du portefeuille (paramètres : voir iterer_scenarios).
+
+        Renvoie :
+            dict, L : array d'entiers (Nmc,) et Pi : array (Nmc,),
+            et poids : array (Nmc,) si theta ou torsion est donné.
+        """
+        blocs = list(self.iterer_scenarios(Nmc, taille_bloc, rng, dtype, theta, torsion, p, qmc))
+        return {cle: np.concatenate([b[cle] for b in blocs]) for cle in blocs[0]}
+
+
+# ====================================================
+# Statistiques des pertes simulées
+# ====================================================
+
+def proba_au_moins(L, K_vals, N=None):
+    """
+    P[L* >= K] pour chaque K de K_vals, en une passe (comptage puis somme cumulée).
+
+    Paramètres :
+        L      : array d'entiers (Nmc,), nombres de défauts.
+        K_vals : array d'entiers, seuils K.
+        N      : int, nombre d'entreprises (max(L) par défaut).
+
+    Renvoie :
+        array de la forme de K_vals.
+    """
+    L = np.asarray(L)
+    N = int(L.max()) if N is None else N
+    survie = np.cumsum(np.bincount(L, minlength=N + 1)[::-1])[::-1] / len(L)
+    K_vals = np.asarray(K_vals)
+    return np.where(K_vals <= N, survie[np.minimum(K_vals, N)], 0.0)
+
+
+def esperance_conditionnelle(L, Pi, K_vals):
+    """
+    E[Π* | L* > K] pour chaque K de K_vals (0 si aucun scénario ne vérifie L* > K).
+
+    Renvoie :
+        array de la forme de K_vals.
+    """
+    L = np.asarray(L)
+    ordre = np.argsort(L, kind="stable")
+    L_trie = L[ordre]
+    cumul = np.concatenate(([0.0], np.cumsum(np.asarray(Pi, dtype=float)[ordre][::-1])))
+    n_au_dessus = len(L) - np.searchsorted(L_trie, K_vals, side="right")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(n_au_dessus > 0, cumul[n_au_dessus] / n_au_dessus, 0.0)
+
+
+def proba_au_moins_ponderee(L, poids, K_vals):
+    """
+    Estimateur par échantillonnage préférentiel de P[L* >= K] = E_Q[w 1{L* >= K}]
+    et son erreur type, pour chaque K de K_vals.
+
+    Renvoie :
+        proba, erreur_type : arrays de la forme de K_vals.
+    """
+    L = np.asarray(L)
+    poids = np.asarray(poids, dtype=float)
+    n = len(L)
+    ordre = np.argsort(L, kind="stable")
+    L_trie = L[ordre]
+    # cumul[j] = somme des (carrés des) poids des j scénarios de plus grand L*
+    cumul = np.concatenate(([0.0], np.cumsum(poids[ordre][::-1])))
+    cumul_carres = np.concatenate(([0.0], np.cumsum(poids[ordre][::-1] ** 2)))
+    n_au_dessus = n - np.searchsorted(L_trie, K_vals, side="left")
+    proba = cumul[n_au_dessus] / n
+    erreur_type = np.sqrt(np.maximum(cumul_carres[n_au_dessus] / n - proba ** 2, 0.0) / n)
+    return proba, erreur_type
+
+
+def esperance_conditionnelle_ponderee(L, Pi, poids, K_vals):
+    """
+    Estimateur par échantillonnage préférentiel de E[Π* | L* > K] (quotient
+    E_Q[w Π* 1{L* > K}] / E_Q[w 1{L* > K}]) et son erreur type (méthode delta),
+    0 si aucun scénario ne vérifie L* > K.
+
+    Renvoie :
+        esperance, erreur_type : arrays de la forme de K_vals.
+    """
+    L = np.asarray(L)
+    Pi = np.asarray(Pi, dtype=float)
+    poids = np.asarray(poids, dtype=float)
+    # scénarios rangés par L* décroissant : ceux vérifiant L* > K sont les j premiers
+    ordre = np.argsort(L, kind="stable")[::-1]
+    L_trie = np.sort(L)
+    w, Pi = poids[ordre], Pi[ordre]
+    sommes = [np.concatenate(([0.0], np.cumsum(v))) for v in (w, w * Pi, w ** 2, w ** 2 * Pi, w ** 2 * Pi ** 2)]
+    j = len(L) - np.searchsorted(L_trie, K_vals, side="right")
+    s_w, s_wPi, s_w2, s_w2Pi, s_w2Pi2 = (c[j] for c in sommes)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        esperance = np.where(j > 0, s_wPi / s_w, 0.0)
+        # somme des w^2 (Π - esperance)^2 sur les scénarios L* > K
+        variance = s_w2Pi2 - 2 * esperance * s_w2Pi + esperance ** 2 * s_w2
+        erreur_type = np.where(j > 0, np.sqrt(np.maximum(variance, 0.0)) / s_w, 0.0)
+    return esperance, erreur_type
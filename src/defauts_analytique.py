@@ -0,0 +1,253 @@
+import math
+
+import numpy as np
+
+from black_scholes import quantile_normale, repartition_normale
+
+# ====================================================
+# Loi semi-analytique du nombre de défauts (sans simulation)
+# ====================================================
+
+# Nombre de points de la grille de log-valeurs par écart type d'un pas de temps
+POINTS_PAR_ECART_TYPE = 20
+
+
+def probabilite_defaut_discrete(S0, B, sigma, T, n_pas, r=0.0):
+    """
+    Probabilité de défaut d'une entreprise observée aux dates t_k = k T / n_pas
+    (premier passage de S(t_k) sous B) et valeur moyenne de S au défaut.
+
+    La densité de x = log(S / S0) sur ]b, +inf[ (entreprise encore en vie) est propagée
+    date par date sur une grille par convolution avec le noyau gaussien d'un pas ;
+    la masse qui passe sous b = log(B / S0) à chaque pas, et sa valeur E[S 1{défaut}],
+    sont intégrées exactement point de grille par point de grille.
+
+    Renvoie :
+        p        : float, P[défaut avant T].
+        S_defaut : float, E[S(tau) | défaut avant T].
+    """
+    dt = T / n_pas
+    m = (r - 0.5 * sigma ** 2) * dt
+    s = sigma * math.sqrt(dt)
+    b = math.log(B / S0)
+    if b >= 0:
+        return 1.0, float(S0)
+
+    def passage(x):
+        """Masse et valeur E[e^y 1{y <= b}] qui passent sous b en partant de x."""
+        masse = repartition_normale((b - x - m) / s)
+        valeur = np.exp(x + m + 0.5 * s ** 2) * repartition_normale((b - x - m - s ** 2) / s)
+        return masse, valeur
+
+    p, valeur = passage(np.zeros(1))
+    p, valeur = float(p[0]), float(valeur[0])
+    if n_pas > 1:
+        h = s / POINTS_PAR_ECART_TYPE
+        x_max = abs(m) * n_pas + 10 * sigma * math.sqrt(T)
+        x = b + h * np.arange(int(math.ceil((x_max - b) / h)) + 1)
+        # Méthode des trapèzes : la densité des survivants est régulière sur [b, +inf[
+        trapezes = np.full(len(x), h)
+        trapezes[0] = h / 2
+        noyau = lambda d: np.exp(-0.5 * ((d - m) / s) ** 2) / (s * math.sqrt(2 * math.pi))
+        densite = noyau(x)
+        transition = noyau(x[:, None] - x[None, :]) * trapezes
+        for _ in range(n_pas - 1):
+            masse, val = passage(x)
+            p += (trapezes * densite) @ masse
+            valeur += (trapezes * densite) @ val
+            densite = transition @ densite
+    return p, S0 * valeur / p
+
+
+def probabilite_defaut_continue(S0, B, sigma, T, r=0.0):
+    """
+    Probabilité de défaut sous surveillance continue de la barrière (loi du minimum
+    du mouvement brownien avec dérive) ; la valeur au défaut vaut alors B.
+
+    Renvoie :
+        p        : float, P[min_{t <= T} S(t) <= B].
+        S_defaut : float, B.
+    """
+    m = r - 0.5 * sigma ** 2
+    b = math.log(B / S0)
+    if b >= 0:
+        return 1.0, float(S0)
+    e = sigma * math.sqrt(T)
+    p = repartition_normale((b - m * T) / e) + math.exp(2 * m * b / sigma ** 2) * repartition_normale((b + m * T) / e)
+    return float(p), float(B)
+
+
+def _probabilites_browniens(portefeuille, sigma, r):
+    """p_i et E[S_i(tau) | défaut] pour des volatilités et taux (N,) donnés (un calcul par jeu distinct)."""
+    cles = np.stack([portefeuille.S0, portefeuille.B, sigma, r], axis=1)
+    uniques, groupe = np.unique(cles, axis=0, return_inverse=True)
+    resultats = np.empty((len(uniques), 2))
+    for g, (S0, B, sigma_g, r_g) in enumerate(uniques):
+        if portefeuille.pont_brownien:
+            resultats[g] = probabilite_defaut_continue(S0, B, sigma_g, portefeuille.T, r_g)
+        else:
+            resultats[g] = probabilite_defaut_discrete(S0, B, sigma_g, portefeuille.T, portefeuille.n_pas, r_g)
+    return resultats[groupe.ravel(), 0], resultats[groupe.ravel(), 1]
+
+
+def probabilites_conditionnelles(portefeuille, y, a=None):
+    """
+    Probabilités de défaut et valeurs moyennes au défaut sachant le facteur d'horizon
+    (modèle facteur_horizon de PortefeuilleEntreprises) : sachant a_i . G = a_i y, S_i est un
+    brownien géométrique de volatilité sigma_i sqrt(1 - a_i^2) et de dérive
+    r + sigma_i a_i y / sqrt(T) - a_i^2 sigma_i^2 / 2.
+
+    Paramètres :
+        y : array (M,), valeurs du facteur commun normalisé.
+        a : array (N,), chargements sur ce facteur (ceux du modèle à un facteur par défaut).
+
+    Renvoie :
+        p, S_defaut : arrays (M, N).
+    """
+    a = _chargements_un_facteur(portefeuille) if a is None else a
+    sigma = portefeuille.sigma * np.sqrt(1 - a ** 2)
+    resultats = [_probabilites_browniens(portefeuille, sigma, portefeuille.r + portefeuille.sigma * a * y_m
+                                         / math.sqrt(portefeuille.T) - 0.5 * (a * portefeuille.sigma) ** 2)
+                 for y_m in np.atleast_1d(y)]
+    return np.array([p for p, _ in resultats]), np.array([S for _, S in resultats])
+
+
+def probabilites_defaut(portefeuille, n_quadrature=64):
+    """
+    Probabilités de défaut marginales et valeurs moyennes au défaut de chaque entreprise
+    d'un PortefeuilleEntreprises (un calcul par jeu de paramètres distinct). Avec
+    facteur_horizon, intégration en a_i . G ~ N(0, |a_i|^2) par quadrature de Gauss-Hermite.
+
+    Renvoie :
+        p        : array (N,).
+        S_defaut : array (N,).
+    """
+    if not portefeuille.facteur_horizon:
+        return _probabilites_browniens(portefeuille, portefeuille.sigma, np.full(portefeuille.N, portefeuille.r))
+    noeuds, poids = _quadrature(n_quadrature)
+    p_Y, S_Y = probabilites_conditionnelles(portefeuille, noeuds, np.linalg.norm(portefeuille.chargements, axis=1))
+    p = poids @ p_Y
+    return p, (poids @ (p_Y * S_Y)) / p
+
+
+def _quadrature(n_quadrature):
+    """Noeuds et poids de Gauss-Hermite pour E[f(Y)], Y ~ N(0, 1)."""
+    noeuds, poids = np.polynomial.hermite_e.hermegauss(n_quadrature)
+    return noeuds, poids / math.sqrt(2 * math.pi)
+
+
+def _chargements_un_facteur(portefeuille):
+    if portefeuille.cholesky is not None:
+        raise ValueError("la loi semi-analytique nécessite un modèle à un facteur (chargements)")
+    if portefeuille.chargements is None:
+        return np.zeros(portefeuille.N)
+    if portefeuille.chargements.shape[1] != 1:
+        raise ValueError("la loi semi-analytique nécessite un modèle à un seul facteur")
+    return portefeuille.chargements[:, 0]
+
+
+def _probabilites_copule(p, a, y):
+    """Probabilités de défaut p_i(y) de la copule gaussienne à un facteur, array (len(y), N)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return repartition_normale((quantile_normale(p)[None, :] - a * y[:, None]) / np.sqrt(1 - a ** 2))
+
+
+def loi_nombre_defauts(portefeuille, n_quadrature=64):
+    """
+    Loi exacte du nombre de défauts L* sans simulation, pour N entreprises indépendantes
+    ou pour le modèle à un facteur d'horizon (facteur_horizon=True).
+
+    Sachant le facteur commun Y, les défauts sont des Bernoulli indépendantes de
+    probabilités p_i(Y) (voir probabilites_conditionnelles). La loi de L* sachant Y
+    (binomiale de Poisson) est obtenue par convolution récursive, puis intégrée en Y
+    par quadrature de Gauss-Hermite.
+
+    Le modèle à un facteur par date (facteur_horizon=False) est refusé : sachant un seul
+    Y les défauts n'y sont pas indépendants, et la copule à un facteur n'en donne qu'une
+    approximation (à rho = 0.3, N = 125, B = 50 : P[L* >= 1] = 0.893 contre 0.900).
+
+    Paramètres :
+        portefeuille : PortefeuilleEntreprises, indépendant ou à un facteur d'horizon.
+        n_quadrature : int, nombre de noeuds de Gauss-Hermite.
+
+    Renvoie :
+        array (N + 1,), P[L* = k] pour k = 0, ..., N.
+    """
+    a = _chargements_un_facteur(portefeuille)
+    if np.all(a == 0):
+        noeuds, poids = np.zeros(1), np.ones(1)
+        p_Y = probabilites_defaut(portefeuille)[0][None, :]
+    elif portefeuille.facteur_horizon:
+        noeuds, poids = _quadrature(n_quadrature)
+        p_Y, _ = probabilites_conditionnelles(portefeuille, noeuds, a)
+    else:
+        raise ValueError("loi exacte disponible pour des entreprises indépendantes ou avec facteur_horizon=True")
+    loi = np.zeros((len(noeuds), portefeuille.N + 1))
+    loi[:, 0] = 1.0
+    for i in range(portefeuille.N):
+        q = p_Y[:, i:i + 1]
+        loi[:, 1:i + 2] = loi[:, 1:i + 2] * (1 - q) + loi[:, :i + 1] * q
+        loi[:, 0] *= 1 - q[:, 0]
+    return poids @ loi
+
+
+def proba_au_moins_analytique(portefeuille, K_vals, n_quadrature=64):
+    """P[L* >= K] pour chaque K de K_vals (voir loi_nombre_defauts)."""
+    survie = np.cumsum(loi_nombre_defauts(portefeuille, n_quadrature)[::-1])[::-1]
+    K_vals = np.asarray(K_vals)
+    return np.where(K_vals <= portefeuille.N, survie[np.minimum(K_vals, portefeuille.N)], 0.0)
+
+
+def loi_dette(portefeuille, n_quadrature=64):
+    """
+    Loi de la dette Π* pour des entreprises homogènes : chaque défaut coûte R S(tau),
+    remplacé par sa moyenne R E[S(tau) | défaut] (exact en surveillance continue,
+    où S(tau) = B ; approché en surveillance discrète, qui ajoute un dépassement).
+
+    Renvoie :
+        valeurs : array (N + 1,), dettes possibles k R E[S(tau) | défaut].
+        probas  : array (N + 1,), probabilités associées.
+    """
+    _, S_defaut = probabilites_defaut(portefeuille)
+    cout = portefeuille.R * S_defaut
+    if not np.all(cout == cout[0]):
+        raise ValueError("la loi de la dette nécessite des entreprises homogènes")
+    return cout[0] * np.arange(portefeuille.N + 1), loi_nombre_defauts(portefeuille, n_quadrature)
+
+
+def _dichotomie(f, cible, a, b, n_iter=60):
+    """Zéro de f - cible sur [a, b] pour f croissante."""
+    for _ in range(n_iter):
+        milieu = 0.5 * (a + b)
+        if f(milieu) < cible:
+            a = milieu
+        else:
+            b = milieu
+    return 0.5 * (a + b)
+
+
+def echantillonnage_preferentiel(portefeuille, K):
+    """
+    Paramètres d'échantillonnage préférentiel de PortefeuilleEntreprises.simuler qui
+    centrent la loi simulée sur les scénarios à K défauts :
+        - modèle à un facteur : décalage theta = y* / sqrt(n_pas) de la moyenne du facteur
+          à chaque date, où y* est la valeur du facteur cumulé Y = sum_k G_k / sqrt(n_pas)
+          telle que sum_i p_i(y*) = K (copule à un facteur) ; avec facteur_horizon, décalage
+          theta = y* du facteur, p_i(y) étant alors exact (probabilites_conditionnelles) ;
+        - entreprises indépendantes : torsion t des défauts telle que sum_i q_i(t) = K
+          (un décalage gaussien commun à toutes les dates de toutes les entreprises aurait
+          un rapport de vraisemblance dégénéré).
+
+    Renvoie :
+        dict, {"theta": ...} ou {"torsion": ..., "p": ...}, à passer à simuler(..., **parametres).
+    """
+    a = _chargements_un_facteur(portefeuille)
+    if portefeuille.facteur_horizon:
+        nombre = lambda y: -np.sum(probabilites_conditionnelles(portefeuille, np.array([y]), a)[0])
+        return {"theta": _dichotomie(nombre, -K, -10.0, 10.0)}
+    p, _ = probabilites_defaut(portefeuille)
+    if np.all(a == 0):
+        nombre = lambda t: np.sum(p * np.exp(t) / (1 - p + p * np.exp(t)))
+        return {"torsion": _dichotomie(nombre, K, -50.0, 50.0), "p": p}
+    nombre = lambda y: -np.sum(_probabilites_copule(p, a, np.array([y])))
+    return {"theta": _dichotomie(nombre, -K, -10.0, 10.0) / math.sqrt(portefeuille.n_pas)}
@@ -0,0 +1,138 @@
+import math
+
+import numpy as np
+
+from trajectoires import TAILLE_BLOC, _generateur
+
+# ====================================================
+# Échantillonnage préférentiel gaussien à dérive optimisée
+# ====================================================
+
+
+def _log_poids(Y, theta):
+    """Log du rapport de vraisemblance dP/dQ = exp(-theta . Y + |theta|^2 / 2), Y ~ N(theta, I) sous Q."""
+    return -Y @ theta + 0.5 * theta @ theta
+
+
+def decalage_entropie_croisee(score, seuil, dimension=1, n_pilote=10000, rho=0.1, n_tours_max=50, rng=None):
+    """
+    Dérive theta de la loi d'échantillonnage N(theta, I) pour l'événement {score(Y) >= seuil},
+    Y ~ N(0, I), par la méthode de l'entropie croisée à niveaux : à chaque tour,
+        - n_pilote tirages sous N(theta, I) ;
+        - niveau intermédiaire gamma = min(seuil, quantile 1 - rho des scores) ;
+        - theta <- moyenne pondérée (rapports de vraisemblance) des tirages de score >= gamma,
+          qui minimise l'entropie croisée avec la loi optimale conditionnée à {score >= gamma}.
+    On s'arrête au premier tour où gamma atteint le seuil.
+
+    Paramètres :
+        score       : fonction array (n, dimension) -> array (n,).
+        seuil       : float, seuil de l'événement.
+        dimension   : int, nombre de gaussiennes par tirage.
+        n_pilote    : int, nombre de tirages par tour.
+        rho         : float, proportion de tirages retenus à chaque tour.
+        n_tours_max : int, nombre maximal de tours.
+        rng         : générateur numpy (np.random par défaut).
+
+    Renvoie :
+        theta : array (dimension,).
+    """
+    rng = _generateur(rng)
+    theta = np.zeros(dimension)
+    for _ in range(n_tours_max):
+        Y = rng.standard_normal((n_pilote, dimension)) + theta
+        s = score(Y)
+        gamma = min(seuil, np.quantile(s, 1 - rho))
+        elite = s >= gamma
+        w = np.exp(_log_poids(Y[elite], theta))
+        theta = w @ Y[elite] / w.sum()
+        if gamma >= seuil:
+            break
+    return theta
+
+
+def decalage_point_dominant(score, seuil, borne=40.0, n_iter=100):
+    """
+    Dérive theta (en dimension 1) égale au point de l'événement le plus proche de l'origine,
+    pour un score monotone : le point frontière y* tel que score(y*) = seuil, trouvé par
+    dichotomie (règle du point selle pour les événements de queue gaussiens).
+
+    Renvoie :
+        theta : array (1,).
+    """
+    f = lambda y: float(score(np.array([[y]]))[0])
+    croissant = f(borne) >= f(-borne)
+    a, b = (-borne, borne) if croissant else (borne, -borne)
+    for _ in range(n_iter):
+        milieu = 0.5 * (a + b)
+        if f(milieu) >= seuil:
+            b = milieu
+        else:
+            a = milieu
+    return np.array([0.5 * (a + b)])
+
+
+def estimer_probabilite(score, seuil, dimension=1, theta="entropie_croisee", Nmc=None, erreur_relative_cible=None,
+                        n_max=10 ** 7, taille_bloc=TAILLE_BLOC, n_pilote=10000, rng=None):
+    """
+    Estimation de P[score(Y) >= seuil], Y ~ N(0, I), par échantillonnage préférentiel :
+    Y est tiré sous N(theta, I) (changement de probabilité de Girsanov pour une dérive
+    constante) et chaque tirage est pondéré par w = exp(-theta . Y + |theta|^2 / 2).
+
+    Exemples d'événements (Y de dimension 1) :
+        P[Y > c]     : score = lambda Y: Y[:, 0], seuil = c.
+        P[S_T < B]   : score = lambda Y: -S_T(Y[:, 0]), seuil = -B.
+        P[X <= z]    : score = lambda Y: -X(Y[:, 0]), seuil = -z.
+
+    Paramètres :
+        score, seuil, dimension : voir decalage_entropie_croisee.
+        theta                   : array (dimension,), ou "entropie_croisee" ou "point_dominant"
+                                  (dimension 1) pour la choisir automatiquement.
+        Nmc                     : int, nombre de tirages (ignoré si erreur_relative_cible est donnée).
+        erreur_relative_cible   : float, simule par blocs jusqu'à ce que l'erreur relative
+                                  (erreur type / estimation) passe sous cette valeur.
+        n_max                   : int, nombre maximal de tirages avec erreur_relative_cible.
+        taille_bloc             : int, nombre de tirages simulés à la fois.
+        n_pilote                : int, tirages par tour de l'entropie croisée.
+        rng                     : générateur numpy (np.random par défaut).
+
+    Renvoie un dictionnaire :
+        proba             : float, estimation de la probabilité.
+        erreur_type       : float, erreur type de l'estimation.
+        erreur_relative   : float, erreur_type / proba.
+        taille_effective  : float, taille d'échantillon effective (sum w 1_A)^2 / sum (w 1_A)^2.
+        n                 : int, nombre de tirages utilisés (hors phase pilote).
+        theta             : array (dimension,), dérive utilisée.
+    """
+    rng = _generateur(rng)
+    if isinstance(theta, str):
+        if theta == "entropie_croisee":
+            theta = decalage_entropie_croisee(score, seuil, dimension, n_pilote, rng=rng)
+        elif theta == "point_dominant":
+            theta = decalage_point_dominant(score, seuil)
+        else:
+            raise ValueError("theta doit valoir 'entropie_croisee', 'point_dominant' ou être un tableau")
+    theta = np.broadcast_to(np.asarray(theta, dtype=float), (dimension,))
+    if erreur_relative_cible is None and Nmc is None:
+        raise ValueError("Nmc ou erreur_relative_cible doit être donné")
+    n_total = n_max if erreur_relative_cible is not None else Nmc
+    n = 0
+    somme = somme_carres = 0.0
+    while n < n_total:
+        m = min(taille_bloc, n_total - n)
+        Y = rng.standard_normal((m, dimension)) + theta
+        wA = np.where(score(Y) >= seuil, np.exp(_log_poids(Y, theta)), 0.0)
+        n += m
+        somme += wA.sum()
+        somme_carres += (wA ** 2).sum()
+        proba = somme / n
+        erreur_type = math.sqrt(max(somme_carres / n - proba ** 2, 0.0) / n)
+        if erreur_relative_cible is not None and proba > 0 and erreur_type <= erreur_relative_cible * proba:
+            break
+    return {
+        "proba": proba,
+        "erreur_type": erreur_type,
+        "erreur_relative": erreur_type / proba if proba > 0 else math.inf,
+        "taille_effective": somme ** 2 / somme_carres if somme_carres > 0 else 0.0,
+        "n": n,
+        "theta": theta,
+    }
@@ -0,0 +1,178 @@
+import os
+
+import matplotlib
+import numpy as np
+
+# Backend non interactif par défaut : les scripts écrivent leurs figures dans des fichiers
+# sans bloquer (exécution en lot). MPLBACKEND=TkAgg (par exemple) rétablit l'affichage.
+if "MPLBACKEND" not in os.environ:
+    matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgb
+
+from trajectoires import TAILLE_BLOC
+
+# ====================================================
+# Tracé rapide de grands ensembles de trajectoires
+# ====================================================
+
+# Au-delà de ce nombre de trajectoires, le mode "auto" trace une carte de densité
+SEUIL_DENSITE = 2000
+
+# Dossier des figures enregistrées sous un simple nom (variable d'environnement DOSSIER_FIGURES)
+DOSSIER_FIGURES = os.environ.get("DOSSIER_FIGURES", "figures")
+
+BACKENDS_FICHIERS = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
+
+
+def _resolution(ax):
+    """Taille en pixels (largeur, hauteur) de la zone de tracé."""
+    return max(int(ax.bbox.width), 1), max(int(ax.bbox.height), 1)
+
+
+def bornes_trajectoires(S, niveau=1e-3):
+    """Bornes verticales couvrant les trajectoires, hors des niveau / 2 valeurs extrêmes de chaque côté."""
+    bas, haut = np.quantile(S[:, ::max(1, S.shape[1] // 64)], [niveau / 2, 1 - niveau / 2])
+    return float(bas), float(haut)
+
+
+def comptes_trajectoires(t, S, resolution, bornes, taille_bloc=TAILLE_BLOC):
+    """
+    Rastérisation des trajectoires : nombre de trajectoires passant par chaque pixel.
+    Chaque trajectoire est interpolée linéairement aux instants des colonnes de pixels,
+    par blocs de taille_bloc trajectoires (mémoire bornée quel que soit Nmc).
+
+    Paramètres :
+        t          : array (n_t,), instants de temps.
+        S          : array (Nmc, n_t), une trajectoire par ligne.
+        resolution : (largeur, hauteur) en pixels.
+        bornes     : (bas, haut), valeurs couvertes verticalement.
+
+    Renvoie :
+        array (hauteur, largeur), comptes (ligne 0 = valeur la plus basse).
+    """
+    largeur, hauteur = resolution
+    bas, haut = bornes
+    t_colonnes = np.linspace(t[0], t[-1], largeur)
+    droite = np.clip(np.searchsorted(t, t_colonnes, side="right"), 1, len(t) - 1)
+    poids = ((t_colonnes - t[droite - 1]) / (t[droite] - t[droite - 1])).astype(np.float32)
+    echelle = np.float32(hauteur / (haut - bas))
+    colonnes = np.arange(largeur, dtype=np.int32)
+    # lignes -1 et hauteur : valeurs hors des bornes, écartées à la fin (pas de masque par bloc)
+    comptes = np.zeros((hauteur + 2) * largeur, dtype=np.int64)
+    for debut in range(0, len(S), taille_bloc):
+        bloc = S[debut:debut + taille_bloc].astype(np.float32)
+        V = bloc[:, droite - 1] * (1 - poids) + bloc[:, droite] * poids
+        V -= np.float32(bas)
+        V *= echelle
+        np.clip(V, -1, hauteur, out=V)
+        lignes = np.floor(V).astype(np.int32)
+        lignes += 1
+        lignes *= largeur
+        lignes += colonnes
+        comptes += np.bincount(lignes.ravel(), minlength=(hauteur + 2) * largeur)
+    return comptes.reshape(hauteur + 2, largeur)[1:-1]
+
+
+def image_densite(comptes, couleur):
+    """Image RGBA de la couleur donnée, d'opacité log(1 + comptes) normalisée."""
+    image = np.empty(comptes.shape + (4,))
+    image[..., :3] = to_rgb(couleur)
+    image[..., 3] = np.log1p(comptes) / max(np.log1p(comptes.max()), 1e-12)
+    return image
+
+
+def tracer_trajectoires(ax, t, S, couleur=None, alpha=0.5, mode="auto", bornes=None, resolution=None):
+    """
+    Trace un ensemble de trajectoires en un seul objet graphique, au lieu d'un plt.plot
+    par trajectoire :
+        - mode "lignes"  : une LineCollection, les instants étant sous-échantillonnés à la
+                           largeur en pixels de la zone de tracé ;
+        - mode "densite" : carte du nombre de trajectoires par pixel (comptes_trajectoires),
+                           une seule image quel que soit Nmc ;
+        - mode "auto"    : "lignes" jusqu'à SEUIL_DENSITE trajectoires, "densite" au-delà.
+
+    Paramètres :
+        ax         : axes matplotlib.
+        t          : array (n_t,), instants de temps.
+        S          : array (Nmc, n_t), une trajectoire par ligne.
+        couleur    : couleur matplotlib (None : cycle de couleurs par défaut en mode lignes, "C0" sinon).
+        alpha      : float, opacité des lignes.
+        mode       : "auto", "lignes" ou "densite".
+        bornes     : (bas, haut) de la carte de densité (bornes_trajectoires(S) par défaut) ;
+                     à partager entre plusieurs cartes superposées.
+        resolution : (largeur, hauteur) en pixels (taille de la zone de tracé par défaut).
+
+    Renvoie :
+        l'objet tracé (LineCollection ou AxesImage).
+    """
+    if mode == "auto":
+        mode = "lignes" if len(S) <= SEUIL_DENSITE else "densite"
+    resolution = _resolution(ax) if resolution is None else resolution
+    if mode == "lignes":
+        indices = np.unique(np.linspace(0, len(t) - 1, min(len(t), resolution[0])).round().astype(int))
+        segments = np.stack(np.broadcast_arrays(t[indices], S[:, indices]), axis=-1)
+        if couleur is None:
+            couleur = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+        objet = ax.add_collection(LineCollection(segments, colors=couleur, alpha=alpha, linewidths=1))
+        ax.autoscale_view()
+        return objet
+    if mode != "densite":
+        raise ValueError("mode doit valoir 'auto', 'lignes' ou 'densite'")
+    bornes = bornes_trajectoires(S) if bornes is None else bornes
+    comptes = comptes_trajectoires(t, S, resolution, bornes)
+    objet = ax.imshow(image_densite(comptes, "C0" if couleur is None else couleur), origin="lower", aspect="auto",
+                      extent=(t[0], t[-1], bornes[0], bornes[1]), interpolation="nearest")
+    return objet
+
+
+# ====================================================
+# Enregistrement des figures
+# ====================================================
+
+def chemin_figure(nom, fig=None):
+    """
+    Chemin d'enregistrement : nom seul -> DOSSIER_FIGURES/nom.png (dossier créé au besoin).
+    Un suffixe n'est pris pour une extension que s'il s'agit d'un format supporté par la
+    figure (fig, plt.gcf() par défaut) : "z0_0.1_beta_1" devient "z0_0.1_beta_1.png".
+    """
+    if not os.path.dirname(nom):
+        nom = os.path.join(DOSSIER_FIGURES, nom)
+    fig = plt.gcf() if fig is None else fig
+    extension = os.path.splitext(nom)[1][1:].lower()
+    if extension not in fig.canvas.get_supported_filetypes():
+        nom += ".png"
+    os.makedirs(os.path.dirname(nom), exist_ok=True)
+    return nom
+
+
+def terminer(chemin=None, fig=None, **options):
+    """
+    Remplace plt.show() : enregistre la figure (figure courante par défaut) si chemin est
+    donné, puis l'affiche avec un backend interactif ou la ferme sinon (aucun blocage).
+
+    Paramètres :
+        chemin  : str ou None, fichier ou simple nom (voir chemin_figure).
+        fig     : figure matplotlib (plt.gcf() par défaut).
+        options : arguments supplémentaires de savefig (ex. bbox_inches="tight").
+    """
+    fig = plt.gcf() if fig is None else fig
+    if chemin is not None:
+        fig.savefig(chemin_figure(chemin, fig), **options)
+    if matplotlib.get_backend().lower() in BACKENDS_FICHIERS:
+        plt.close(fig)
+    else:
+        plt.show()
+
+
+def terminer_tout(nom, **options):
+    """terminer pour toutes les figures ouvertes, enregistrées sous nom_1, nom_2, ..."""
+    for k, numero in enumerate(plt.get_fignums(), start=1):
+        fig = plt.figure(numero)
+        fig.savefig(chemin_figure(f"{nom}_{k}", fig), **options)
+        if matplotlib.get_backend().lower() in BACKENDS_FICHIERS:
+            plt.close(fig)
+    if matplotlib.get_backend().lower() not in BACKENDS_FICHIERS:
+        plt.show()
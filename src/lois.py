@@ -0,0 +1,149 @@
+import math
+
+import numpy as np
+
+from trajectoires import _generateur
+
+# ====================================================
+# Loi Beta : densité exacte et simulation par rejet vectorisée
+# ====================================================
+
+
+def log_beta(a, b):
+    """log B(a, b) = log Gamma(a) + log Gamma(b) - log Gamma(a + b), exact (math.lgamma)."""
+    return math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b)
+
+
+def densite_beta(x, a, b):
+    """
+    Densité de la loi Beta(a, b), élément par élément (nulle hors de [0, 1]).
+    Les facteurs x^(a-1) et (1-x)^(b-1) valent 1 pour a = 1 ou b = 1, y compris au bord.
+    """
+    x = np.asarray(x, dtype=float)
+    dedans = (x >= 0) & (x <= 1)
+    xc = np.clip(x, 0.0, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_f = ((a - 1) * np.log(xc) if a != 1 else 0.0) + ((b - 1) * np.log1p(-xc) if b != 1 else 0.0)
+        return np.where(dedans, np.exp(log_f - log_beta(a, b)), 0.0)
+
+
+def mode_beta(a, b):
+    """
+    Mode de la loi Beta(a, b) pour a, b >= 1 (densité bornée) : (a - 1) / (a + b - 2),
+    soit 1 pour b = 1 < a, 0 pour a = 1 < b, et 1/2 (densité constante) pour a = b = 1.
+    """
+    if a < 1 or b < 1:
+        raise ValueError("la densité Beta n'est bornée que pour a >= 1 et b >= 1")
+    if a == 1 and b == 1:
+        return 0.5
+    return (a - 1) / (a + b - 2)
+
+
+def enveloppe_beta(a, b, n_morceaux=1):
+    """
+    Enveloppe constante par morceaux de la densité Beta(a, b) sur n_morceaux intervalles
+    de même largeur. La densité étant unimodale, son maximum sur un intervalle est atteint
+    au mode s'il y appartient, à l'une des bornes sinon : l'enveloppe est exacte (>= f).
+    n_morceaux = 1 donne l'enveloppe uniforme de constante C = f(mode).
+
+    Renvoie :
+        bords    : array (n_morceaux + 1,), bornes des intervalles.
+        hauteurs : array (n_morceaux,), hauteur de l'enveloppe sur chaque intervalle.
+        L'aire totale sum(hauteurs) / n_morceaux est l'inverse du taux d'acceptation.
+    """
+    x0 = mode_beta(a, b)
+    bords = np.linspace(0.0, 1.0, n_morceaux + 1)
+    f_bords = densite_beta(bords, a, b)
+    hauteurs = np.maximum(f_bords[:-1], f_bords[1:])
+    contient_mode = (bords[:-1] <= x0) & (x0 <= bords[1:])
+    hauteurs[contient_mode] = densite_beta(x0, a, b)
+    return bords, hauteurs
+
+
+def simuler_beta(a, b, Nmc, n_morceaux=1, rng=None):
+    """
+    Simule Nmc réalisations de la loi Beta(a, b) (a, b >= 1) par la méthode de rejet,
+    par tableaux : les candidats sont tirés en nombre suffisant d'après le taux
+    d'acceptation (théorique, puis mesuré), les acceptés sont conservés et l'on ne
+    reboucle que sur le manque.
+
+    Candidat : intervalle j choisi avec une probabilité proportionnelle à son aire,
+    puis Y uniforme sur l'intervalle ; accepté si U * hauteur_j <= f(Y).
+
+    Paramètres :
+        a, b       : float, paramètres de la loi.
+        Nmc        : int, nombre de réalisations.
+        n_morceaux : int, nombre d'intervalles de l'enveloppe (1 = enveloppe uniforme).
+        rng        : générateur numpy (np.random par défaut).
+
+    Renvoie :
+        array (Nmc,).
+    """
+    rng = _generateur(rng)
+    bords, hauteurs = enveloppe_beta(a, b, n_morceaux)
+    largeur = 1.0 / n_morceaux
+    aires = np.cumsum(hauteurs) / hauteurs.sum()
+    taux = 1.0 / (hauteurs.sum() * largeur)
+    resultat = np.empty(Nmc)
+    n = 0
+    n_candidats = n_acceptes = 0
+    while n < Nmc:
+        manque = Nmc - n
+        m = int(math.ceil(1.1 * manque / taux)) + 16
+        j = np.minimum(np.searchsorted(aires, rng.random(m), side="right"), n_morceaux - 1)
+        Y = bords[j] + largeur * rng.random(m)
+        acceptes = Y[rng.random(m) * hauteurs[j] <= densite_beta(Y, a, b)]
+        n_candidats += m
+        n_acceptes += len(acceptes)
+        taux = max(n_acceptes / n_candidats, 1e-3)
+        k = min(len(acceptes), manque)
+        resultat[n:n + k] = acceptes[:k]
+        n += k
+    return resultat
+
+
+# ====================================================
+# Simulation par inversion de la fonction de répartition
+# ====================================================
+
+
+def simuler_inversion(quantile, Nmc, rng=None, dtype=np.float64):
+    """
+    Simule Nmc réalisations X = F^{-1}(U), U ~ U([0, 1[), en un seul tirage de tableau.
+
+    Paramètres :
+        quantile : fonction array -> array, inverse de la fonction de répartition F.
+        Nmc      : int ou tuple, nombre (ou forme) des réalisations.
+        rng      : générateur numpy (np.random par défaut).
+        dtype    : type numpy des uniformes (np.float32 ou np.float64).
+
+    Renvoie :
+        array de forme Nmc.
+    """
+    U = _generateur(rng).random(Nmc).astype(dtype, copy=False)
+    return quantile(U)
+
+
+def quantile_exponentielle(u, lam):
+    """Inverse de F(x) = 1 - exp(-lam x) : -log(1 - u) / lam (log1p, précis pour u petit)."""
+    return -np.log1p(-u) / lam
+
+
+def quantile_weibull(u, k, lam=1.0):
+    """Inverse de F(x) = 1 - exp(-(x / lam)^k)."""
+    return lam * (-np.log1p(-u)) ** (1.0 / k)
+
+
+def quantile_pareto(u, alpha, x_m=1.0):
+    """Inverse de F(x) = 1 - (x_m / x)^alpha, x >= x_m."""
+    return x_m * (1 - u) ** (-1.0 / alpha)
+
+
+def quantile_cauchy(u, x0=0.0, gamma=1.0):
+    """Inverse de F(x) = 1/2 + arctan((x - x0) / gamma) / pi."""
+    return x0 + gamma * np.tan(np.pi * (u - 0.5))
+
+
+def simuler_exponentielle(lam, Nmc, rng=None, dtype=np.float64):
+    """Simule Nmc réalisations de la loi exponentielle de paramètre lam (temps de défaut)."""
+    return simuler_inversion(lambda u: quantile_exponentielle(u, lam), Nmc, rng, dtype)
@@ -0,0 +1,93 @@
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# ====================================================
+# Exécution reproductible d'un Monte Carlo sur plusieurs processus
+# ====================================================
+
+# Nombre de tirages par tranche. Le découpage ne dépend que de Nmc et de cette
+# taille, jamais du nombre de processus : c'est ce qui rend le résultat identique
+# bit à bit quel que soit le nombre de processus.
+TAILLE_TRANCHE = 10000
+
+
+def _executer_tranche(tache, n, graine):
+    return tache(n, rng=np.random.default_rng(graine))
+
+
+def tranches(Nmc, taille_tranche=TAILLE_TRANCHE):
+    """Tailles des tranches successives d'un Monte Carlo de Nmc tirages."""
+    return [min(taille_tranche, Nmc - debut) for debut in range(0, Nmc, taille_tranche)]
+
+
+def executer_en_parallele(tache, Nmc, graine=None, n_processus=None, taille_tranche=TAILLE_TRANCHE, fusion=None):
+    """
+    Répartit un Monte Carlo de Nmc tirages en tranches exécutées par un ProcessPoolExecutor.
+
+    Chaque tranche reçoit son propre générateur, issu de SeedSequence(graine).spawn :
+    les flux sont indépendants et ne dépendent que de (graine, Nmc, taille_tranche).
+    Les résultats partiels sont fusionnés dans l'ordre des tranches, le résultat est
+    donc le même, bit à bit, pour 1 ou n processus.
+
+    Le contexte "fork" est utilisé quand il est disponible, ce qui évite de réexécuter
+    le script appelant dans chaque processus ; ailleurs, le script doit protéger son
+    code principal par if __name__ == "__main__".
+
+    Paramètres :
+        tache          : fonction (n, rng=...) -> résultat partiel, sérialisable par pickle
+                         (fonction de module, méthode liée ou functools.partial).
+        Nmc            : int, nombre total de tirages.
+        graine         : int ou None, graine de la SeedSequence racine.
+        n_processus    : int, nombre de processus (os.cpu_count() par défaut ; 1 = sans pool).
+        taille_tranche : int, nombre de tirages par tranche.
+        fusion         : fonction liste de résultats partiels -> résultat (concatener par défaut).
+
+    Renvoie :
+        résultat fusionné.
+    """
+    fusion = concatener if fusion is None else fusion
+    tailles = tranches(Nmc, taille_tranche)
+    graines = np.random.SeedSequence(graine).spawn(len(tailles))
+    n_processus = min(os.cpu_count() or 1, len(tailles)) if n_processus is None else n_processus
+    if n_processus <= 1:
+        partiels = [_executer_tranche(tache, n, g) for n, g in zip(tailles, graines)]
+    else:
+        contexte = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=n_processus, mp_context=contexte) as pool:
+            partiels = list(pool.map(functools.partial(_executer_tranche, tache), tailles, graines))
+    return fusion(partiels)
+
+
+# ====================================================
+# Fusion des résultats partiels (toujours dans l'ordre des tranches)
+# ====================================================
+
+def concatener(partiels):
+    """Concatène des tableaux (échantillons), ou des dictionnaires de tableaux clé par clé."""
+    if isinstance(partiels[0], dict):
+        return {cle: np.concatenate([p[cle] for p in partiels]) for cle in partiels[0]}
+    return np.concatenate(partiels)
+
+
+def sommer(partiels):
+    """Somme des comptages, sommes ou histogrammes (tableaux ou dictionnaires de tableaux)."""
+    if isinstance(partiels[0], dict):
+        return {cle: sommer([p[cle] for p in partiels]) for cle in partiels[0]}
+    return functools.reduce(np.add, partiels)
+
+
+def fusionner_estimateurs(partiels):
+    """
+    Fusionne des estimateurs possédant une méthode fusionner (ex. statistiques.Moments, EstimateurVaR).
+
+    Un EstimateurVaR en mode "exact" ne garde que la queue utile pour la taille annoncée :
+    la tâche doit le construire avec le nombre total de tirages Nmc du Monte Carlo, et non
+    avec la taille n de sa tranche, par exemple
+        tache = functools.partial(ma_tache, Nmc_total=Nmc)
+    Des tailles incohérentes (queue tronquée) lèvent ValueError à la fusion.
+    """
+    return functools.reduce(lambda a, b: a.fusionner(b), partiels)
@@ -0,0 +1,110 @@
+import numpy as np
+
+from black_scholes import black_scholes
+
+# ====================================================
+# Portefeuille d'options européennes sous forme de tableaux de positions
+# ====================================================
+
+
+class Portefeuille:
+    """
+    Portefeuille de calls et de puts européens, stocké sous forme de tableaux
+    (une case par position) plutôt que de scalaires et de boucles :
+        sous_jacent : array d'entiers (P,), indice du sous-jacent de chaque position.
+        est_call    : array de booléens (P,), True pour un call, False pour un put.
+        strike      : array (P,), strike de chaque option.
+        sigma       : array (P,), volatilité du sous-jacent.
+        maturite    : array (P,), maturité résiduelle à la date de réévaluation.
+        quantite    : array (P,) ou (C, P), quantités détenues ; une matrice (C, P)
+                      décrit C compositions différentes des mêmes options, réévaluées
+                      ensemble sur les mêmes scénarios.
+
+    Toutes les positions sont réévaluées en un seul appel à black_scholes sur une
+    matrice de scénarios S de forme (Nmc, I0) (une colonne par sous-jacent).
+    Le tarificateur peut être remplacé par toute fonction de même interface,
+    par exemple une GrilleBlackScholes pour de très nombreux scénarios.
+    """
+
+    def __init__(self, sous_jacent, est_call, strike, quantite, sigma, maturite, noms=None, tarificateur=None):
+        self.sous_jacent = np.asarray(sous_jacent, dtype=int)
+        self.est_call = np.asarray(est_call, dtype=bool)
+        P = len(self.sous_jacent)
+        self.strike, self.sigma, self.maturite = (np.broadcast_to(np.asarray(p, dtype=float), (P,))
+                                                  for p in (strike, sigma, maturite))
+        self.quantite = np.asarray(quantite, dtype=float)
+        if self.quantite.shape[-1] != P:
+            raise ValueError("quantite doit avoir une colonne par position")
+        self.noms = noms
+        self.tarificateur = black_scholes if tarificateur is None else tarificateur
+
+    @classmethod
+    def depuis_compositions(cls, compositions, I0, K, sigma, T, tarificateur=None):
+        """
+        Construit le portefeuille « alpha_i calls + beta_i puts sur le sous-jacent i »,
+        i = 0, ..., I0 - 1, pour une ou plusieurs compositions.
+
+        Paramètres :
+            compositions : fonction i -> (alpha_i, beta_i), ou dictionnaire nom -> fonction.
+            I0           : int, nombre de sous-jacents.
+            K, sigma, T  : float, strike, volatilité et maturité communs.
+            tarificateur : fonction (S, K, sigma, T) -> {"call", "put"} (black_scholes par défaut).
+
+        Renvoie :
+            Portefeuille à 2 * I0 positions ; quantite est de forme (C, 2 * I0)
+            si compositions est un dictionnaire (noms dans l'attribut noms).
+        """
+        noms = None
+        if isinstance(compositions, dict):
+            noms = list(compositions)
+            fonctions = list(compositions.values())
+        else:
+            fonctions = [compositions]
+        # quantites[c, i] = (alpha_i, beta_i) ; positions rangées call_0, put_0, call_1, put_1, ...
+        quantites = np.array([[f(i) for i in range(I0)] for f in fonctions], dtype=float).reshape(len(fonctions), -1)
+        sous_jacent = np.repeat(np.arange(I0), 2)
+        est_call = np.tile([True, False], I0)
+        if noms is None:
+            quantites = quantites[0]
+        return cls(sous_jacent, est_call, K, quantites, sigma, T, noms, tarificateur)
+
+    @property
+    def n_sous_jacents(self):
+        return int(self.sous_jacent.max()) + 1
+
+    def prix_unitaires(self, S):
+        """
+        Prix unitaire de chaque option dans chaque scénario.
+
+        Paramètres :
+            S : array (..., I0), valeurs des sous-jacents (une colonne par sous-jacent).
+
+        Renvoie :
+            array (..., P), prix de chaque position pour une unité détenue.
+        """
+        S = np.asarray(S, dtype=float)[..., self.sous_jacent]
+        prix = self.tarificateur(S, self.strike, self.sigma, self.maturite)
+        return np.where(self.est_call, prix["call"], prix["put"])
+
+    def valeur(self, S):
+        """
+        Valeur du portefeuille dans chaque scénario.
+
+        Renvoie :
+            array (...,), ou (..., C) pour C compositions.
+        """
+        return self.prix_unitaires(S) @ self.quantite.T
+
+    def pertes(self, S, S0):
+        """
+        Pertes V_0 - V dans chaque scénario.
+
+        Paramètres :
+            S  : array (Nmc, I0), scénarios de sous-jacents.
+            S0 : float ou array (I0,), valeurs initiales des sous-jacents.
+
+        Renvoie :
+            array (Nmc,), ou (Nmc, C) pour C compositions.
+        """
+        V0 = self.valeur(np.broadcast_to(np.asarray(S0, dtype=float), (self.n_sous_jacents,)))
+        return V0 - self.valeur(S)
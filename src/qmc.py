@@ -0,0 +1,228 @@
+import math
+import warnings
+
+import numpy as np
+
+from black_scholes import quantile_normale
+
+try:
+    from scipy.stats import qmc as _qmc_scipy
+except ImportError:
+    _qmc_scipy = None
+
+# ====================================================
+# Quasi-Monte Carlo : points de Sobol brouillés et construction par pont brownien
+# ====================================================
+
+
+def _premiers(d):
+    """Les d premiers nombres premiers (bases de la suite de Halton)."""
+    premiers = []
+    n = 2
+    while len(premiers) < d:
+        if all(n % p for p in premiers if p * p <= n):
+            premiers.append(n)
+        n += 1
+    return premiers
+
+
+def _halton(debut, n, d, decalage):
+    """Points debut + 1, ..., debut + n de la suite de Halton (inverse radical en base p_j), décalés modulo 1."""
+    i = np.arange(debut + 1, debut + n + 1)
+    points = np.empty((n, d))
+    for j, base in enumerate(_premiers(d)):
+        reste = i.copy()
+        facteur = 1.0 / base
+        valeur = np.zeros(n)
+        while np.any(reste > 0):
+            valeur += facteur * (reste % base)
+            reste //= base
+            facteur /= base
+        points[:, j] = valeur
+    return (points + decalage) % 1.0
+
+
+def tirage_quasi_aleatoire(d, rng=None):
+    """
+    Construit la fonction de tirage d'une suite quasi-aléatoire de [0, 1[^d : suite de Sobol
+    brouillée (scipy.stats.qmc si scipy est installé), suite de Halton à décalage aléatoire
+    sinon. Les appels successifs renvoient les points suivants de la même suite : des blocs
+    tirés l'un après l'autre forment ensemble un seul ensemble de points (mémoire bornée
+    par la taille des blocs). Chaque générateur rng donne une randomisation indépendante
+    (estimateur sans biais).
+
+    Paramètres :
+        d   : int, dimension.
+        rng : générateur numpy servant au brouillage (np.random.default_rng() par défaut).
+
+    Renvoie :
+        tirage : fonction n -> array (n, d).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    if _qmc_scipy is None:
+        decalage = rng.random(d)
+        debut = [0]
+
+        def tirage(n):
+            debut[0] += n
+            return _halton(debut[0] - n, n, d, decalage)
+
+        return tirage
+    sobol = _qmc_scipy.Sobol(d, scramble=True, seed=rng)
+
+    def tirage(n):
+        with warnings.catch_warnings():
+            # n non puissance de 2 : avertissement d'équilibre, sans effet sur la validité
+            warnings.simplefilter("ignore", UserWarning)
+            return sobol.random(n)
+
+    return tirage
+
+
+def points_quasi_aleatoires(n, d, rng=None):
+    """
+    n points quasi-aléatoires de [0, 1[^d (voir tirage_quasi_aleatoire).
+
+    Paramètres :
+        n   : int, nombre de points (une puissance de 2 conserve l'équilibre de Sobol).
+        d   : int, dimension.
+        rng : générateur numpy servant au brouillage (np.random.default_rng() par défaut).
+
+    Renvoie :
+        array (n, d).
+    """
+    return tirage_quasi_aleatoire(d, rng)(n)
+
+
+def normales(U):
+    """Vecteurs gaussiens N(0, I_d) images de points quasi-aléatoires U par la fonction quantile."""
+    # les points brouillés n'atteignent jamais 0 ou 1 ; la borne protège le repli de Halton
+    return quantile_normale(np.clip(U, 1e-16, 1 - 1e-16))
+
+
+def normales_quasi_aleatoires(n, d, rng=None):
+    """n vecteurs gaussiens N(0, I_d) quasi-aléatoires, par la fonction quantile de la loi normale."""
+    return normales(points_quasi_aleatoires(n, d, rng))
+
+
+def ordre_pont_brownien(N):
+    """
+    Ordre de construction du pont brownien sur N pas : W_T d'abord, puis récursivement
+    le milieu de chaque intervalle déjà encadré. Les premières dimensions des points
+    quasi-aléatoires portent ainsi l'essentiel de la variance de la trajectoire.
+
+    Renvoie :
+        liste de tuples (i, gauche, droite) : W_i est construit à partir de W_gauche et W_droite
+        (gauche = -1 pour la première étape, qui tire W_N seul).
+    """
+    ordre = [(N, -1, 0)]
+    intervalles = [(0, N)]
+    while intervalles:
+        suivants = []
+        for gauche, droite in intervalles:
+            if droite - gauche < 2:
+                continue
+            milieu = (gauche + droite) // 2
+            ordre.append((milieu, gauche, droite))
+            suivants += [(gauche, milieu), (milieu, droite)]
+        intervalles = suivants
+    return ordre
+
+
+def increments_pont_brownien(Z, N):
+    """
+    Incréments gaussiens standard de m mouvements browniens indépendants sur N pas, construits
+    par pont brownien à partir de gaussiennes quasi-aléatoires de dimension m N. Sur la grille
+    entière 0, 1, ..., N (pas de variance 1) :
+        W_N = sqrt(N) Z_0 ;  W_i | W_g, W_d ~ N(((d - i) W_g + (i - g) W_d) / (d - g),
+                                                (i - g)(d - i) / (d - g)).
+    L'étape k du pont de l'ensemble j utilise la dimension k m + j : les m valeurs terminales
+    occupent les m premières dimensions, puis les points milieux niveau par niveau.
+
+    Paramètres :
+        Z : array (n, m N), gaussiennes quasi-aléatoires.
+        N : int, nombre de pas.
+
+    Renvoie :
+        array (n, m, N), incréments N(0, 1) indépendants (à multiplier par sqrt(dt)).
+    """
+    n = Z.shape[0]
+    Z = Z.reshape(n, N, -1)
+    # dates sur l'axe 1 : chaque étape lit et écrit des lignes contiguës de m valeurs
+    W = np.zeros((n, N + 1, Z.shape[2]))
+    for k, (i, g, d) in enumerate(ordre_pont_brownien(N)):
+        if g < 0:
+            np.multiply(Z[:, k], math.sqrt(N), out=W[:, i])
+        else:
+            W[:, i] = Z[:, k]
+            W[:, i] *= math.sqrt((i - g) * (d - i) / (d - g))
+            W[:, i] += ((d - i) / (d - g)) * W[:, g]
+            W[:, i] += ((i - g) / (d - g)) * W[:, d]
+    return np.diff(W, axis=1).transpose(0, 2, 1)
+
+
+def mouvements_browniens_qmc(T, N, Nmc, rng=None):
+    """
+    Nmc trajectoires de mouvement brownien sur la grille t_k = k T / N, construites par
+    pont brownien à partir de gaussiennes quasi-aléatoires de dimension N
+    (voir increments_pont_brownien).
+
+    Renvoie :
+        t : array (N + 1,), instants de temps.
+        W : array (Nmc, N + 1), une trajectoire par ligne.
+    """
+    W = np.zeros((Nmc, N + 1))
+    increments = increments_pont_brownien(normales_quasi_aleatoires(Nmc, N, rng), N)[:, 0]
+    np.cumsum(math.sqrt(T / N) * increments, axis=1, out=W[:, 1:])
+    return np.linspace(0, T, N + 1), W
+
+
+def simuler_trajectoires_qmc(S0, sigma, T, N, Nmc, r=0.0, rng=None):
+    """
+    Version quasi-Monte Carlo de trajectoires.simuler_trajectoires :
+    S(t) = S0 * exp((r - sigma^2 / 2) t + sigma W_t), W construit par pont brownien.
+
+    Renvoie :
+        t : array (N + 1,), instants de temps.
+        S : array (Nmc, N + 1), une trajectoire par ligne.
+    """
+    t, W = mouvements_browniens_qmc(T, N, Nmc, rng)
+    return t, S0 * np.exp((r - 0.5 * sigma ** 2) * t + sigma * W)
+
+
+def simuler_S_T_qmc(S0, sigma, T, Nmc, r=0.0, rng=None):
+    """
+    Version quasi-Monte Carlo de trajectoires.simuler_S_T (tirage exact de S_T).
+    S0 de forme (K,) donne K sous-jacents indépendants (une dimension de Sobol chacun).
+
+    Renvoie :
+        S_T : array (Nmc,) si S0 est scalaire, (K, Nmc) sinon.
+    """
+    forme = np.shape(S0)
+    d = int(np.prod(forme))
+    Y = normales_quasi_aleatoires(Nmc, d, rng).T.reshape(forme + (Nmc,))
+    return np.asarray(S0)[..., None] * np.exp((r - 0.5 * sigma ** 2) * T + sigma * math.sqrt(T) * Y)
+
+
+def replications(estimateur, n_replications=16, rng=None):
+    """
+    Estimation quasi-Monte Carlo randomisée : estimateur(rng) est évalué sur n_replications
+    randomisations indépendantes des points, la dispersion entre répliques donne l'erreur type.
+
+    Paramètres :
+        estimateur     : fonction rng -> float ou array (estimation sur un jeu de points).
+        n_replications : int, nombre de randomisations.
+        rng            : générateur numpy (np.random.default_rng() par défaut).
+
+    Renvoie un dictionnaire :
+        estimation  : moyenne des répliques.
+        erreur_type : écart type des répliques / sqrt(n_replications).
+        valeurs     : array (n_replications, ...), répliques.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    valeurs = np.array([estimateur(g) for g in rng.spawn(n_replications)])
+    return {
+        "estimation": valeurs.mean(axis=0),
+        "erreur_type": valeurs.std(axis=0, ddof=1) / math.sqrt(n_replications),
+        "valeurs": valeurs,
+    }
@@ -0,0 +1,205 @@
+import math
+
+import numpy as np
+
+from black_scholes import call
+
+# ====================================================
+# Variables antithétiques
+# ====================================================
+
+
+def moyennes_paires(valeurs):
+    """
+    Moyennes (f(Y) + f(-Y)) / 2 des paires antithétiques consécutives (indices 2j et 2j + 1,
+    convention de trajectoires.simuler_S_T(..., antithetique=True)) ; un dernier tirage
+    non apparié est ignoré.
+
+    Renvoie :
+        array (..., n // 2).
+    """
+    valeurs = np.asarray(valeurs, dtype=float)
+    m = valeurs.shape[-1] // 2
+    return 0.5 * (valeurs[..., 0:2 * m:2] + valeurs[..., 1:2 * m:2])
+
+
+def estimation_antithetique(valeurs):
+    """
+    Estimation de E[f(Y)] à partir de tirages antithétiques appariés.
+
+    Paramètres :
+        valeurs : array (..., n), f(Y_0), f(-Y_0), f(Y_1), f(-Y_1), ...
+
+    Renvoie un dictionnaire :
+        estimation        : moyenne des paires.
+        erreur_type       : écart type des moyennes de paires / sqrt(n / 2).
+        facteur_reduction : variance de la moyenne de n tirages indépendants divisée par
+                            celle de l'estimateur antithétique (> 1 si f est monotone).
+    """
+    valeurs = np.asarray(valeurs, dtype=float)
+    paires = moyennes_paires(valeurs)
+    m = paires.shape[-1]
+    variance_paires = paires.var(axis=-1, ddof=1)
+    return {
+        "estimation": paires.mean(axis=-1),
+        "erreur_type": np.sqrt(variance_paires / m),
+        "facteur_reduction": valeurs[..., :2 * m].var(axis=-1, ddof=1) / (2 * variance_paires),
+    }
+
+
+# ====================================================
+# Variables de contrôle
+# ====================================================
+
+
+class VariableControle:
+    """
+    Estimateur de E[Y] par variables de contrôle C (k variables d'espérances connues mu),
+    alimenté par blocs :
+        estimation = moyenne(Y) - beta . (moyenne(C) - mu),  beta = Cov(C)^{-1} Cov(C, Y).
+
+    Le coefficient beta optimal est estimé en ligne à partir des sommes des produits
+    croisés, centrées sur les moyennes du premier bloc (pas de perte de précision par
+    annulation). Les paires antithétiques se combinent en passant moyennes_paires(Y)
+    et moyennes_paires(C).
+    """
+
+    def __init__(self, esperances):
+        """
+        Paramètres :
+            esperances : float ou array (k,), espérances exactes des variables de contrôle.
+        """
+        self.esperances = np.atleast_1d(np.asarray(esperances, dtype=float))
+        self.n = 0
+
+    def ajouter(self, Y, C):
+        """
+        Ajoute un bloc d'observations.
+
+        Paramètres :
+            Y : array (n,), quantité d'intérêt.
+            C : array (n,) ou (k, n), variables de contrôle.
+        """
+        Y = np.asarray(Y, dtype=float)
+        C = np.atleast_2d(np.asarray(C, dtype=float))
+        if self.n == 0:
+            self.decalage_Y = Y.mean()
+            self.decalage_C = C.mean(axis=1)
+            k = len(self.decalage_C)
+            self.somme_Y = self.somme_YY = 0.0
+            self.somme_C = np.zeros(k)
+            self.somme_CY = np.zeros(k)
+            self.somme_CC = np.zeros((k, k))
+        y = Y - self.decalage_Y
+        c = C - self.decalage_C[:, None]
+        self.n += len(y)
+        self.somme_Y += y.sum()
+        self.somme_YY += y @ y
+        self.somme_C += c.sum(axis=1)
+        self.somme_CY += c @ y
+        self.somme_CC += c @ c.T
+        return self
+
+    def resultat(self):
+        """
+        Renvoie un dictionnaire :
+            estimation        : float, estimation de E[Y] corrigée.
+            erreur_type       : float, erreur type (variance résiduelle de la régression).
+            beta              : array (k,), coefficients estimés.
+            moyenne_brute     : float, moyenne empirique de Y, sans correction.
+            facteur_reduction : float, Var(Y) / Var(Y - beta . C), gain en nombre de tirages.
+        """
+        n = self.n
+        moyenne_y = self.somme_Y / n
+        moyenne_c = self.somme_C / n
+        cov_CC = (self.somme_CC - n * np.outer(moyenne_c, moyenne_c)) / (n - 1)
+        cov_CY = (self.somme_CY - n * moyenne_c * moyenne_y) / (n - 1)
+        var_Y = (self.somme_YY - n * moyenne_y ** 2) / (n - 1)
+        beta = np.linalg.lstsq(cov_CC, cov_CY, rcond=None)[0]
+        var_residuelle = max(var_Y - cov_CY @ beta, 0.0)
+        moyenne_brute = self.decalage_Y + moyenne_y
+        estimation = moyenne_brute - beta @ (self.decalage_C + moyenne_c - self.esperances)
+        return {
+            "estimation": float(estimation),
+            "erreur_type": math.sqrt(var_residuelle / n),
+            "beta": beta,
+            "moyenne_brute": float(moyenne_brute),
+            "facteur_reduction": var_Y / var_residuelle if var_residuelle > 0 else math.inf,
+        }
+
+
+def variable_controle(Y, C, esperances):
+    """Estimation de E[Y] par variables de contrôle sur un échantillon complet (voir VariableControle)."""
+    return VariableControle(esperances).ajouter(Y, C).resultat()
+
+
+def quantile_controle(X, C, esperances, alpha):
+    """
+    Quantile d'ordre alpha de X corrigé par variables de contrôle : la fonction de
+    répartition empirique est pondérée par
+        w_j = (1 / n) * (1 - (moyenne(C) - mu)' S^{-1} (C_j - moyenne(C))),
+    (S : covariance empirique de C), de sorte que sum_j w_j = 1 et sum_j w_j C_j = mu.
+    Pour chaque x, sum_j w_j 1{X_j <= x} est l'estimateur par variables de contrôle de
+    P[X <= x] avec le coefficient beta(x) optimal. Même convention que la méthode de tri
+    (plus petite valeur dont la répartition pondérée dépasse alpha).
+
+    Paramètres :
+        X          : array (n,), échantillon.
+        C          : array (n,) ou (k, n), variables de contrôle.
+        esperances : float ou array (k,), espérances exactes de C.
+        alpha      : float, ordre du quantile.
+
+    Renvoie un dictionnaire :
+        quantile          : float, quantile corrigé.
+        quantile_brut     : float, quantile empirique sans correction.
+        facteur_reduction : float, gain de variance sur P[X <= quantile]
+                            (variance de l'indicatrice / variance résiduelle de la régression sur C).
+        poids             : array (n,), poids w_j.
+    """
+    X = np.asarray(X, dtype=float)
+    C = np.atleast_2d(np.asarray(C, dtype=float))
+    esperances = np.atleast_1d(np.asarray(esperances, dtype=float))
+    n = len(X)
+    moyenne_c = C.mean(axis=1)
+    c = C - moyenne_c[:, None]
+    S = c @ c.T / n
+    poids = (1 - np.linalg.lstsq(S, moyenne_c - esperances, rcond=None)[0] @ c) / n
+    ordre = np.argsort(X, kind="stable")
+    # les poids peuvent être négatifs : première valeur où le cumul dépasse alpha
+    cumul = np.maximum.accumulate(np.cumsum(poids[ordre]))
+    k = min(np.searchsorted(cumul, alpha, side="right"), n - 1)
+    quantile = X[ordre[k]]
+    indicatrice = (X <= quantile).astype(float)
+    facteur = variable_controle(indicatrice, C, esperances)["facteur_reduction"]
+    return {
+        "quantile": float(quantile),
+        "quantile_brut": float(X[ordre[min(int(n * alpha), n - 1)]]),
+        "facteur_reduction": facteur,
+        "poids": poids,
+    }
+
+
+# ====================================================
+# Variables de contrôle du mouvement brownien géométrique
+# ====================================================
+
+
+def controles_gbm(S_T, S0, sigma, T, r=0.0, K=()):
+    """
+    Variables de contrôle d'espérance connue pour un échantillon de S_T (modèle de
+    Black-Scholes) : S_T, d'espérance S0 e^{rT}, et les pay-offs (S_T - K)^+ pour chaque
+    prix d'exercice K, d'espérance e^{rT} call(S0, K, sigma, T, r).
+    Avec S_T et le call de prix d'exercice B, le put (B - S_T)^+ est aussi couvert
+    (parité call-put), ce qui corrèle fortement le contrôle avec 1{S_T < B}.
+
+    Renvoie :
+        C          : array (1 + len(K), n), variables de contrôle.
+        esperances : array (1 + len(K),), espérances exactes.
+    """
+    S_T = np.asarray(S_T, dtype=float)
+    K = np.atleast_1d(np.asarray(K, dtype=float))
+    capitalisation = math.exp(r * T)
+    C = np.concatenate([S_T[None, :], np.maximum(S_T[None, :] - K[:, None], 0.0)])
+    esperances = np.concatenate([[S0 * capitalisation],
+                                 [capitalisation * float(call(S0, k, sigma, T, r)) for k in K]])
+    return C, esperances
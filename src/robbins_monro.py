@@ -0,0 +1,438 @@
+import math
+
+import numpy as np
+
+from trajectoires import TAILLE_BLOC, simuler_X
+from var_flux import QUANTILES_NORMALE
+
+# ====================================================
+# Algorithme de Robbins-Monro sur K chaînes menées de front
+# ====================================================
+
+
+def tirage_X(S0, sigma, T, B, r=0.0, rng=None):
+    """
+    Construit la fonction de tirage de X = S_T - B pour K chaînes.
+
+    Les paramètres (float ou array (K,)) sont diffusés à une forme commune (K,) :
+    la chaîne k utilise (S0[k], sigma[k], T[k], B[k], r[k]).
+
+    Renvoie :
+        tirage : fonction n -> array (K, n) de réalisations indépendantes de X.
+    """
+    forme = np.broadcast(S0, sigma, T, B, r).shape
+    S0, sigma, T, B, r = (np.broadcast_to(p, forme) for p in (S0, sigma, T, B, r))
+
+    def tirage(n):
+        return np.atleast_2d(simuler_X(S0, sigma, T, B, n, r=r, rng=rng))
+
+    return tirage
+
+
+def demarrage_a_chaud(tirage, alpha, n_pilote=1000):
+    """
+    Phase de démarrage : un échantillon pilote de n_pilote tirages par chaîne fournit
+    un point de départ (quantile empirique) et l'ordre de grandeur de la densité
+    f(z*) qui fixe le pas optimal beta = 1 / f(z*).
+
+    La densité est estimée par l'écart entre statistiques d'ordre voisines du
+    quantile, ce qui reste utilisable dans les queues (alpha = 0.001).
+
+    Paramètres :
+        tirage   : fonction n -> array (K, n), réalisations de X pour chaque chaîne.
+        alpha    : float ou array (K,), niveaux visés.
+        n_pilote : int, taille de l'échantillon pilote.
+
+    Renvoie :
+        z0      : array (K,), quantiles empiriques de niveau alpha.
+        f0      : array (K,), densités estimées en z0.
+        echelle : array (K,), écarts interquartiles (échelle des fenêtres de noyau).
+    """
+    X = np.sort(tirage(n_pilote), axis=1)
+    K = X.shape[0]
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=float), (K,))
+    lignes = np.arange(K)
+    rang = np.clip((n_pilote * alpha).astype(int), 0, n_pilote - 1)
+    voisins = np.maximum(1, np.sqrt(n_pilote * np.minimum(alpha, 1 - alpha)).astype(int))
+    bas = np.clip(rang - voisins, 0, n_pilote - 1)
+    haut = np.clip(rang + voisins, 0, n_pilote - 1)
+    ecart = np.maximum(X[lignes, haut] - X[lignes, bas], 1e-12)
+    f0 = (haut - bas) / (n_pilote * ecart)
+    q1, q3 = np.percentile(X, [25, 75], axis=1)
+    return X[lignes, rang], f0, np.maximum(q3 - q1, 1e-12)
+
+
+def _parametres_gain(tirage, alpha, beta, z0, gain, n_pilote):
+    """
+    Complète beta et z0 pour le mode de gain choisi, en lançant la phase de
+    démarrage si nécessaire. Renvoie (beta, z0, f0, echelle, decalage) : f0 et
+    echelle valent None et decalage (itérations déjà « consommées ») vaut 0
+    sans phase de démarrage.
+    """
+    if gain not in ("fixe", "kesten", "densite"):
+        raise ValueError("gain doit valoir 'fixe', 'kesten' ou 'densite'")
+    f0 = echelle = None
+    decalage = 0
+    if beta is None or z0 is None or gain == "densite":
+        z_pilote, f0, echelle = demarrage_a_chaud(tirage, alpha, n_pilote)
+        if z0 is None:
+            z0 = z_pilote
+            decalage = n_pilote
+        if beta is None:
+            # Gain optimal 1 / f(z*) ; avec gain="densite", f est réestimée à chaque itération
+            beta = 1.0 if gain == "densite" else 1 / f0
+    return beta, z0, f0, echelle, decalage
+
+
+def robbins_monro_chaines(tirage, alpha, beta, z0, Nmc, lambda_decay=0.9, pas_historique=1,
+                          dtype=np.float64, taille_bloc=TAILLE_BLOC, gain="fixe", n_pilote=1000):
+    """
+    Fait avancer K chaînes de Robbins-Monro indépendantes en parallèle :
+        z^k_{n+1} = z^k_n - γ^k_n (Ψ(z^k_n, X^k_n) - alpha^k),
+    chaque chaîne k cherchant z*_k tel que P[X^k <= z*_k] = alpha^k.
+
+    Règles de gain :
+        - "fixe"    : γ_n = beta / (n+1)^lambda_decay.
+        - "kesten"  : γ_n = beta / (1 + c_n / (2 alpha (1 - alpha)))^lambda_decay, où c_n compte
+                      les changements de signe de Ψ - alpha (en régime stationnaire, il y en a
+                      2 alpha (1 - alpha) par itération) : le pas ne décroît que lorsque la chaîne
+                      oscille autour de z*, et reste grand tant qu'elle s'en approche.
+        - "densite" : γ_n = beta / (f_n (n+1)^lambda_decay), où f_n est une estimation
+                      courante (noyau) de la densité de X en z_n ; le pas s'adapte à
+                      l'échelle de la loi sans réglage de beta.
+    Si beta ou z0 vaut None, une phase de démarrage de n_pilote tirages (voir
+    demarrage_a_chaud) fournit z0 = quantile empirique et beta = 1 / f(z0). Le point
+    de départ résumant alors déjà n_pilote observations, le compteur d'itérations du
+    pas part de n_pilote : les premiers pas ne font pas perdre le bénéfice du démarrage.
+
+    À chaque itération, la mise à jour des K états est une seule opération
+    vectorisée ; les tirages sont simulés par blocs de taille_bloc itérations.
+
+    Paramètres :
+        tirage         : fonction n -> array (K, n), réalisations de X pour chaque chaîne.
+        alpha          : float ou array (K,), niveaux visés.
+        beta           : float, array (K,) ou None, paramètres du pas.
+        z0             : float, array (K,) ou None, points de départ.
+        Nmc            : int, nombre d'itérations.
+        lambda_decay   : float ou array (K,), exposant de décroissance du pas.
+        pas_historique : int, on conserve z_n pour n multiple de pas_historique.
+        dtype          : type numpy de l'historique (np.float32 pour le compacter).
+        taille_bloc    : int, nombre d'itérations dont les tirages sont simulés à la fois.
+        gain           : "fixe", "kesten" ou "densite".
+        n_pilote       : int, taille de l'échantillon de la phase de démarrage.
+
+    Renvoie :
+        z          : array (K,), estimations finales.
+        historique : array (K, Nmc // pas_historique + 1), trajectoires des chaînes.
+    """
+    beta, z0, f0, echelle, decalage = _parametres_gain(tirage, alpha, beta, z0, gain, n_pilote)
+    alpha, beta, z0, lambda_decay = (np.asarray(p, dtype=float) for p in (alpha, beta, z0, lambda_decay))
+    K = np.broadcast(alpha, beta, z0, lambda_decay).size
+    alpha, beta, z, lambda_decay = (np.array(np.broadcast_to(p, (K,))) for p in (alpha, beta, z0, lambda_decay))
+
+    # Historique stocké itération par ligne (écriture contiguë), transposé à la fin
+    historique = np.empty((Nmc // pas_historique + 1, K), dtype=dtype)
+    historique[0] = z
+
+    changements = np.zeros(K)
+    psi_prec = np.zeros(K, dtype=bool)
+    densite = f0
+
+    for debut in range(0, Nmc, taille_bloc):
+        taille = min(taille_bloc, Nmc - debut)
+        X = tirage(taille).T  # (taille, K)
+        if gain == "fixe":
+            n = np.arange(debut, debut + taille)[:, None]
+            gamma = beta / (decalage + n + 1) ** lambda_decay
+            # Incréments possibles selon la valeur de Ψ : γ (1 - alpha) si Ψ = 1, -γ alpha si Ψ = 0
+            pas_psi_1 = gamma * (1 - alpha)
+            pas_psi_0 = -gamma * alpha
+        for j in range(taille):
+            n = debut + j + 1
+            if gain == "fixe":
+                z -= np.where(X[j] <= z, pas_psi_1[j], pas_psi_0[j])
+            else:
+                ecart = X[j] - z
+                psi = ecart <= 0
+                if gain == "kesten":
+                    changements += psi != psi_prec
+                    psi_prec = psi
+                    gamma = beta / (decalage + 1 + changements / (2 * alpha * (1 - alpha))) ** lambda_decay
+                else:
+                    # Moyenne courante du noyau, l'estimation pilote comptant pour n_pilote observations
+                    fenetre = echelle * (n_pilote + n) ** -0.2
+                    noyau = (np.abs(ecart) <= fenetre) / (2 * fenetre)
+                    densite = densite + (noyau - densite) / (n_pilote + n)
+                    gamma = beta / (np.maximum(densite, 0.01 * f0) * (decalage + n) ** lambda_decay)
+                z -= gamma * (psi - alpha)
+            if n % pas_historique == 0:
+                historique[n // pas_historique] = z
+
+    return z, historique.T
+
+
+# ====================================================
+# Robbins-Monro moyenné (Polyak-Ruppert) par mini-lots, VaR et CVaR jointes
+# ====================================================
+
+def _taux_changements_signe(alpha, m):
+    """
+    Probabilité 2 p (1 - p), avec p = P[moyenne de m Ψ > alpha] = P[Binomiale(m, alpha) > m alpha],
+    qu'une itération change le signe de moyenne(Ψ) - alpha lorsque z_n = z*.
+    """
+    taux = []
+    for a in np.ravel(alpha):
+        seuil = int(np.floor(m * a))
+        p = 1 - sum(math.comb(m, k) * a ** k * (1 - a) ** (m - k) for k in range(seuil + 1))
+        taux.append(max(2 * p * (1 - p), 1e-12))
+    return np.array(taux)
+
+
+def robbins_monro_moyenne(tirage, alpha, beta=None, z0=None, n_max=100000, m=100, lambda_decay=0.75,
+                          queue="basse", tolerance=None, niveau_confiance=0.95, n_chauffe=100,
+                          pas_controle=100, taille_bloc=1000, gain="fixe", n_pilote=1000):
+    """
+    Robbins-Monro moyenné par mini-lots, estimant conjointement la VaR et la CVaR
+    de K lois menées de front (une par chaîne).
+
+    À l'itération n, chaque chaîne reçoit m tirages X_1..X_m et :
+        z_{n+1} = z_n - γ_n (moyenne_j Ψ(z_n, X_j) - alpha),     γ_n = beta / n^lambda_decay,
+        C_{n+1} = C_n + (H(z_n, X) - C_n) / (n+1),
+    avec H(z, X) = z - moyenne_j (z - X_j)^+ / alpha        (queue="basse", CVaR = E[X | X <= VaR])
+      ou H(z, X) = z + moyenne_j (X_j - z)^+ / (1 - alpha)  (queue="haute", CVaR = E[X | X >= VaR]).
+    Les règles de gain ("fixe", "kesten", "densite") et la phase de démarrage
+    (beta ou z0 valant None) sont celles de robbins_monro_chaines, appliquées à Ψ
+    moyenné sur le mini-lot ; le démarrage compte pour n_pilote / m itérations.
+    La VaR renvoyée est la moyenne de Polyak-Ruppert des z_n après n_chauffe itérations,
+    de variance asymptotique alpha (1 - alpha) / (f(z*)^2 n m), où la densité f(z*) est
+    estimée au fil de l'eau par noyau. La CVaR a pour variance Var(H) / n. Ces moyennes
+    portent sur une fenêtre couvrant au moins la seconde moitié des itérations.
+
+    Une chaîne s'arrête dès que la moyenne des Ψ sur la fenêtre est compatible avec
+    alpha (régime stationnaire) et que les demi-largeurs des intervalles de confiance de
+    la VaR et de la CVaR sont inférieures à tolerance (contrôle toutes les pas_controle itérations).
+
+    Paramètres :
+        tirage           : fonction n -> array (K, n), réalisations de X pour chaque chaîne.
+        alpha            : float ou array (K,), niveau de la VaR.
+        beta             : float, array (K,) ou None (démarrage automatique), paramètre du pas.
+        z0               : float, array (K,) ou None (démarrage automatique), point de départ.
+        n_max            : int, nombre maximal d'itérations (de m tirages chacune).
+        m                : int, taille des mini-lots.
+        lambda_decay     : float, exposant du pas, dans ]1/2, 1[ pour la moyennisation.
+        queue            : "basse" ou "haute", queue de distribution de la CVaR.
+        tolerance        : float ou None, demi-largeur visée des intervalles de confiance.
+        niveau_confiance : float, niveau des intervalles de confiance (0.9, 0.95 ou 0.99).
+        n_chauffe        : int, nombre d'itérations exclues de la moyenne.
+        pas_controle     : int, période du test d'arrêt.
+        taille_bloc      : int, nombre d'itérations dont les tirages sont simulés à la fois.
+        gain             : "fixe", "kesten" ou "densite".
+        n_pilote         : int, taille de l'échantillon de la phase de démarrage.
+
+    Renvoie :
+        dict de arrays (K,) : var, cvar, erreur_type_var, erreur_type_cvar, n_tirages
+        (phase de démarrage comprise) et
+        convergee (critère d'arrêt atteint, ou régime stationnaire si tolerance vaut None).
+    """
+    if queue not in ("haute", "basse"):
+        raise ValueError("queue doit valoir 'haute' ou 'basse'")
+    beta, z0, f0, echelle, decalage = _parametres_gain(tirage, alpha, beta, z0, gain, n_pilote)
+    tirages_pilote = 0 if f0 is None else n_pilote
+    decalage = decalage / m
+    alpha, beta, z0 = (np.asarray(p, dtype=float) for p in (alpha, beta, z0))
+    K = np.broadcast(alpha, beta, z0).size
+    alpha, beta, z = (np.array(np.broadcast_to(p, (K,))) for p in (alpha, beta, z0))
+    quantile = QUANTILES_NORMALE[niveau_confiance]
+    # Kesten : probabilité de changement de signe de moyenne(Ψ) - alpha par itération en régime stationnaire
+    taux_changements = _taux_changements_signe(alpha, m) if gain == "kesten" else None
+
+    # Moyennes sur une fenêtre couvrant toujours au moins la seconde moitié des itérations :
+    # l'accumulation redémarre à chaque doublement du nombre d'itérations et on garde le bloc précédent.
+    # Lignes : z_n, H, H^2, densité estimée en z_n, moyenne des Ψ.
+    sommes = np.zeros((5, K))
+    sommes_prec = np.zeros((5, K))
+    compte = np.zeros(K)
+    compte_prec = np.zeros(K)
+    redemarrage = np.full(K, max(n_chauffe, 1))
+    actif = np.ones(K, dtype=bool)
+    n_iter = np.zeros(K, dtype=int)
+    changements = np.zeros(K)
+    signe_prec = np.zeros(K, dtype=bool)
+    densite_courante = f0
+
+    def estimations():
+        total = np.maximum(compte + compte_prec, 1)
+        z_moyen, h_moyen, h2_moyen, densite, psi_moyen = (sommes + sommes_prec) / total
+        z_moyen = np.where(compte + compte_prec > 0, z_moyen, z)
+        ecart_type_psi = np.sqrt(alpha * (1 - alpha) / (m * total))
+        erreur_var = ecart_type_psi / np.maximum(densite, 1e-300)
+        erreur_cvar = np.sqrt(np.maximum(h2_moyen - h_moyen ** 2, 0) / total)
+        # Régime stationnaire atteint si la moyenne des Ψ sur la fenêtre est compatible avec alpha
+        stationnaire = np.abs(psi_moyen - alpha) <= quantile * ecart_type_psi
+        return z_moyen, h_moyen, erreur_var, erreur_cvar, stationnaire
+
+    n = 0
+    while n < n_max and actif.any():
+        taille = min(taille_bloc, n_max - n)
+        X_bloc = tirage(taille * m).reshape(K, taille, m)
+        if echelle is None:
+            # Échelle de X (écart interquartile) pour la fenêtre du noyau
+            q1, q3 = np.percentile(X_bloc[:, 0, :], [25, 75], axis=1)
+            echelle = np.maximum(q3 - q1, 1e-12)
+        for j in range(taille):
+            n += 1
+            X = X_bloc[:, j, :]
+            ecarts = X - z[:, None]
+            psi = np.mean(ecarts <= 0, axis=1)
+            if queue == "basse":
+                h = z - np.mean(np.maximum(-ecarts, 0), axis=1) / alpha
+            else:
+                h = z + np.mean(np.maximum(ecarts, 0), axis=1) / (1 - alpha)
+            fenetre = echelle * (n * m) ** -0.2
+            f_n = np.mean(np.abs(ecarts) <= fenetre[:, None], axis=1) / (2 * fenetre)
+
+            # Mise à jour des seules chaînes encore actives
+            n_iter += actif
+            if gain == "fixe":
+                gamma = beta / (decalage + n_iter) ** lambda_decay
+            elif gain == "kesten":
+                signe = psi > alpha
+                changements += actif & (signe != signe_prec)
+                signe_prec = signe
+                gamma = beta / (decalage + 1 + changements / taux_changements) ** lambda_decay
+            else:
+                poids = m / (n_pilote + n_iter * m)
+                densite_courante = np.where(actif, densite_courante + (f_n - densite_courante) * poids,
+                                            densite_courante)
+                gamma = beta / (np.maximum(densite_courante, 0.01 * f0) * (decalage + n_iter) ** lambda_decay)
+            z = np.where(actif, z - gamma * (psi - alpha), z)
+            moyenne = actif & (n_iter > n_chauffe)
+            sommes += np.where(moyenne, np.stack((z, h, h ** 2, f_n, psi)), 0)
+            compte += moyenne
+            relance = moyenne & (n_iter == 2 * redemarrage)
+            if relance.any():
+                sommes_prec[:, relance] = sommes[:, relance]
+                compte_prec[relance] = compte[relance]
+                sommes[:, relance] = 0
+                compte[relance] = 0
+                redemarrage[relance] = n_iter[relance]
+
+            if tolerance is not None and n % pas_controle == 0:
+                _, _, erreur_var, erreur_cvar, stationnaire = estimations()
+                actif &= ~((n_iter > n_chauffe) & stationnaire & (quantile * erreur_var <= tolerance)
+                           & (quantile * erreur_cvar <= tolerance))
+                if not actif.any():
+                    break
+
+    z_moyen, cvar, erreur_var, erreur_cvar, stationnaire = estimations()
+    return {"var": z_moyen, "cvar": cvar, "erreur_type_var": erreur_var,
+            "erreur_type_cvar": erreur_cvar, "n_tirages": n_iter * m + tirages_pilote,
+            "convergee": ~actif if tolerance is not None else stationnaire}
+
+
+# ====================================================
+# Robbins-Monro avec échantillonnage préférentiel (changement de drift de Girsanov)
+# ====================================================
+
+def transformation_gbm(S0, sigma, T, B, r=0.0):
+    """
+    Écrit X = S_T - B comme fonction croissante du moteur gaussien Y de S_T :
+        X = S0 * exp((r - 0.5*sigma^2)*T + sigma*sqrt(T)*Y) - B.
+
+    Paramètres : float ou array (K,), diffusés à une forme commune.
+
+    Renvoie :
+        transformation : fonction Y (K, n) -> X (K, n).
+        inverse        : fonction z (K,) -> y (K,) tel que transformation(y) = z
+                         (-inf si z <= -B).
+    """
+    forme = np.broadcast(S0, sigma, T, B, r).shape
+    S0, sigma, T, B, r = (np.broadcast_to(np.asarray(p, dtype=float), forme).reshape(-1) for p in (S0, sigma, T, B, r))
+    derive = (r - 0.5 * sigma ** 2) * T
+    volatilite = sigma * np.sqrt(T)
+
+    def transformation(Y):
+        return S0[:, None] * np.exp(derive[:, None] + volatilite[:, None] * Y) - B[:, None]
+
+    def inverse(z):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y = (np.log((z + B) / S0) - derive) / volatilite
+        return np.where(z + B > 0, y, -np.inf)
+
+    return transformation, inverse
+
+
+def robbins_monro_is(transformation, inverse, alpha, beta, z0, Nmc, lambda_decay=0.9, pas_historique=1,
+                     theta_max=6.0, gain="fixe", n_pilote=1000, taille_bloc=TAILLE_BLOC, rng=None):
+    """
+    Robbins-Monro avec échantillonnage préférentiel pour les quantiles extrêmes
+    de X = transformation(Y), Y ~ N(0,1), transformation croissante.
+
+    À l'itération n, Y est tiré sous la loi décalée N(θ_n, 1) (changement de drift
+    de Girsanov) et la mise à jour est repondérée par le rapport de vraisemblance
+        L(Y) = exp(-θ_n Y + θ_n^2 / 2),
+    si bien que l'incrément reste d'espérance P[X <= z_n] - alpha sous la loi d'origine :
+        alpha < 1/2 : z_{n+1} = z_n - γ_n (L 1{X <= z_n} - alpha),
+        alpha >= 1/2: z_{n+1} = z_n - γ_n ((1 - L 1{X > z_n}) - alpha).
+    Le drift est ajusté à chaque itération vers le point de la queue visée,
+    θ_n = inverse(z_n) (borné par theta_max) : l'événement rare {X <= z_n}
+    (ou {X > z_n}) se produit alors environ une fois sur deux au lieu d'une fois sur 1/alpha.
+
+    Paramètres :
+        transformation, inverse : voir transformation_gbm.
+        alpha, beta, z0, Nmc, lambda_decay, pas_historique, gain, n_pilote, taille_bloc :
+                         voir robbins_monro_chaines (beta, z0 à None : démarrage automatique).
+        theta_max      : float, borne sur |θ_n|.
+        rng            : générateur numpy (np.random par défaut).
+
+    Renvoie :
+        z          : array (K,), estimations finales.
+        historique : array (K, Nmc // pas_historique + 1), trajectoires des chaînes.
+    """
+    rng = np.random if rng is None else rng
+    K = np.broadcast(inverse(np.zeros(1)), np.asarray(alpha)).size
+
+    def tirage(n):
+        return transformation(rng.standard_normal((K, n)))
+
+    beta, z0, f0, echelle, decalage = _parametres_gain(tirage, alpha, beta, z0, gain, n_pilote)
+    alpha, beta, z0, lambda_decay = (np.array(np.broadcast_to(np.asarray(p, dtype=float), (K,)))
+                                     for p in (alpha, beta, z0, lambda_decay))
+    z = z0
+    queue_basse = alpha < 0.5
+
+    historique = np.empty((Nmc // pas_historique + 1, K))
+    historique[0] = z
+    changements = np.zeros(K)
+    signe_prec = np.zeros(K, dtype=bool)
+    densite = f0
+
+    for debut in range(0, Nmc, taille_bloc):
+        taille = min(taille_bloc, Nmc - debut)
+        G = rng.standard_normal((taille, K))
+        for j in range(taille):
+            n = debut + j + 1
+            theta = np.clip(np.nan_to_num(inverse(z), neginf=-theta_max, posinf=theta_max), -theta_max, theta_max)
+            Y = G[j] + theta
+            L = np.exp(-theta * Y + 0.5 * theta ** 2)
+            ecart = transformation(Y[:, None])[:, 0] - z
+            H = np.where(queue_basse, L * (ecart <= 0), 1 - L * (ecart > 0)) - alpha
+            if gain == "fixe":
+                gamma = beta / (decalage + n) ** lambda_decay
+            elif gain == "kesten":
+                # Sous la loi décalée, l'événement a une probabilité proche de 1/2 :
+                # environ un changement de signe toutes les deux itérations
+                signe = H > 0
+                changements += signe != signe_prec
+                signe_prec = signe
+                gamma = beta / (decalage + 1 + 2 * changements) ** lambda_decay
+            else:
+                fenetre = echelle * (n_pilote + n) ** -0.2
+                noyau = L * (np.abs(ecart) <= fenetre) / (2 * fenetre)
+                densite = densite + (noyau - densite) / (n_pilote + n)
+                gamma = beta / (np.maximum(densite, 0.01 * f0) * (decalage + n) ** lambda_decay)
+            z = z - gamma * H
+            if n % pas_historique == 0:
+                historique[n // pas_historique] = z
+
+    return z, historique.T
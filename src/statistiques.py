@@ -0,0 +1,131 @@
+import numpy as np
+
+# ====================================================
+# Fonction de répartition et densité empiriques en O(n log n)
+# ====================================================
+
+def grille(a, b, Nx):
+    """Renvoie les Nx points x_i = a + (b - a) * i / Nx, i = 0, ..., Nx - 1."""
+    return a + (b - a) * np.arange(Nx) / Nx
+
+
+def _cumul_trie(X, Nmc, poids, debut):
+    """
+    Trie l'échantillon X[debut:Nmc] et renvoie les valeurs triées ainsi que
+    le cumul des poids associés (cumul[k] = somme des poids des k plus petites valeurs).
+    """
+    X = np.asarray(X, dtype=float)
+    Nmc = len(X) if Nmc is None else Nmc
+    ordre = np.argsort(X[debut:Nmc], kind="stable")
+    X_trie = X[debut:Nmc][ordre]
+    if poids is None:
+        cumul = np.arange(len(X_trie) + 1, dtype=float)
+    else:
+        cumul = np.concatenate(([0.0], np.cumsum(np.asarray(poids, dtype=float)[debut:Nmc][ordre])))
+    return X_trie, cumul, Nmc
+
+
+def fonction_repartition(X, a, b, Nx, Nmc=None, poids=None, debut=0):
+    """
+    Fonction de répartition empirique F(x_i) = (1 / Nmc) * somme_j w_j 1{X_j <= x_i}
+    sur la grille x_i = a + (b - a) * i / Nx.
+
+    Le tri de l'échantillon et une recherche dichotomique par point de grille
+    remplacent la double boucle (coût O((Nmc + Nx) log Nmc) au lieu de O(Nx * Nmc)).
+
+    Paramètres :
+        X       : array, échantillon.
+        a, b    : float, bornes de la grille.
+        Nx      : int, nombre de points de la grille.
+        Nmc     : int, taille de l'échantillon utilisée pour la normalisation (len(X) par défaut).
+        poids   : array ou None, poids d'échantillonnage préférentiel w_j (1 par défaut).
+        debut   : int, indice du premier tirage pris en compte (1 pour ignorer X[0],
+                  la normalisation restant 1 / Nmc).
+
+    Renvoie :
+        x     : array (Nx,), points de la grille.
+        proba : array (Nx,), valeurs de la fonction de répartition empirique.
+    """
+    X_trie, cumul, Nmc = _cumul_trie(X, Nmc, poids, debut)
+    x = grille(a, b, Nx)
+    proba = cumul[np.searchsorted(X_trie, x, side="right")] / Nmc
+    return x, proba
+
+
+def densite_empirique(X, a, b, Nx, Nmc=None, poids=None, debut=0):
+    """
+    Densité empirique (histogramme) f(x_i) = (1 / (h * Nmc)) * somme_j w_j 1{x_i < X_j <= x_i + h},
+    avec h = (b - a) / Nx, calculée en une seule passe sur l'échantillon trié.
+
+    Paramètres : voir fonction_repartition.
+
+    Renvoie :
+        x     : array (Nx,), points de la grille (bord gauche de chaque classe).
+        proba : array (Nx,), valeurs de la densité empirique.
+    """
+    X_trie, cumul, Nmc = _cumul_trie(X, Nmc, poids, debut)
+    x = grille(a, b, Nx)
+    h = (b - a) / Nx
+    gauche = np.searchsorted(X_trie, x, side="right")
+    droite = np.searchsorted(X_trie, x + h, side="right")
+    proba = (cumul[droite] - cumul[gauche]) / (h * Nmc)
+    return x, proba
+
+
+# ====================================================
+# Moyenne et variance en une passe, par blocs
+# ====================================================
+
+class Moments:
+    """
+    Moyenne et variance empiriques d'un échantillon reçu par blocs, en une seule passe
+    et de façon numériquement stable : chaque bloc est résumé par (n, moyenne, somme des
+    carrés des écarts à sa moyenne), puis combiné au cumul par la formule de Chan et al.
+    (M2 = M2_a + M2_b + delta^2 n_a n_b / n), sans jamais soustraire de grandes sommes.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.moyenne = 0.0
+        self.m2 = 0.0
+
+    def ajouter(self, X):
+        """Ajoute un bloc de réalisations."""
+        X = np.asarray(X, dtype=float).ravel()
+        if len(X) == 0:
+            return self
+        moyenne = X.mean()
+        m2 = np.sum((X - moyenne) ** 2)
+        return self.fusionner_resume(len(X), moyenne, m2)
+
+    def fusionner_resume(self, n, moyenne, m2):
+        total = self.n + n
+        delta = moyenne - self.moyenne
+        self.moyenne += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.n = total
+        return self
+
+    def fusionner(self, autre):
+        """Fusionne un autre accumulateur (alimenté sur un autre sous-échantillon)."""
+        if autre.n:
+            self.fusionner_resume(autre.n, autre.moyenne, autre.m2)
+        return self
+
+    def variance(self, ddof=0):
+        """Variance empirique (1 / n par défaut, 1 / (n - 1) avec ddof=1)."""
+        return self.m2 / (self.n - ddof)
+
+
+def moyenne_variance(X, taille_bloc=1000000, ddof=0):
+    """
+    Moyenne et variance empiriques de X en une passe par blocs (voir Moments).
+
+    Renvoie :
+        moyenne, variance : float.
+    """
+    X = np.asarray(X, dtype=float).ravel()
+    moments = Moments()
+    for debut in range(0, len(X), taille_bloc):
+        moments.ajouter(X[debut:debut + taille_bloc])
+    return moments.moyenne, moments.variance(ddof)
@@ -0,0 +1,185 @@
+import numpy as np
+
+# ====================================================
+# Moteur de simulation vectorisé du mouvement brownien géométrique
+# ====================================================
+
+# Nombre de trajectoires générées à la fois : borne la mémoire des tirages
+# intermédiaires (taille_bloc * N normales) quel que soit Nmc.
+TAILLE_BLOC = 10000
+
+
+def _generateur(rng):
+    """Renvoie le générateur à utiliser (état global de np.random par défaut)."""
+    return np.random if rng is None else rng
+
+
+def _normales(rng, forme, antithetique=False, axe=-1):
+    """
+    Tire des normales N(0, 1) de forme donnée. Avec antithetique=True, seule la moitié
+    est tirée et chaque tirage Y est suivi de -Y le long de l'axe axe (paires consécutives
+    (0, 1), (2, 3), ... : l'appariement survit au découpage en blocs de taille paire).
+    """
+    if not antithetique:
+        return rng.standard_normal(forme)
+    forme = tuple(forme)
+    n = forme[axe]
+    demi = list(forme)
+    demi[axe] = (n + 1) // 2
+    Y = np.moveaxis(rng.standard_normal(demi), axe, -1)
+    Y = np.stack([Y, -Y], axis=-1).reshape(Y.shape[:-1] + (2 * demi[axe],))[..., :n]
+    return np.moveaxis(Y, -1, axe)
+
+
+def iterer_mouvements_browniens(T, N, Nmc, dtype=np.float64, taille_bloc=TAILLE_BLOC, rng=None,
+                               antithetique=False):
+    """
+    Génère Nmc trajectoires de mouvement brownien standard par blocs.
+
+    Chaque trajectoire est construite par somme cumulée de N incréments
+    gaussiens de variance dt = T / N, avec W_0 = 0.
+
+    Paramètres :
+        T           : float, horizon de temps.
+        N           : int, nombre de pas de temps.
+        Nmc         : int, nombre total de trajectoires.
+        dtype       : type numpy des valeurs (np.float32 ou np.float64).
+        taille_bloc : int, nombre maximal de trajectoires par bloc.
+        rng         : générateur numpy (np.random par défaut).
+        antithetique: bool, trajectoires appariées W, -W (lignes 2j et 2j + 1).
+
+    Renvoie (générateur) :
+        W : array (n_bloc, N + 1), un bloc de trajectoires browniennes.
+    """
+    rng = _generateur(rng)
+    dt = T / N
+    for debut in range(0, Nmc, taille_bloc):
+        n_bloc = min(taille_bloc, Nmc - debut)
+        W = np.empty((n_bloc, N + 1), dtype=dtype)
+        W[:, 0] = 0
+        increments = _normales(rng, (n_bloc, N), antithetique, axe=0).astype(dtype, copy=False)
+        increments *= np.sqrt(dt)
+        np.cumsum(increments, axis=1, out=W[:, 1:])
+        yield W
+
+
+def simuler_mouvements_browniens(T, N, Nmc, dtype=np.float64, taille_bloc=TAILLE_BLOC, rng=None,
+                                 antithetique=False):
+    """
+    Simule Nmc trajectoires de mouvement brownien standard sur [0, T].
+
+    Renvoie :
+        t : array (N + 1,), instants de temps.
+        W : array (Nmc, N + 1), une trajectoire par ligne.
+    """
+    t = np.linspace(0, T, N + 1)
+    W = np.empty((Nmc, N + 1), dtype=dtype)
+    debut = 0
+    for bloc in iterer_mouvements_browniens(T, N, Nmc, dtype, taille_bloc, rng, antithetique):
+        W[debut:debut + len(bloc)] = bloc
+        debut += len(bloc)
+    return t, W
+
+
+def iterer_trajectoires(S0, sigma, T, N, Nmc, r=0.0, dtype=np.float64, taille_bloc=TAILLE_BLOC, rng=None,
+                        antithetique=False):
+    """
+    Génère Nmc trajectoires de S(t) = S0 * exp((r - sigma^2 / 2) t + sigma W_t) par blocs.
+
+    Paramètres :
+        S0, sigma, T, N, Nmc, r : paramètres du modèle et de la discrétisation.
+        dtype, taille_bloc, rng, antithetique : voir iterer_mouvements_browniens.
+
+    Renvoie (générateur) :
+        S : array (n_bloc, N + 1), un bloc de trajectoires de l'actif.
+    """
+    t = np.linspace(0, T, N + 1).astype(dtype)
+    derive = (r - 0.5 * sigma ** 2) * t
+    for W in iterer_mouvements_browniens(T, N, Nmc, dtype, taille_bloc, rng, antithetique):
+        W *= sigma
+        W += derive
+        np.exp(W, out=W)
+        W *= S0
+        yield W
+
+
+def simuler_trajectoires(S0, sigma, T, N, Nmc, r=0.0, dtype=np.float64, taille_bloc=TAILLE_BLOC, rng=None,
+                         antithetique=False):
+    """
+    Simule Nmc trajectoires du mouvement brownien géométrique sur [0, T].
+
+    Paramètres :
+        S0          : float, valeur initiale.
+        sigma       : float, volatilité.
+        T           : float, horizon de temps.
+        N           : int, nombre de pas de temps.
+        Nmc         : int, nombre de trajectoires.
+        r           : float, taux d'intérêt (0 par défaut).
+        dtype       : type numpy des valeurs (np.float32 ou np.float64).
+        taille_bloc : int, nombre maximal de trajectoires simulées à la fois.
+        rng         : générateur numpy (np.random par défaut).
+        antithetique: bool, trajectoires appariées (lignes 2j et 2j + 1 tirées de W et -W).
+
+    Renvoie :
+        t : array (N + 1,), instants de temps.
+        S : array (Nmc, N + 1), une trajectoire par ligne.
+    """
+    t = np.linspace(0, T, N + 1)
+    S = np.empty((Nmc, N + 1), dtype=dtype)
+    debut = 0
+    for bloc in iterer_trajectoires(S0, sigma, T, N, Nmc, r, dtype, taille_bloc, rng, antithetique):
+        S[debut:debut + len(bloc)] = bloc
+        debut += len(bloc)
+    return t, S
+
+
+# ====================================================
+# Tirage exact de la valeur terminale S_T
+# ====================================================
+
+def simuler_S_T(S0, sigma, T, Nmc, r=0.0, dtype=np.float64, rng=None, antithetique=False, communs=False):
+    """
+    Tire directement Nmc valeurs de S_T selon sa loi log-normale exacte :
+        S_T = S0 * exp((r - 0.5*sigma^2)*T + sigma*sqrt(T)*Y),  Y ~ N(0,1).
+
+    Aucune trajectoire intermédiaire n'est simulée : à utiliser dès que seule
+    la valeur terminale intervient (coût N fois plus faible que simuler_trajectoires).
+
+    Paramètres :
+        S0, sigma, T, r : float ou array (K,), paramètres du modèle.
+        Nmc             : int, nombre de tirages par jeu de paramètres.
+        dtype           : type numpy des valeurs (np.float32 ou np.float64).
+        rng             : générateur numpy (np.random par défaut).
+        antithetique    : bool, tirages appariés Y, -Y (indices 2j et 2j + 1).
+        communs         : bool, mêmes Nmc gaussiennes Y pour tous les jeux de paramètres
+                          (nombres aléatoires communs : les écarts entre jeux sont moins bruités).
+
+    Renvoie :
+        S_T : array (Nmc,) si les paramètres sont scalaires, (K, Nmc) sinon.
+    """
+    rng = _generateur(rng)
+    forme = np.broadcast(S0, sigma, T, r).shape
+    S0, sigma, T, r = (np.asarray(p)[..., None] for p in (S0, sigma, T, r))
+    Y = _normales(rng, (Nmc,) if communs else forme + (Nmc,), antithetique).astype(dtype, copy=False)
+    return (S0 * np.exp((r - 0.5 * sigma ** 2) * T + sigma * np.sqrt(T) * Y)).astype(dtype, copy=False)
+
+
+def simuler_X(S0, sigma, T, B, Nmc, r=0.0, dtype=np.float64, rng=None, antithetique=False, communs=False):
+    """
+    Tire Nmc réalisations de X = S_T - B par le tirage exact de S_T.
+
+    Paramètres :
+        B       : float ou array (K,), seuil.
+        communs : bool, un seul échantillon de S_T (par jeu de paramètres du modèle),
+                  décalé pour chaque seuil B, au lieu d'un tirage par seuil.
+        Autres paramètres : voir simuler_S_T.
+
+    Renvoie :
+        X : array (Nmc,) ou (K, Nmc).
+    """
+    B = np.asarray(B)[..., None]
+    if communs:
+        return (simuler_S_T(S0, sigma, T, Nmc, r, dtype, rng, antithetique, True) - B).astype(dtype, copy=False)
+    forme = np.broadcast(S0, sigma, T, r, B[..., 0]).shape
+    S0, sigma, T, r = (np.broadcast_to(p, forme) for p in (S0, sigma, T, r))
+    return (simuler_S_T(S0, sigma, T, Nmc, r, dtype, rng, antithetique) - B).astype(dtype, copy=False)
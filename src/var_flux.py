@@ -0,0 +1,203 @@
+import math
+
+import numpy as np
+
+# ====================================================
+# Estimation de la VaR et de la CVaR en flux (mémoire bornée)
+# ====================================================
+
+# Quantiles de la loi normale pour les intervalles de confiance usuels
+QUANTILES_NORMALE = {0.9: 1.6448536269514722, 0.95: 1.959963984540054, 0.99: 2.5758293035489004}
+
+
+class EstimateurVaR:
+    """
+    Estimateur de la VaR et de la CVaR d'un échantillon reçu par blocs,
+    sans jamais conserver l'échantillon complet.
+
+    Convention (identique à la méthode de tri) : sur l'échantillon trié par
+    ordre croissant, VaR = X_(k) avec k = int(n * alpha).
+        - queue="haute" : pertes, alpha proche de 1 (ex. 0.99),
+          CVaR = moyenne des valeurs >= VaR.
+        - queue="basse" : X = S_T - B, alpha proche de 0 (ex. 0.01),
+          CVaR = moyenne des valeurs <= VaR.
+
+    Deux méthodes :
+        - "exact"   : conserve uniquement la queue de distribution (les n - k plus
+                      grandes valeurs, plus une marge pour l'intervalle de confiance).
+                      La taille totale Nmc de l'échantillon doit être connue à l'avance.
+        - "esquisse": t-digest à compression vectorisée, mémoire O(compression)
+                      indépendante de Nmc, résultat approché.
+
+    Les deux méthodes renvoient un intervalle de confiance sans hypothèse de loi
+    pour la VaR (statistiques d'ordre) et l'erreur type asymptotique de la CVaR.
+    En mode "esquisse", les rangs de l'intervalle sont en plus élargis de l'erreur de
+    rang du t-digest (poids des centroïdes qui encadrent le rang de la VaR).
+    """
+
+    def __init__(self, alpha, Nmc=None, queue="haute", methode="exact", niveau_confiance=0.95, compression=200):
+        """
+        Paramètres :
+            alpha            : float, niveau de la VaR.
+            Nmc              : int, taille totale prévue de l'échantillon (obligatoire en mode "exact").
+            queue            : "haute" ou "basse", queue de distribution étudiée.
+            methode          : "exact" ou "esquisse".
+            niveau_confiance : float, niveau de l'intervalle de confiance (0.9, 0.95 ou 0.99).
+            compression      : int, paramètre delta du t-digest (mode "esquisse").
+        """
+        if queue not in ("haute", "basse"):
+            raise ValueError("queue doit valoir 'haute' ou 'basse'")
+        if methode not in ("exact", "esquisse"):
+            raise ValueError("methode doit valoir 'exact' ou 'esquisse'")
+        if methode == "exact" and Nmc is None:
+            raise ValueError("le mode exact nécessite la taille totale Nmc de l'échantillon")
+        self.alpha = alpha
+        self.Nmc = Nmc
+        self.queue = queue
+        self.methode = methode
+        self.niveau_confiance = niveau_confiance
+        self.z = QUANTILES_NORMALE[niveau_confiance]
+        self.compression = compression
+        self.n = 0
+        if methode == "exact":
+            # On stocke y = x (queue haute) ou y = -x (queue basse) : la queue utile
+            # est toujours celle des grandes valeurs de y.
+            self.taille_tampon = self.Nmc - self._rang(self.Nmc) + self._marge(self.Nmc)
+            self.tampon = np.empty(0)
+        else:
+            self.moyennes = np.empty(0)
+            self.poids = np.empty(0)
+
+    # ------------------------------------------------
+    # Rangs (en ordre croissant de y) de la VaR et de l'intervalle de confiance
+    # ------------------------------------------------
+
+    def _rang(self, n):
+        k = int(n * self.alpha)
+        return k if self.queue == "haute" else n - 1 - k
+
+    def _marge(self, n):
+        return int(math.ceil(self.z * math.sqrt(n * self.alpha * (1 - self.alpha)))) + 1
+
+    def _y(self, x):
+        x = np.asarray(x, dtype=float).ravel()
+        return x if self.queue == "haute" else -x
+
+    def _x(self, y):
+        return y if self.queue == "haute" else -y
+
+    # ------------------------------------------------
+    # Alimentation
+    # ------------------------------------------------
+
+    def ajouter(self, X):
+        """Ajoute un bloc de réalisations à l'estimateur."""
+        y = self._y(X)
+        self.n += len(y)
+        if self.methode == "exact":
+            if self.n > self.Nmc:
+                raise ValueError("l'échantillon dépasse la taille Nmc annoncée")
+            self._ajouter_tampon(y)
+        else:
+            self._compresser(np.concatenate((self.moyennes, y)),
+                             np.concatenate((self.poids, np.ones(len(y)))))
+
+    def fusionner(self, autre):
+        """
+        Fusionne un autre estimateur de mêmes paramètres (alimenté sur un autre sous-échantillon).
+
+        En mode "exact", chaque tampon ne garde que la queue nécessaire pour la taille Nmc
+        annoncée : les estimateurs fusionnés doivent donc tous être construits avec la
+        taille totale Nmc de l'échantillon réuni (et non celle de leur sous-échantillon),
+        sans quoi la queue fusionnée serait tronquée. ValueError sinon.
+        """
+        if (autre.alpha, autre.queue, autre.methode) != (self.alpha, self.queue, self.methode):
+            raise ValueError("les estimateurs à fusionner doivent avoir les mêmes paramètres")
+        if self.methode == "exact":
+            if autre.Nmc != self.Nmc:
+                raise ValueError("les estimateurs à fusionner doivent avoir la même taille totale Nmc")
+            if self.n + autre.n > self.Nmc:
+                raise ValueError("l'échantillon fusionné dépasse la taille Nmc annoncée : "
+                                 "construire chaque estimateur avec la taille totale Nmc")
+        self.n += autre.n
+        if self.methode == "exact":
+            self._ajouter_tampon(autre.tampon)
+        else:
+            self._compresser(np.concatenate((self.moyennes, autre.moyennes)),
+                             np.concatenate((self.poids, autre.poids)))
+        return self
+
+    def _ajouter_tampon(self, y):
+        tampon = np.concatenate((self.tampon, y))
+        if len(tampon) > self.taille_tampon:
+            tampon = np.partition(tampon, len(tampon) - self.taille_tampon)[len(tampon) - self.taille_tampon:]
+        self.tampon = tampon
+
+    def _compresser(self, valeurs, poids):
+        """Compression du t-digest : regroupe les points voisins selon la fonction d'échelle k2."""
+        ordre = np.argsort(valeurs, kind="stable")
+        valeurs, poids = valeurs[ordre], poids[ordre]
+        total = poids.sum()
+        q = (np.cumsum(poids) - 0.5 * poids) / total
+        q = np.clip(q, 0.5 / total, 1 - 0.5 / total)
+        normalisation = 4 * math.log(max(total / self.compression, 1.0)) + 24
+        k = np.floor(self.compression / normalisation * np.log(q / (1 - q)))
+        debuts = np.flatnonzero(np.concatenate(([True], k[1:] != k[:-1])))
+        self.poids = np.add.reduceat(poids, debuts)
+        self.moyennes = np.add.reduceat(poids * valeurs, debuts) / self.poids
+
+    # ------------------------------------------------
+    # Résultats
+    # ------------------------------------------------
+
+    def _quantile_tampon(self, rang):
+        # rang en ordre croissant sur l'échantillon complet ; le tampon contient les plus grandes valeurs
+        rang = min(max(rang, self.n - len(self.tampon)), self.n - 1)
+        return np.partition(self.tampon, rang - (self.n - len(self.tampon)))[rang - (self.n - len(self.tampon))]
+
+    def _quantile_esquisse(self, rang):
+        centres = np.cumsum(self.poids) - 0.5 * self.poids
+        return np.interp(rang + 0.5, centres, self.moyennes)
+
+    def _erreur_rang_esquisse(self, rang):
+        # les points d'un centroïde ne sont connus que par leur moyenne : le rang interpolé
+        # est incertain du poids des centroïdes qui l'encadrent
+        centres = np.cumsum(self.poids) - 0.5 * self.poids
+        j = np.searchsorted(centres, rang + 0.5)
+        return int(math.ceil(0.5 * self.poids[max(j - 1, 0):j + 1].max()))
+
+    def resultat(self):
+        """
+        Renvoie un dictionnaire :
+            var              : VaR estimée (même convention que la méthode de tri).
+            var_inf, var_sup : intervalle de confiance de la VaR.
+            cvar             : CVaR estimée.
+            erreur_type_cvar : erreur type asymptotique de la CVaR.
+            n                : nombre de réalisations reçues.
+        """
+        n = self.n
+        rang = self._rang(n)
+        marge = self._marge(n)
+        if self.methode == "esquisse":
+            marge += self._erreur_rang_esquisse(rang)
+        rangs = (rang, max(rang - marge, 0), min(rang + marge, n - 1))
+        if self.methode == "exact":
+            v, v_inf, v_sup = (self._quantile_tampon(r) for r in rangs)
+            queue = np.sort(self.tampon)[len(self.tampon) - (n - rang):]
+            excedents, poids = queue - v, np.ones(len(queue))
+        else:
+            v, v_inf, v_sup = (self._quantile_esquisse(r) for r in rangs)
+            # Part de chaque centroïde au-dessus du rang de la VaR
+            cumul = np.cumsum(self.poids)
+            poids = np.clip(cumul - rang, 0, self.poids)
+            excedents = self.moyennes - v
+        m = poids.sum()
+        cvar = v + np.sum(poids * excedents) / m
+        # Var((Y - v)^+) / (n (m / n)^2), sur les seules valeurs de la queue
+        moment1 = np.sum(poids * excedents) / n
+        moment2 = np.sum(poids * excedents ** 2) / n
+        erreur_type = math.sqrt(max(moment2 - moment1 ** 2, 0.0) / n) / (m / n)
+        if self.queue == "basse":
+            v, v_inf, v_sup, cvar = -v, -v_sup, -v_inf, -cvar
+        return {"var": float(v), "var_inf": float(v_inf), "var_sup": float(v_sup),
+                "cvar": float(cvar), "erreur_type_cvar": erreur_type, "n": n}